@@ -0,0 +1,85 @@
+"""
+Reports the memory held per scenario by fully loaded Scenario objects, by ScenarioSpec objects
+once the application is dropped, and by a ScenarioColumns store.
+
+Usage: python benchmarks/bench_memory.py [routes] [scenarios_per_route]
+"""
+import gc
+import importlib
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from corpus import generate
+
+from routestpy.core.application import Application
+from routestpy.core.scenario_spec import ScenarioColumns
+
+# Modules the application and ScenarioSpec.from_scenario import on first use
+LAZY_MODULES = (
+    "routestpy.core.project_loader",
+    "routestpy.core.route",
+    "routestpy.core.scenario",
+    "routestpy.core.snapshot",
+    "routestpy.runner.scenario_request",
+)
+
+
+def traced() -> int:
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def report(label: str, size: int, count: int, elapsed: float) -> None:
+    print(f"{label:<28}{size / 1e6:10.1f} MB  {size / count:10.0f} bytes/scenario  {elapsed:8.2f}s")
+
+
+def main(routes: int = 50, scenarios: int = 200) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        project = generate(Path(tmp), routes, scenarios)
+        # The environment config is read from the current directory
+        cwd = os.getcwd()
+        os.chdir(project)
+        try:
+            measure(project)
+        finally:
+            os.chdir(cwd)
+
+
+def measure(project: Path) -> None:
+    # Modules imported on first use are loaded first, so that only the scenarios are measured
+    for module in LAZY_MODULES:
+        importlib.import_module(module)
+    tracemalloc.start()
+    base = traced()
+
+    start = time.perf_counter()
+    app = Application(project, snapshot=False, lazy=False)
+    app.collect_scenarios()
+    count = len(app.scenario_collection)
+    loaded = traced()
+    print(f"{count} scenarios")
+    report("Scenario objects", loaded - base, count, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    specs = app.specs()
+    elapsed = time.perf_counter() - start
+    del app
+    report("ScenarioSpec objects", traced() - base, count, elapsed)
+
+    start = time.perf_counter()
+    before = traced()
+    columns = ScenarioColumns(specs)
+    report("ScenarioColumns store", traced() - before, count, time.perf_counter() - start)
+    print(
+        f"{'ScenarioColumns row arrays':<28}{columns.nbytes / 1e6:10.1f} MB"
+        f"  {columns.nbytes / count:10.0f} bytes/scenario"
+    )
+    tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,92 @@
+"""
+Measures the cold start of each CLI subcommand, in a fresh interpreter per run, and fails if one
+exceeds its budget or imports a heavy dependency it does not need.
+
+The reported time is the best of the runs minus the start of a bare interpreter, so the budgets
+hold the cost of routestpy itself. Each command prints its help, which loads everything the
+command line needs before the command does any work.
+
+Usage: python benchmarks/bench_startup.py [runs] [budget_ms]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Set
+
+ENTRY_POINT = "from routestpy.cli import cli; cli()"
+
+# Imported on first use only, never to parse the command line
+HEAVY_MODULES = ("jsonschema", "yaml", "requests", "pykwalify", "toml", "dotenv", "jinja2", "aiohttp")
+
+# Milliseconds allowed above a bare interpreter
+COMMANDS = {
+    "--help": 60.0,
+    "new-project --help": 60.0,
+    "new-route --help": 60.0,
+    "new-scenario --help": 60.0,
+    "update-config --help": 60.0,
+    "run --help": 60.0,
+    "worker --help": 60.0,
+    "load --help": 60.0,
+    "watch --help": 60.0,
+}
+
+
+def elapsed(args: List[str], env: Dict[str, str], cwd: str) -> float:
+    start = time.perf_counter()
+    subprocess.run(args, env=env, cwd=cwd, check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def imported_modules(args: List[str], env: Dict[str, str], cwd: str) -> Set[str]:
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", ENTRY_POINT, *args],
+        env=env,
+        cwd=cwd,
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    lines = [line for line in completed.stderr.splitlines() if line.startswith("import time")]
+    return {line.rpartition("|")[2].strip().split(".")[0] for line in lines}
+
+
+def main(runs: int = 10, budget_ms: Optional[float] = None) -> None:
+    env = dict(os.environ)
+    source = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+    env["PYTHONPATH"] = os.pathsep.join(path for path in (source, env.get("PYTHONPATH")) if path)
+    failures = []
+
+    with tempfile.TemporaryDirectory() as workdir:
+        baseline = min(elapsed([sys.executable, "-c", "pass"], env, workdir) for _ in range(runs))
+        print(f"bare interpreter {baseline * 1000:7.1f}ms, best of {runs}")
+
+        for command, budget in COMMANDS.items():
+            budget = budget_ms if budget_ms is not None else budget
+            args = [sys.executable, "-c", ENTRY_POINT, *command.split()]
+            startup = (min(elapsed(args, env, workdir) for _ in range(runs)) - baseline) * 1000
+            modules = imported_modules(command.split(), env, workdir)
+            heavy = sorted(name for name in HEAVY_MODULES if name in modules)
+
+            problems = []
+            if startup > budget:
+                problems.append(f"over budget of {budget:.0f}ms")
+            if heavy:
+                problems.append(f"imports {', '.join(heavy)}")
+            if problems:
+                failures.append(command)
+            print(f"routestpy {command:<22} {startup:7.1f}ms  {', '.join(problems) or 'ok'}")
+
+    if failures:
+        print(f"{len(failures)} command(s) failed: {', '.join(failures)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]), *(float(arg) for arg in sys.argv[2:3]))
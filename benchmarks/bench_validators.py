@@ -0,0 +1,51 @@
+"""
+Compares the validator engines used by BaseYamlSchema.is_valid_data on a scenario corpus.
+
+Usage: python benchmarks/bench_validators.py [routes] [scenarios_per_route] [rounds]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import jsonschema
+import yaml
+from corpus import generate
+
+from routestpy.core.base_yaml_schema import BaseYamlSchema
+from routestpy.core.validators import get_validator_engine
+
+SCHEMA_DIR = Path(__file__).resolve().parent.parent / "src" / "schema"
+
+
+def main(routes: int = 20, scenarios: int = 50, rounds: int = 3) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        project = generate(Path(tmp), routes, scenarios)
+        documents = [yaml.safe_load(p.read_text()) for p in sorted(project.glob("routes/*/scenarios/*.yaml"))]
+
+    schema = BaseYamlSchema.__new__(BaseYamlSchema).compile_schema(SCHEMA_DIR / "scenario_schema.yaml")
+    print(f"{len(documents)} scenario documents, {rounds} rounds")
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for document in documents:
+            jsonschema.validate(document, schema)
+    baseline = time.perf_counter() - start
+    print(f"{'jsonschema.validate':<22}{baseline:8.3f}s  {len(documents) * rounds / baseline:10.0f} docs/s")
+
+    for name in ("jsonschema", "codegen"):
+        engine = get_validator_engine(name)
+        engine.validator(schema)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for document in documents:
+                engine.validate(document, schema)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{'engine ' + name:<22}{elapsed:8.3f}s  {len(documents) * rounds / elapsed:10.0f} docs/s"
+            f"  x{baseline / elapsed:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:4]))
@@ -0,0 +1,78 @@
+"""
+Reports YAML parse throughput of the pure-Python and libyaml loaders for scenario-sized and
+large configuration files.
+
+Usage: python benchmarks/bench_yaml.py [seconds_per_case]
+"""
+import sys
+import time
+
+import yaml
+from corpus import SCENARIO_YAML
+
+from routestpy.loaders import yaml_reader
+
+
+def scenario_text() -> bytes:
+    return SCENARIO_YAML.format(
+        route=1,
+        scenario=2,
+        method="GET",
+        kind="smoke",
+        tier=0,
+        assignee=1,
+        component=3,
+        importance="high",
+        negative="false",
+        page=2,
+    ).encode()
+
+
+def config_text(sections: int = 2000) -> bytes:
+    lines = []
+    for section in range(sections):
+        lines.append(f"service_{section}:")
+        lines.append(f"  url: https://service-{section}.example.com/api")
+        lines.append("  timeout: 30")
+        lines.append("  retries: 3")
+        lines.append("  headers:")
+        lines.extend(f"    - key: X-Header-{h}\n      value: value-{section}-{h}" for h in range(5))
+    return "\n".join(lines).encode()
+
+
+def throughput(load, text: bytes, seconds: float) -> float:
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        load(text)
+        count += 1
+    return len(text) * count / (time.perf_counter() - start) / 1e6
+
+
+def main(seconds: float = 2.0) -> None:
+    scenario = scenario_text()
+    config = config_text()
+    multi = b"\n---\n".join([scenario] * 100)
+    print(f"libyaml available: {yaml_reader.LIBYAML}")
+
+    cases = [
+        ("scenario file", scenario, lambda t: yaml.load(t, Loader=yaml.SafeLoader), yaml_reader.safe_load),
+        ("large config", config, lambda t: yaml.load(t, Loader=yaml.SafeLoader), yaml_reader.safe_load),
+        (
+            "100-document file",
+            multi,
+            lambda t: list(yaml.load_all(t, Loader=yaml.SafeLoader)),
+            yaml_reader.safe_load_all,
+        ),
+    ]
+    for name, text, pure, shared in cases:
+        pure_mbs = throughput(pure, text, seconds)
+        shared_mbs = throughput(shared, text, seconds)
+        print(
+            f"{name:<18} {len(text) / 1024:9.1f} KiB  SafeLoader {pure_mbs:7.2f} MB/s"
+            f"  {yaml_reader.SafeLoader.__name__} {shared_mbs:7.2f} MB/s  x{shared_mbs / pure_mbs:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main(*(float(arg) for arg in sys.argv[1:2]))
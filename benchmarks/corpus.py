@@ -0,0 +1,142 @@
+"""
+Generates a synthetic but realistic routestpy project used by the benchmarks.
+
+Usage: python benchmarks/corpus.py <project_dir> [routes] [scenarios_per_route]
+"""
+import sys
+from pathlib import Path
+
+APP_YAML = """app:
+  name: benchmark
+  environments: [qa, stage, prod]
+  priorities: [P0, P1, P2]
+  automation_status_list: [automated, manual]
+  tags: [api]
+  requirements:
+    REQ_1:
+      summary: Users can be listed
+      priority: P0
+  parameters:
+    headers:
+      - key: Accept
+        value: application/json
+      - key: X-Client
+        value: routestpy
+    path_variables: []
+    query_params: []
+  meta:
+    assignee: qa-team
+    component: platform
+    tags: [api]
+  hooks:
+    - hook_type: before_app
+      func: os.getcwd
+"""
+
+ROUTE_YAML = """route:
+  info:
+    name: route_{route}
+    description: Operations on resource {route}
+    path: /api/v1/resource_{route}/{{resource_id}}
+    method: GET
+  meta:
+    component: component_{component}
+    tags: [route_{route}]
+  parameters:
+    headers:
+      - key: X-Route
+        value: route_{route}
+    path_variables:
+      - key: resource_id
+        value: "{route}"
+    query_params: []
+  hooks:
+    - hook_type: before_route
+      func: os.getcwd
+  scenarios:
+{scenarios}
+"""
+
+SCENARIO_YAML = """scenario:
+  info:
+    name: route_{route}_scenario_{scenario}
+    description: Scenario {scenario} checks resource {route} with a {kind} request
+    path: /api/v1/resource_{route}/{{resource_id}}
+    method: {method}
+  meta:
+    assignee: engineer_{assignee}
+    automation_status: automated
+    component: component_{component}
+    Importance: {importance}
+    requirements: [REQ_1]
+    setup: Create resource {route}
+    test_steps: Send the request and inspect the response
+    expected_results: The response matches the schema
+    negative: {negative}
+    type: functional
+    tags: [{kind}, tier_{tier}, scenario_{scenario}]
+  parameters:
+    headers:
+      - key: X-Scenario
+        value: scenario_{scenario}
+      - key: X-Trace
+        value: trace_{route}_{scenario}
+    path_variables: []
+    query_params:
+      - key: page
+        value: "{page}"
+      - key: limit
+        value: "50"
+  hooks:
+    - hook_type: after_scenario
+      func: os.getcwd
+"""
+
+METHODS = ["GET", "POST", "PUT", "DELETE", "PATCH"]
+
+
+def generate(project_dir: Path, routes: int = 20, scenarios: int = 50) -> Path:
+    """
+    Writes a project with the given number of routes and scenarios per route.
+
+    Args:
+    - project_dir (Path): directory in which the project is created
+    - routes (int): number of routes
+    - scenarios (int): number of scenarios per route
+
+    Returns:
+    - Path: the project directory
+    """
+    project_dir = Path(project_dir)
+    for name in ("app", "config", "routes"):
+        project_dir.joinpath(name).mkdir(parents=True, exist_ok=True)
+    project_dir.joinpath("app", "app.yaml").write_text(APP_YAML)
+    project_dir.joinpath("config", "prod.yaml").write_text("host: http://127.0.0.1:8080\n")
+
+    for route in range(routes):
+        route_dir = project_dir.joinpath("routes", f"resource_{route}_route")
+        route_dir.joinpath("scenarios").mkdir(parents=True, exist_ok=True)
+        listing = "\n".join(f"    - ./scenarios/scenario_{s}.yaml" for s in range(scenarios))
+        route_dir.joinpath("route.yaml").write_text(
+            ROUTE_YAML.format(route=route, component=route % 7, scenarios=listing)
+        )
+        for scenario in range(scenarios):
+            route_dir.joinpath("scenarios", f"scenario_{scenario}.yaml").write_text(
+                SCENARIO_YAML.format(
+                    route=route,
+                    scenario=scenario,
+                    method=METHODS[scenario % len(METHODS)],
+                    kind="smoke" if scenario % 10 == 0 else "regression",
+                    tier=scenario % 3,
+                    assignee=scenario % 5,
+                    component=(route + scenario) % 11,
+                    importance=["high", "medium", "low"][scenario % 3],
+                    negative="true" if scenario % 4 == 0 else "false",
+                    page=scenario,
+                )
+            )
+    return project_dir
+
+
+if __name__ == "__main__":
+    generate(Path(sys.argv[1]), *(int(arg) for arg in sys.argv[2:4]))
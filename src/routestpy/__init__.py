@@ -1,21 +1,66 @@
 # SPDX-FileCopyrightText: 2023-present QA Toolist <qatoolist@gmail.com>
 #
 # SPDX-License-Identifier: MIT
-# Importing these modules is necessary for the application to work, but
-# they are intentionally unused in this file to avoid circular imports.
+# The public classes are imported on first access (PEP 562), so that importing the package, e.g.
+# for `routestpy --help`, does not load jsonschema, yaml, toml or dotenv. Modules of the package
+# import them with `from routestpy import X`, which goes through __getattr__ as well.
+import importlib
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import List
 
-from .core.base_yaml_schema import BaseYamlSchema  # noqa
-from .core.config import Config  # noqa
-from .loaders.dot_env_loader import DotEnvLoader  # noqa
-from .loaders.json_loader import JsonLoader  # noqa
-from .loaders.toml_loader import TomlLoader  # noqa
-from .loaders.yaml_loader import YamlLoader  # noqa
-from .loaders.config_loader import ConfigLoader  # noqa
-from .core.info import Info  # noqa
-from .core.meta import Meta  # noqa
-from .core.request_body_schema import RequestBodySchema  # noqa
-from .core.response_body_schema import ResponseBodySchema  # noqa
-from .core.application import Application  # noqa
-from .core.route import Route  # noqa
-from .core.scenario import Scenario  # noqa
-from .core.schema import BaseBodySchema  # noqa
+# Public names and the modules defining them
+_LAZY_ATTRIBUTES = {
+    "SchemaRegistry": ".core.schema_registry",
+    "schema_registry": ".core.schema_registry",
+    "BaseYamlSchema": ".core.base_yaml_schema",
+    "Config": ".core.config",
+    "DotEnvLoader": ".loaders.dot_env_loader",
+    "JsonLoader": ".loaders.json_loader",
+    "TomlLoader": ".loaders.toml_loader",
+    "YamlLoader": ".loaders.yaml_loader",
+    "ConfigLoader": ".loaders.config_loader",
+    "Info": ".core.info",
+    "Meta": ".core.meta",
+    "RequestBodySchema": ".core.request_body_schema",
+    "ResponseBodySchema": ".core.response_body_schema",
+    "Application": ".core.application",
+    "Route": ".core.route",
+    "Scenario": ".core.scenario",
+    "BaseBodySchema": ".core.schema",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+if TYPE_CHECKING:
+    from .core.application import Application  # noqa
+    from .core.base_yaml_schema import BaseYamlSchema  # noqa
+    from .core.config import Config  # noqa
+    from .core.info import Info  # noqa
+    from .core.meta import Meta  # noqa
+    from .core.request_body_schema import RequestBodySchema  # noqa
+    from .core.response_body_schema import ResponseBodySchema  # noqa
+    from .core.route import Route  # noqa
+    from .core.scenario import Scenario  # noqa
+    from .core.schema import BaseBodySchema  # noqa
+    from .core.schema_registry import SchemaRegistry  # noqa
+    from .core.schema_registry import schema_registry  # noqa
+    from .loaders.config_loader import ConfigLoader  # noqa
+    from .loaders.dot_env_loader import DotEnvLoader  # noqa
+    from .loaders.json_loader import JsonLoader  # noqa
+    from .loaders.toml_loader import TomlLoader  # noqa
+    from .loaders.yaml_loader import YamlLoader  # noqa
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    # Later accesses find the attribute without going through __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -1,8 +1,8 @@
+from contextlib import nullcontext
 from pathlib import Path
+from typing import Any
 
 import click
-from jinja2 import Environment
-from jinja2 import FileSystemLoader
 
 
 @click.group()
@@ -21,6 +21,9 @@ def cli():
 @click.option('-n', '--project-name', type=str, required=True, help="The name of the new project.")
 def new_project(project_dir: Path, project_name: str) -> None:
     """Create a new Routestpy project."""
+    from jinja2 import Environment
+    from jinja2 import FileSystemLoader
+
     project_dir = Path(project_dir)
     if not project_dir:
         project_dir = Path.cwd()
@@ -122,8 +125,380 @@ def update_config(environment_name: str, update: str) -> None:
 @click.option(
     '-p', '--parallel-count', type=int, required=True, help="The number of scenarios to run in parallel mode."
 )
-def run(environment_name: str, parallel_count: int) -> None:
-    """Run scenarios against a specified environment in parallel."""
+@click.option(
+    '-t',
+    '--tags',
+    type=str,
+    default=None,
+    help="The tag expression selecting the scenarios to run, ex. 'smoke AND NOT slow'. Default is every scenario.",
+)
+@click.option('--timeout', type=float, default=30.0, help="The timeout of each request in seconds. Default is 30.")
+@click.option(
+    '-w',
+    '--workers',
+    type=int,
+    default=1,
+    help="The number of worker processes sharing the parallel count. Default is 1, running in this process.",
+)
+@click.option(
+    '-c',
+    '--coordinator',
+    type=str,
+    default=None,
+    help="The [host]:port to listen on for 'routestpy worker' processes, which then run the scenarios. "
+    "The host defaults to 127.0.0.1, workers are not authenticated so only use 0.0.0.0 on a trusted network.",
+)
+@click.option(
+    '--batch-size', type=int, default=20, help="The number of scenarios sent to a worker at once. Default is 20."
+)
+@click.option(
+    '--metrics-dir',
+    type=click.Path(file_okay=False, writable=True),
+    default=None,
+    help="The directory metrics.prom and metrics.json are written to during and after the run.",
+)
+@click.option(
+    '--metrics-interval', type=float, default=10.0, help="The seconds between metrics exports. Default is 10."
+)
+@click.option(
+    '--jsonl',
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+    help="The file each result is appended to as a JSON line as soon as its scenario finishes.",
+)
+@click.option(
+    '--junit',
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+    help="The JUnit XML report written as the scenarios finish.",
+)
+@click.option(
+    '--retain-bodies', is_flag=True, default=False, help="Keep response bodies in memory and in the reports."
+)
+@click.option(
+    '--skip-hooks',
+    is_flag=True,
+    default=False,
+    help="Do not run the app, route and scenario hooks. Hooks only run in this process, so scenarios with hooks "
+    "need this flag to run with --workers or --coordinator.",
+)
+def run(
+    environment_name: str,
+    parallel_count: int,
+    tags: str,
+    timeout: float,
+    workers: int,
+    coordinator: str,
+    batch_size: int,
+    metrics_dir: str,
+    metrics_interval: float,
+    jsonl: str,
+    junit: str,
+    retain_bodies: bool,
+    skip_hooks: bool,
+) -> None:
+    """Run scenarios against a specified environment in parallel, exiting with status 1 if any fails."""
+    from routestpy.core.application import Application
+    from routestpy.core.dependency_graph import DependencyError
+    from routestpy.core.tag_expression import compile_expression
+    from routestpy.runner.async_runner import AsyncRunner
+    from routestpy.runner.dag_runner import DagRunner
+    from routestpy.runner.distributed import Coordinator
+    from routestpy.runner.distributed import project_fingerprint
+    from routestpy.runner.hooks import HookEngine
+    from routestpy.runner.hooks import HookError
+    from routestpy.runner.hooks import scenario_hooks
+    from routestpy.runner.metrics import MetricsRegistry
+    from routestpy.runner.prefork_runner import PreforkRunner
+    from routestpy.runner.reporters import JsonlWriter
+    from routestpy.runner.reporters import JUnitWriter
+    from routestpy.runner.reporters import ResultSink
+    from routestpy.runner.scenario_request import base_url
+
+    if parallel_count < 1:
+        raise click.BadParameter("must be at least 1", param_hint="'--parallel-count'")
+    if workers < 1:
+        raise click.BadParameter("must be at least 1", param_hint="'--workers'")
+
+    app = Application(Path.cwd(), environment=environment_name)
+    metrics = MetricsRegistry()
+    hooks = HookEngine() if not skip_hooks else None
+    writers = []
+    if jsonl:
+        writers.append(JsonlWriter(Path(jsonl)))
+    if junit:
+        writers.append(JUnitWriter(Path(junit), app.data["app"].get("name") or "routestpy"))
+    sink = ResultSink(writers, retain_bodies=retain_bodies) if writers else None
+    # Runners wait for slow report writers without blocking their event loop; the prefork runner
+    # collects the results of its workers outside of an event loop and uses the blocking put
+    on_result = sink.put_async if sink is not None else None
+
+    # Dependencies are checked before any request is sent
+    try:
+        graph = app.dependency_graph(app.filter_by_tags(tags) if tags else None)
+    except DependencyError as e:
+        raise click.ClickException(str(e)) from e
+    if graph.has_dependencies and (coordinator or workers > 1):
+        raise click.UsageError("Scenarios with produces/consumes dependencies run in one process, without --workers.")
+    if hooks is not None and (coordinator or workers > 1):
+        if any(scenario_hooks(scenario) for scenario in app.materialize(graph.scenarios)):
+            raise click.UsageError(
+                "Hooks only run in one process, without --workers or --coordinator. "
+                "Pass --skip-hooks to run the scenarios without their hooks."
+            )
+
+    with _metrics_exporter(metrics, metrics_dir, metrics_interval), sink or nullcontext():
+        if coordinator:
+            index = app.get_tag_index()
+            ids = index.ids(compile_expression(tags).bits(index) if tags else index.all)
+            fingerprint = project_fingerprint(app.project_path, app.scenario_collection)
+            summary = Coordinator(
+                ids, app.environment, fingerprint, coordinator, batch_size, metrics=metrics, on_result=on_result
+            ).run()
+        else:
+            scenarios = app.materialize(graph.scenarios)
+
+            runner: Any
+            if graph.has_dependencies:
+                runner = DagRunner(
+                    base_url(app),
+                    parallel_count,
+                    timeout,
+                    metrics=metrics,
+                    on_result=on_result,
+                    keep_results=sink is None,
+                    retain_bodies=retain_bodies,
+                    register=app.register,
+                    hooks=hooks,
+                )
+            elif workers > 1:
+                runner = PreforkRunner(
+                    base_url(app),
+                    parallel_count,
+                    workers,
+                    timeout,
+                    metrics=metrics,
+                    on_result=sink.put if sink is not None else None,
+                )
+            else:
+                # Results only go to the reports when there are any, instead of piling up in memory
+                runner = AsyncRunner(
+                    base_url(app),
+                    parallel_count,
+                    timeout,
+                    metrics=metrics,
+                    on_result=on_result,
+                    keep_results=sink is None,
+                    retain_bodies=retain_bodies,
+                    hooks=hooks,
+                )
+            try:
+                summary = runner.run(scenarios)
+            except HookError as e:
+                raise click.ClickException(str(e)) from e
+    _echo_summary(summary, metrics, hooks)
+    if summary.errors:
+        click.get_current_context().exit(1)
+
+
+@cli.command()
+@click.option('-c', '--coordinator', type=str, required=True, help="The host:port of the 'routestpy run' coordinator.")
+@click.option(
+    '-p', '--parallel-count', type=int, required=True, help="The number of scenarios to run in parallel mode."
+)
+@click.option('--timeout', type=float, default=30.0, help="The timeout of each request in seconds. Default is 30.")
+def worker(coordinator: str, parallel_count: int, timeout: float) -> None:
+    """Run the scenarios handed out by a coordinator, from a copy of its project in the current directory."""
+    from routestpy.runner.distributed import Worker
+
+    if parallel_count < 1:
+        raise click.BadParameter("must be at least 1", param_hint="'--parallel-count'")
+    ran = Worker(coordinator, Path.cwd(), parallel_count, timeout).run()
+    click.echo(f"Ran {ran} scenarios.")
+
+
+@cli.command()
+@click.option(
+    '-e',
+    '--environment-name',
+    type=str,
+    required=True,
+    help="The name of the environment against which the scenarios need to run.",
+)
+@click.option('-r', '--rate', type=float, required=True, help="The target rate in requests per second.")
+@click.option('-D', '--duration', type=float, required=True, help="The duration of the run in seconds.")
+@click.option('--ramp-up', type=float, default=0.0, help="The seconds taken to reach the target rate. Default is 0.")
+@click.option(
+    '-t',
+    '--tags',
+    type=str,
+    default=None,
+    help="The tag expression selecting the scenarios to mix, ex. 'smoke AND NOT slow'. Default is every scenario.",
+)
+@click.option('--connections', type=int, default=100, help="The maximum connections per host. Default is 100.")
+@click.option('--timeout', type=float, default=30.0, help="The timeout of each request in seconds. Default is 30.")
+@click.option('--seed', type=int, default=None, help="The seed of the weighted scenario mix.")
+@click.option(
+    '--metrics-dir',
+    type=click.Path(file_okay=False, writable=True),
+    default=None,
+    help="The directory metrics.prom and metrics.json are written to during and after the run.",
+)
+@click.option(
+    '--metrics-interval', type=float, default=10.0, help="The seconds between metrics exports. Default is 10."
+)
+def load(
+    environment_name: str,
+    rate: float,
+    duration: float,
+    ramp_up: float,
+    tags: str,
+    connections: int,
+    timeout: float,
+    seed: int,
+    metrics_dir: str,
+    metrics_interval: float,
+) -> None:
+    """Replay scenarios at a target request rate, weighted by their load_weight meta."""
+    from routestpy.core.application import Application
+    from routestpy.runner.load_runner import LoadProfile
+    from routestpy.runner.load_runner import LoadRunner
+    from routestpy.runner.load_runner import describe_latency
+    from routestpy.runner.metrics import MetricsRegistry
+    from routestpy.runner.scenario_request import base_url
+
+    try:
+        profile = LoadProfile(rate, duration, ramp_up)
+    except ValueError as e:
+        raise click.BadParameter(str(e)) from e
+
+    app = Application(Path.cwd(), environment=environment_name)
+    if tags:
+        scenarios = app.filter_by_tags(tags)
+    else:
+        app.collect_scenarios()
+        scenarios = app.scenario_collection
+    scenarios = app.materialize(scenarios)
+
+    metrics = MetricsRegistry()
+    with _metrics_exporter(metrics, metrics_dir, metrics_interval):
+        summary = LoadRunner(base_url(app), profile, connections, timeout, seed=seed, metrics=metrics).run(scenarios)
+
+    statuses = ", ".join(f"{status}: {count}" for status, count in sorted(summary.status_counts().items(), key=str))
+    click.echo(
+        f"Sent {summary.count} of {profile.expected_requests} scheduled requests in {summary.duration:.2f}s "
+        f"({summary.count / summary.duration:.0f}/s), {summary.errors} errors, {summary.dropped} dropped. "
+        f"Status codes: {statuses or 'none'}."
+    )
+    click.echo(f"Latency from scheduled send time: {describe_latency(summary)}.")
+
+
+@cli.command()
+@click.option(
+    '-e',
+    '--environment-name',
+    type=str,
+    required=True,
+    help="The name of the environment against which the scenarios need to run.",
+)
+@click.option('--run', 'run_affected', is_flag=True, default=False, help="Run the affected scenarios on every change.")
+@click.option(
+    '-t',
+    '--tags',
+    type=str,
+    default=None,
+    help="The tag expression limiting the scenarios run on change, ex. 'smoke AND NOT slow'.",
+)
+@click.option(
+    '-p', '--parallel-count', type=int, default=10, help="The number of scenarios to run in parallel. Default is 10."
+)
+@click.option('--timeout', type=float, default=30.0, help="The timeout of each request in seconds. Default is 30.")
+@click.option(
+    '--poll', is_flag=True, default=None, help="Poll for changes instead of using inotify, ex. on network file systems."
+)
+@click.option(
+    '--poll-interval', type=float, default=0.5, help="The seconds between two scans when polling. Default is 0.5."
+)
+def watch(
+    environment_name: str,
+    run_affected: bool,
+    tags: str,
+    parallel_count: int,
+    timeout: float,
+    poll: bool,
+    poll_interval: float,
+) -> None:
+    """Keep the project loaded, reload what changes on disk and optionally re-run the affected scenarios."""
+    from routestpy.core.application import Application
+    from routestpy.core.project_watcher import ProjectWatcher
+    from routestpy.core.tag_expression import compile_expression
+    from routestpy.runner.async_runner import AsyncRunner
+    from routestpy.runner.metrics import MetricsRegistry
+    from routestpy.runner.scenario_request import base_url
+
+    if parallel_count < 1:
+        raise click.BadParameter("must be at least 1", param_hint="'--parallel-count'")
+    expression = compile_expression(tags) if tags else None
+
+    app = Application(Path.cwd(), environment=environment_name)
+    with ProjectWatcher(app, polling=poll, interval=poll_interval) as watcher:
+        click.echo(f"Watching {len(app.routes)} routes. Press Ctrl+C to stop.")
+        try:
+            while True:
+                changed = watcher.changes()
+                if not changed:
+                    continue
+                result = watcher.apply(changed)
+                for error in result.errors:
+                    click.echo(f"ERROR {error}")
+                click.echo(
+                    f"{len(result.changed)} files changed, {result.reloaded} reloaded"
+                    f"{' (full reload)' if result.full else ''}, {len(result.affected)} scenarios affected "
+                    f"in {result.duration * 1000:.1f}ms."
+                )
+
+                scenarios = result.affected
+                if expression is not None:
+                    scenarios = [scenario for scenario in scenarios if expression(scenario)]
+                if run_affected and scenarios:
+                    metrics = MetricsRegistry()
+                    runner = AsyncRunner(base_url(watcher.app), parallel_count, timeout, metrics=metrics)
+                    _echo_summary(runner.run(watcher.app.materialize(scenarios)), metrics)
+        except KeyboardInterrupt:
+            pass
+
+
+def _metrics_exporter(metrics, metrics_dir: str, interval: float):
+    from routestpy.runner.metrics import MetricsExporter
+
+    if not metrics_dir:
+        return nullcontext()
+    return MetricsExporter(metrics, Path(metrics_dir), interval)
+
+
+def _echo_summary(summary, metrics, hooks=None) -> None:
+    from routestpy.runner.hooks import describe_hooks
+
+    for result in summary.results:
+        if result.error is not None:
+            click.echo(f"ERROR {result.name}: {result.method} {result.url}: {result.error}")
+    statuses = ", ".join(f"{status}: {count}" for status, count in sorted(summary.status_counts().items(), key=str))
+    click.echo(
+        f"Ran {summary.count} scenarios in {summary.duration:.2f}s "
+        f"({summary.requests_per_second:.0f}/s), {summary.errors} errors. Status codes: {statuses or 'none'}."
+    )
+    latency = metrics.total_latency()
+    click.echo(
+        f"Latency: p50 {latency.percentile(50) * 1000:.1f}ms, p95 {latency.percentile(95) * 1000:.1f}ms, "
+        f"p99 {latency.percentile(99) * 1000:.1f}ms, max {latency.max / 1000:.1f}ms."
+    )
+    connections = summary.connections
+    click.echo(
+        f"Connections: {connections.get('opened', 0)} opened, {connections.get('reused', 0)} reused, "
+        f"{connections.get('retried', 0)} retried, {connections.get('waited', 0)} waits for a free connection."
+    )
+    for line in describe_hooks(hooks):
+        click.echo(f"Hook {line}.")
 
 
 if __name__ == "main":
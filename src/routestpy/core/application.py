@@ -2,12 +2,24 @@ import os
 from pathlib import Path
 from typing import Any
 from typing import Dict
+from typing import Iterable
 from typing import List
+from typing import Optional
 
 from .base_yaml_schema import BaseYamlSchema
-from .tag import Tag
+from .dependency_graph import ScenarioGraph
+from .dependency_graph import check_dependency_fields
+from .inheritance import hook_layer
+from .inheritance import meta_layer
+from .inheritance import parameter_layers
+from .scenario_spec import ScenarioSpec
+from .scenario_spec import SpecInterner
+from .tag_expression import compile_expression
+from .tag_index import TagIndex
 from routestpy import ConfigLoader
 
+LAZY_SCENARIOS_ENV = "ROUTESTPY_LAZY_SCENARIOS"
+
 
 class BaseApplication(BaseYamlSchema):
     """
@@ -16,28 +28,40 @@ class BaseApplication(BaseYamlSchema):
     specified by data_path.
     """
 
-    def __init__(self, app_yaml_path: str) -> None:
+    SCHEMA_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../schema/app_schema.yaml"))
+
+    def __init__(self, app_yaml_path: str, data: Optional[dict] = None, environment: Optional[str] = None) -> None:
         """
         Initializes BaseApplication instance with schema and data file paths.
 
         Args:
         - data_path (str): Path to the data file.
+        - data (Optional[dict]): Already loaded and validated application data.
+        - environment (Optional[str]): Name of the config file to load, defaults to ENV_VAR_NAME.
 
         Returns: None
         """
         from .route import Route
 
-        schema_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../schema/app_schema.yaml"))
         self.routes: List[Route] = []
         self.scenario_collection: List[Any] = []
-        self.environment: str = ""  # Represents the environment of the application.
+        self.tag_index: Optional[TagIndex] = None  # Built from scenario_collection on first use
+        self.config_loader = ConfigLoader(environment)
+        self.environment: str = self.config_loader.env  # Represents the environment of the application.
         self.host: str = ""  # Represents the host on which the application is running.
         # self.config: Dict[str, Any] = {}  # Represents the configuration parameters of the application.
         self.params: Dict[str, Any] = {}  # Represents the input parameters of the application.
         self.hooks: Dict[str, Any] = {}  # Represents the hooks of the application.
         self.register: Dict[str, Any] = {}  # Represents the registered components of the application.
-        self.config = ConfigLoader().load()
-        super().__init__(schema_path, app_yaml_path)
+        self.config = self.config_loader.load()
+        super().__init__(self.SCHEMA_PATH, app_yaml_path, data)
+
+        # The app parameters, meta and hooks are the root layers routes and scenarios inherit from
+        self.app = self.data["app"] = dict(self.app)
+        check_dependency_fields(self.app.get("meta") or {}, app_yaml_path)
+        self.app["parameters"] = parameter_layers(self.app.get("parameters") or {})
+        self.app["meta"] = meta_layer(self.app.get("meta") or {})
+        self.app["hooks"] = hook_layer(self.app.get("hooks") or [])
 
     def find_routes(self, base_path: Path) -> List[Path]:
         """
@@ -65,40 +89,61 @@ class BaseApplication(BaseYamlSchema):
         Visits every route using self.routes list, then visits every scenario of the route
         using self.scenarios and copies this scenario to applications self.scenario_collection.
         """
-        for route in self.routes:
-            for scenario in route.scenarios:
-                self.scenario_collection.append(scenario)
+        self.scenario_collection = [scenario for route in self.routes for scenario in route.scenarios]
+
+    def get_tag_index(self) -> TagIndex:
+        """
+        Returns the inverted index of scenario meta, building it on first use.
+
+        Returns:
+            TagIndex: The index over self.scenario_collection.
+        """
+        if self.tag_index is None:
+            self.collect_scenarios()
+            self.tag_index = TagIndex(self.scenario_collection)
+        return self.tag_index
+
+    def invalidate_tag_index(self) -> None:
+        """
+        Drops the tag index, to be called whenever routes or scenarios change.
+        """
+        self.tag_index = None
 
     def filter_by_tags(self, tag_str: str) -> List[Any]:
-        self.collect_scenarios()
+        """
+        Returns the scenarios matching a tag expression, in collection order.
 
-        print(f"\n Origional Collection - \n {self.scenario_collection} \n")
-
-        if tag_str.startswith("IS"):
-            tag_str = tag_str.replace("IS", "", 1)
-            tag_str = tag_str.replace(" ", "")
-            return Tag.IS(tag_str, self.scenario_collection)
-        elif tag_str.startswith("IS NOT"):
-            tag_str = tag_str.replace("IS NOT", "", 1)
-            tag_str = tag_str.replace(" ", "")
-            return Tag.IS_NOT(tag_str, self.scenario_collection)
-        elif " OR " in tag_str:
-            tag1, tag2 = (s.strip() for s in tag_str.split("OR"))
-            print(f"{tag1} {tag2}")
-            return Tag.OR(tag1, tag2, self.scenario_collection)
-        elif " AND " in tag_str:
-            tag1, tag2 = (s.strip() for s in tag_str.split("AND"))
-            return Tag.AND(tag1, tag2, self.scenario_collection)
-        elif tag_str.startswith("IN"):
-            tags_content = tag_str.split("[")[1].split("]")[0]
-            items = tags_content.split(",")
-            tags_list = [item.strip() for item in items]
-            return Tag.IN(tags_list=tags_list, scenario_collection=self.scenario_collection)
-        elif tag_str.startswith("NOT IN"):
-            tags_content = tag_str.split("[")[1].split("]")[0]
-            items = tags_content.split(",")
-            tags_list = [item.strip() for item in items]
-            return Tag.NOT_IN(tags_list=tags_list, scenario_collection=self.scenario_collection)
+        Args:
+            tag_str (str): The tag expression, e.g. `smoke AND NOT slow` or `component == "billing"`,
+                see routestpy.core.tag_expression for the grammar.
+
+        Returns:
+            List[Any]: The matching scenarios.
+
+        Raises:
+            TagExpressionError: If the expression is invalid.
+        """
+        return compile_expression(tag_str).select(self.get_tag_index())
+
+    def dependency_graph(self, scenarios: Optional[Iterable[Any]] = None) -> ScenarioGraph:
+        """
+        Returns the dependency graph of scenarios, built from their `produces` and `consumes` meta.
+        Only scenario headers are needed, so lazy scenarios are not materialized.
+
+        Args:
+            scenarios (Optional[Iterable[Any]]): The selected scenarios, every scenario by default. The
+                producers they need are added from the whole collection.
+
+        Returns:
+            ScenarioGraph: The checked graph.
+
+        Raises:
+            DependencyError: If a consumed value has no producer or the dependencies contain a cycle.
+        """
+        self.collect_scenarios()
+        if scenarios is None:
+            scenarios = self.scenario_collection
+        return ScenarioGraph(scenarios, self.scenario_collection)
 
 
 class Application(BaseApplication):
@@ -108,37 +153,177 @@ class Application(BaseApplication):
     file specified by data_path.
     """
 
-    def __init__(self, project_path: Path) -> None:
+    def __init__(
+        self,
+        project_path: Path,
+        workers: Optional[int] = None,
+        executor: Optional[str] = None,
+        snapshot: Optional[bool] = None,
+        lazy: Optional[bool] = None,
+        environment: Optional[str] = None,
+    ) -> None:
         """
         Initializes Application instance with data file paths.
 
+        Route and scenario files are parsed and validated in parallel, then every route and
+        scenario is built in order and merged with its parent data. Files which did not change
+        since the previous run are read from the project snapshot instead.
+
+        Scenarios are lazy by default: only their name and meta are read here, and they are
+        validated and merged when first used or passed to materialize().
+
         Args:
         - data_path (Path): Path to the data file.
+        - workers (Optional[int]): Number of load workers, see ProjectLoader.
+        - executor (Optional[str]): "thread" or "process", see ProjectLoader.
+        - snapshot (Optional[bool]): Whether to use the project snapshot, defaults to ROUTESTPY_SNAPSHOT.
+        - lazy (Optional[bool]): Whether scenarios are loaded lazily, defaults to ROUTESTPY_LAZY_SCENARIOS.
+        - environment (Optional[str]): Name of the config file to load, defaults to ENV_VAR_NAME.
 
         Returns: None
         """
-        from .route import Route
+        from .project_loader import ProjectLoader
+        from .snapshot import ProjectSnapshot
+        from .snapshot import snapshot_enabled
+
+        project_path = Path(project_path)
+        if snapshot is None:
+            snapshot = snapshot_enabled()
+        if lazy is None:
+            lazy = os.getenv(LAZY_SCENARIOS_ENV, default="1").lower() not in ("0", "false", "no", "off")
+        self.snapshot: Optional[ProjectSnapshot] = ProjectSnapshot(project_path) if snapshot else None
+        self.loader = loader = ProjectLoader(workers, executor, self.snapshot)
 
         APP_YAML_PATH = project_path.joinpath('app', 'app.yaml')
-        super().__init__(APP_YAML_PATH)
+        super().__init__(APP_YAML_PATH, loader.load(self.SCHEMA_PATH, [APP_YAML_PATH])[0], environment)
         self.project_path = Path(project_path)
         self.app_yaml_path = Path(APP_YAML_PATH)
         self.app_routes_path = self.project_path.joinpath('routes')
         routes_list = self.find_routes(self.app_routes_path)
 
-        for route_path in routes_list:
-            route_yaml = route_path.joinpath('route.yaml')
-            self.routes.append(Route.new_route(self, route_yaml))
+        self.lazy = lazy
+        self.routes = self.load_routes([route_path.joinpath('route.yaml') for route_path in routes_list])
+        self.save_snapshot()
+
+    def load_routes(self, route_yamls: List[Path]) -> List[Any]:
+        """
+        Loads and validates route files and builds the routes and their scenarios, merged with this
+        application. Lazy scenarios found in the snapshot are validated, the others only get a header.
+
+        Args:
+        - route_yamls (List[Path]): Paths to the route.yaml files.
+
+        Returns:
+        A list of the Route objects, in the order of route_yamls.
+        """
+        from .route import Route
+        from .route import scenario_paths
+        from .scenario import Scenario
+
+        loader = self.loader
+        routes_data = loader.load(Route.SCHEMA_PATH, route_yamls)
+
+        routes_scenario_paths = [scenario_paths(path, data["route"]) for path, data in zip(route_yamls, routes_data)]
+        all_scenario_paths = [p for paths in routes_scenario_paths for p in paths]
+        scenarios_headers: List[Optional[dict]] = []
+        if self.lazy:
+            scenarios_data = loader.cached(all_scenario_paths)
+            missing = [path for path, data in zip(all_scenario_paths, scenarios_data) if data is None]
+            headers = iter(loader.headers(missing))
+            scenarios_headers = [next(headers) if data is None else None for data in scenarios_data]
+        else:
+            scenarios_data = loader.load(Scenario.SCHEMA_PATH, all_scenario_paths)
+
+        routes = []
+        offset = 0
+        for route_yaml, route_data, paths in zip(route_yamls, routes_data, routes_scenario_paths):
+            route_scenarios = slice(offset, offset + len(paths))
+            offset += len(paths)
+            routes.append(
+                Route.new_route(
+                    self,
+                    route_yaml,
+                    route_data,
+                    scenarios_data[route_scenarios],
+                    scenarios_headers[route_scenarios] if self.lazy else None,
+                )
+            )
+        return routes
+
+    def materialize(self, scenarios: Iterable[Any]) -> List[Any]:
+        """
+        Validates and merges every lazy scenario of scenarios, loading their files in parallel.
+
+        Args:
+        - scenarios (Iterable[Any]): Scenario or LazyScenario objects, e.g. the result of filter_by_tags.
+
+        Returns:
+        A list of the corresponding Scenario objects.
+        """
+        from .scenario import LazyScenario
+        from .scenario import Scenario
+
+        scenarios = list(scenarios)
+        pending = [s for s in scenarios if isinstance(s, LazyScenario) and not s.is_materialized()]
+        if pending:
+            scenarios_data = self.loader.load(Scenario.SCHEMA_PATH, [s.data_path for s in pending])
+            for scenario, data in zip(pending, scenarios_data):
+                scenario.materialize(data)
+            self.save_snapshot()
+
+        return [s.materialize() if isinstance(s, LazyScenario) else s for s in scenarios]
+
+    def specs(self, scenarios: Optional[Iterable[Any]] = None) -> List[ScenarioSpec]:
+        """
+        Returns compact, immutable specs of scenarios, which keep no reference to the scenario
+        data, schema or parents, so the application can be dropped once they are built.
+
+        Args:
+        - scenarios (Optional[Iterable[Any]]): Scenario or LazyScenario objects, every scenario by default.
+
+        Returns:
+        A list of the corresponding ScenarioSpec objects.
+        """
+        if scenarios is None:
+            self.collect_scenarios()
+            scenarios = self.scenario_collection
+        interner = SpecInterner()
+        return [ScenarioSpec.from_scenario(scenario, interner) for scenario in self.materialize(scenarios)]
+
+    def save_snapshot(self) -> None:
+        """
+        Writes the project snapshot, if enabled.
+
+        Returns: None
+        """
+        if self.snapshot is not None:
+            try:
+                self.snapshot.save()
+            except OSError as e:
+                print("Could not write the project snapshot:", e)
 
     @classmethod
-    def create_application(cls, project_path: str) -> "Application":
+    def create_application(
+        cls,
+        project_path: str,
+        workers: Optional[int] = None,
+        executor: Optional[str] = None,
+        snapshot: Optional[bool] = None,
+        lazy: Optional[bool] = None,
+        environment: Optional[str] = None,
+    ) -> "Application":
         """
         Creates an Application instance with the specified data file.
 
         Args:
         - data_path (str): Path to the data file.
+        - workers (Optional[int]): Number of load workers, see ProjectLoader.
+        - executor (Optional[str]): "thread" or "process", see ProjectLoader.
+        - snapshot (Optional[bool]): Whether to use the project snapshot, defaults to ROUTESTPY_SNAPSHOT.
+        - lazy (Optional[bool]): Whether scenarios are loaded lazily, defaults to ROUTESTPY_LAZY_SCENARIOS.
+        - environment (Optional[str]): Name of the config file to load, defaults to ENV_VAR_NAME.
 
         Returns:
         An Application instance.
         """
-        return cls(Path(project_path))
+        return cls(Path(project_path), workers, executor, snapshot, lazy, environment)
@@ -1,10 +1,17 @@
-import json
+import os
 from pathlib import Path
+from typing import Optional
+from typing import Set
 
 import jsonschema
-import yaml
 from jsonschema.exceptions import ValidationError
 
+from routestpy.loaders.yaml_reader import load_file
+
+from .ref_resolver import ref_resolver
+from .schema_registry import schema_registry
+from .validators import get_validator_engine
+
 
 class BaseYamlSchema:
     """
@@ -17,13 +24,15 @@ class BaseYamlSchema:
         resolved_data (dict): The resolved YAML data object with all `$ref` keys resolved.
     """
 
-    def __init__(self, schema_path: Path, data_path: Path) -> None:
+    def __init__(self, schema_path: Path, data_path: Path, data: Optional[dict] = None) -> None:
         """
         Initializes a BaseYamlSchema instance with a schema file path and a data file path.
 
         Args:
             schema_path (str): The path to the schema file.
             data_path (str): The path to the data file.
+            data (Optional[dict]): Data already loaded from data_path and validated against the
+                schema, e.g. by the parallel project loader. The file is not read again if given.
 
         Raises:
             ValueError: If the schema or data path is invalid.
@@ -32,18 +41,22 @@ class BaseYamlSchema:
         schema_path = Path(schema_path)
         data_path = Path(data_path)
         self.data_path = data_path
+        self.dependencies: Set[str] = set()  # Files the data was loaded from, filled by load_data
 
         if not schema_path.exists():
             raise ValueError(f"Invalid schema path: {schema_path}")
 
-        self.schema = self.load_schema(schema_path)
-        self.is_valid_schema(self.schema)
+        # Schemas are loaded, resolved and meta-validated once per process
+        self.schema = schema_registry.get(schema_path, self.compile_schema)
 
-        if not data_path.exists():
-            raise ValueError(f"Invalid data path: {data_path}")
+        if data is not None:
+            self.data = data
+        else:
+            if not data_path.exists():
+                raise ValueError(f"Invalid data path: {data_path}")
 
-        self.data = self.load_data(data_path)
-        self.is_valid_data(self.data, self.schema)
+            self.data = self.load_data(data_path)
+            self.is_valid_data(self.data, self.schema)
 
         # Add dynamic properties to the class based on the schema
         for prop, val in self.schema["properties"].items():
@@ -54,12 +67,13 @@ class BaseYamlSchema:
             if hasattr(self, prop):
                 setattr(self, prop, val)
 
-    def load_schema(self, schema_path: Path) -> dict:
+    def load_schema(self, schema_path: Path, dependencies: Optional[Set[str]] = None) -> dict:
         """
         Loads the schema from the given schema path and resolves all `$ref` keys.
 
         Args:
             schema_path (Path): The path to the schema file.
+            dependencies (Optional[Set[str]]): If given, receives the path of every referenced file.
 
         Returns:
             dict: The resolved schema data.
@@ -67,10 +81,24 @@ class BaseYamlSchema:
         Raises:
             ValueError: If the schema is invalid.
         """
-        with open(schema_path) as f:
-            schema_data = yaml.safe_load(f)
+        schema_data = load_file(schema_path)
+
+        return self.resolve_schema_ref(schema_path.parent, schema_data, schema_path, dependencies)
+
+    def compile_schema(self, schema_path: Path, dependencies: Optional[Set[str]] = None) -> dict:
+        """
+        Loads the schema from the given schema path and validates it against its meta-schema.
 
-        return self.resolve_schema_ref(schema_path.parent, schema_data)
+        Args:
+            schema_path (Path): The path to the schema file.
+            dependencies (Optional[Set[str]]): If given, receives the path of every referenced file.
+
+        Returns:
+            dict: The resolved schema data.
+        """
+        schema = self.load_schema(schema_path, dependencies)
+        self.is_valid_schema(schema)
+        return schema
 
     def load_data(self, data_path: Path) -> dict:
         """
@@ -82,76 +110,61 @@ class BaseYamlSchema:
         Returns:
             dict: The YAML data object to be validated.
         """
-        with open(data_path) as f:
-            data = yaml.safe_load(f)
-
-        return self.resolve_data_ref(data_path.parent, data)
-
-    def resolve_schema_ref(self, base_path: Path, schema: dict) -> dict:
+        data = load_file(data_path)
+
+        self.dependencies = {os.path.abspath(data_path)}
+        return self.resolve_data_ref(data_path.parent, data, data_path, self.dependencies)
+
+    def resolve_schema_ref(
+        self,
+        base_path: Path,
+        schema: dict,
+        document_path: Optional[Path] = None,
+        dependencies: Optional[Set[str]] = None,
+    ) -> dict:
         """
         Recursively resolves all `$ref` keys in a JSON/YAML schema.
 
         Args:
             base_path (Path): The base path to resolve relative paths.
             schema (dict): The schema to resolve.
+            document_path (Optional[Path]): The path of the document, used to resolve `#` references.
+            dependencies (Optional[Set[str]]): If given, receives the path of every referenced file.
 
         Returns:
             dict: The resolved schema.
 
         Raises:
-            ValueError: If the file extension of the `$ref` path is not supported.
-        """
-        if not isinstance(schema, dict):
-            return schema
-        for key, value in schema.items():
-            if key == "$ref":
-                ref_path = value
-                if ref_path.startswith("./"):
-                    ref_path = str(Path(base_path).joinpath(ref_path).resolve())
-                with open(ref_path) as f:
-                    if ref_path.endswith(".json"):
-                        ref_schema = json.load(f)
-                    elif ref_path.endswith(".yaml") or ref_path.endswith(".yml"):
-                        ref_schema = yaml.safe_load(f)
-                    else:
-                        raise ValueError("Invalid file extension: " + ref_path)
-                    return self.resolve_schema_ref(Path(ref_path).parent, ref_schema)
-            elif isinstance(value, dict):
-                schema[key] = self.resolve_schema_ref(base_path, value)
-        return schema
-
-    def resolve_data_ref(self, base_path: Path, data: dict) -> dict:
+            ValueError: If a `$ref` is circular, cannot be resolved or its file extension is not supported.
+        """
+        return ref_resolver.resolve(base_path, schema, dependencies, document_path)
+
+    def resolve_data_ref(
+        self,
+        base_path: Path,
+        data: dict,
+        document_path: Optional[Path] = None,
+        dependencies: Optional[Set[str]] = None,
+    ) -> dict:
         """
         Recursively resolves all `$ref` keys in a JSON/YAML data.
 
+        Referenced subtrees are shared between all documents referring to them, so they must
+        not be modified in place.
+
         Args:
             base_path (Path): The base path to resolve relative paths.
             data (dict): The data to resolve.
+            document_path (Optional[Path]): The path of the document, used to resolve `#` references.
+            dependencies (Optional[Set[str]]): If given, receives the path of every referenced file.
 
         Returns:
             dict: The resolved data.
 
         Raises:
-            ValueError: If the file extension of the `$ref` path is not supported.
-        """
-        if not isinstance(data, dict):
-            return data
-        for key, value in data.items():
-            if key == "$ref":
-                ref_path = value
-                if ref_path.startswith("./"):
-                    ref_path = str(Path(base_path).joinpath(ref_path).resolve())
-                with open(ref_path) as f:
-                    if ref_path.endswith(".json"):
-                        ref_data = json.load(f)
-                    elif ref_path.endswith(".yaml") or ref_path.endswith(".yml"):
-                        ref_data = yaml.safe_load(f)
-                    else:
-                        raise ValueError("Invalid file extension: " + ref_path)
-                    return self.resolve_data_ref(Path(ref_path).parent, ref_data)
-            elif isinstance(value, dict):
-                data[key] = self.resolve_data_ref(base_path, value)
-        return data
+            ValueError: If a `$ref` is circular, cannot be resolved or its file extension is not supported.
+        """
+        return ref_resolver.resolve(base_path, data, dependencies, document_path)
 
     def is_valid_schema(self, schema_data: dict) -> bool:
         """
@@ -177,8 +190,9 @@ class BaseYamlSchema:
         Raises:
             ValueError: If the data is invalid.
         """
-        # Validate the stored data against the schema
+        # Validate the stored data against the schema with the configured validator engine,
+        # which compiles each schema once and reuses the result
         try:
-            jsonschema.validate(data, schema)
+            get_validator_engine().validate(data, schema)
         except ValidationError as e:
             raise ValueError(f"Invalid data: {str(e)}")
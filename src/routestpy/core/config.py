@@ -1,2 +1,158 @@
-class Config:
-    pass
+"""
+Immutable configuration of an environment, built from layers: the base config file, the config
+file of the environment, then the ROUTESTPY_CONFIG_* environment variables, each overriding the
+keys of the previous ones.
+"""
+import os
+from collections import abc
+from typing import Any
+from typing import Dict
+from typing import Iterator
+from typing import Mapping
+from typing import Optional
+from typing import Tuple
+
+from yaml import YAMLError
+
+from routestpy.loaders.yaml_reader import safe_load
+
+CONFIG_ENV_PREFIX = "ROUTESTPY_CONFIG_"
+
+
+class Config(abc.Mapping):
+    """
+    Config class represents a frozen configuration mapping. Keys are read as items or as
+    attributes, e.g. `config.host`; nested mappings are wrapped in Config and lists turned into
+    tuples on first access only, so configs cached across applications are never copied nor
+    modified.
+    """
+
+    __slots__ = ("_data", "_wrapped")
+
+    def __init__(self, data: Optional[Mapping[str, Any]] = None) -> None:
+        """
+        Initializes Config instance over data, which must not be modified afterwards.
+
+        Args:
+            data (Optional[Mapping[str, Any]]): The configuration data.
+
+        Returns: None
+        """
+        object.__setattr__(self, "_data", data if data is not None else {})
+        object.__setattr__(self, "_wrapped", {})
+
+    def __getitem__(self, key: str) -> Any:
+        wrapped = self._wrapped
+        if key in wrapped:
+            return wrapped[key]
+        value = wrapped[key] = _wrap(self._data[key])
+        return value
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for names which are not attributes, i.e. for the configuration keys
+        if name.startswith("__"):
+            raise AttributeError(name)
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(f"Config has no key {name!r}") from None
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"Config is immutable, cannot set {name}")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"Config is immutable, cannot delete {name}")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __reduce__(self) -> Tuple[Any, Tuple[Any, ...]]:
+        return (self.__class__, (self.to_dict(),))
+
+    def __repr__(self) -> str:
+        return f"Config({self.to_dict()!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns a mutable deep copy of the configuration.
+
+        Returns:
+            Dict[str, Any]: The configuration, with lists and mappings copied.
+        """
+        return _copy(self._data)
+
+
+def _wrap(value: Any) -> Any:
+    if isinstance(value, abc.Mapping):
+        return Config(value)
+    if isinstance(value, list):
+        return tuple(_wrap(item) for item in value)
+    return value
+
+
+def _copy(value: Any) -> Any:
+    if isinstance(value, abc.Mapping):
+        return {key: _copy(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_copy(item) for item in value]
+    return value
+
+
+def merge_layers(*layers: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Merges configuration layers, later layers overriding earlier ones. Mappings are merged key by
+    key, any other value replaces the previous one. The layers are not modified.
+
+    Args:
+        *layers (Mapping[str, Any]): The layers, from lowest to highest precedence.
+
+    Returns:
+        Dict[str, Any]: The merged configuration, sharing the unmerged values of the layers.
+    """
+    merged: Dict[str, Any] = {}
+    for layer in layers:
+        for key, value in layer.items():
+            previous = merged.get(key)
+            if isinstance(previous, abc.Mapping) and isinstance(value, abc.Mapping):
+                value = merge_layers(previous, value)
+            merged[key] = value
+    return merged
+
+
+def environment_layer(environ: Optional[Mapping[str, str]] = None, prefix: str = CONFIG_ENV_PREFIX) -> Dict[str, Any]:
+    """
+    Returns the configuration layer defined by environment variables, without modifying them.
+    `ROUTESTPY_CONFIG_HOST` sets the `host` key and `ROUTESTPY_CONFIG_DB__PORT` the `port` key of
+    the `db` mapping; values are parsed as YAML scalars, so numbers and booleans keep their type.
+
+    Args:
+        environ (Optional[Mapping[str, str]]): The environment variables, os.environ by default.
+        prefix (str): The prefix of the configuration variables.
+
+    Returns:
+        Dict[str, Any]: The layer, empty without configuration variables.
+    """
+    if environ is None:
+        environ = os.environ
+    layer: Dict[str, Any] = {}
+    for name in sorted(name for name in environ if name.startswith(prefix) and len(name) > len(prefix)):
+        text = environ[name]
+        keys = name[len(prefix) :].lower().split("__")
+        target = layer
+        for key in keys[:-1]:
+            if not isinstance(target.get(key), dict):
+                target[key] = {}
+            target = target[key]
+        target[keys[-1]] = _scalar(text)
+    return layer
+
+
+def _scalar(text: str) -> Any:
+    try:
+        value = safe_load(text)
+    except YAMLError:
+        return text
+    return value if isinstance(value, (str, int, float, bool)) else text
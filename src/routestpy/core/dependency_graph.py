@@ -0,0 +1,255 @@
+"""
+Dependencies between scenarios, declared in their meta.
+
+A scenario lists the values it registers for later scenarios under `produces`, and the values it
+needs under `consumes`::
+
+    meta:
+      produces: [token=data.access_token, first_id=$.0.id, user_id]
+      consumes: [tenant_id]
+
+A produced value is read from the JSON body of the response, at the dot separated path after `=`
+or at the top-level key named like the value; a path may start at `$`, the body itself. Consumers
+use it through `{{name}}` placeholders in their headers, path variables, query parameters and body.
+Only scenarios declare dependencies: app and route meta, which scenarios inherit, may not.
+"""
+import re
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Mapping
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+PLACEHOLDER_RE = re.compile(r"\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}")
+
+# Meta fields only scenarios may declare
+DEPENDENCY_FIELDS = ("produces", "consumes")
+
+
+class DependencyError(ValueError):
+    """Raised for scenario dependencies which cannot be satisfied: a cycle, or a missing or ambiguous producer."""
+
+
+def check_dependency_fields(meta: Mapping[str, Any], data_path: Any) -> None:
+    """
+    Checks that app or route meta declares no dependencies. Scenarios inherit the list fields of
+    the meta above them, so every scenario of a route would produce or consume the same values.
+
+    Args:
+        meta (Mapping[str, Any]): The own meta of the app or route.
+        data_path (Any): The file the meta comes from, for the error message.
+
+    Raises:
+        DependencyError: If the meta declares produces or consumes.
+    """
+    fields = [field for field in DEPENDENCY_FIELDS if field in meta]
+    if fields:
+        raise DependencyError(f"{' and '.join(fields)} can only be declared in scenario meta, found in {data_path}")
+
+
+def produced_values(scenario: Any) -> List[Tuple[str, str]]:
+    """
+    Returns the values a scenario produces.
+
+    Args:
+        scenario (Any): A Scenario, LazyScenario or ScenarioSpec instance.
+
+    Returns:
+        List[Tuple[str, str]]: The name of every value and its path in the response body.
+    """
+    values = []
+    for item in scenario.get_meta().get("produces") or ():
+        name, _, path = item.partition("=")
+        values.append((name.strip(), path.strip() or name.strip()))
+    return values
+
+
+def consumed_values(scenario: Any) -> Tuple[str, ...]:
+    """
+    Returns the names of the values a scenario consumes.
+
+    Args:
+        scenario (Any): A Scenario, LazyScenario or ScenarioSpec instance.
+
+    Returns:
+        Tuple[str, ...]: The value names.
+    """
+    return tuple(scenario.get_meta().get("consumes") or ())
+
+
+def extract_value(data: Any, path: str) -> Any:
+    """
+    Returns the value at a dot separated path of JSON data, list items being addressed by index.
+    A leading `$` stands for data itself.
+
+    Args:
+        data (Any): The decoded JSON body.
+        path (str): The path, e.g. `data.items.0.id`, `$.data.items.0.id`, or `$` for the whole body.
+
+    Returns:
+        Any: The value.
+
+    Raises:
+        KeyError: If the path does not exist in data.
+    """
+    parts = path.split(".")
+    if parts[0] == "$":
+        parts = parts[1:]
+    for part in parts:
+        if isinstance(data, dict) and part in data:
+            data = data[part]
+        elif isinstance(data, list) and part.lstrip("-").isdigit() and -len(data) <= int(part) < len(data):
+            data = data[int(part)]
+        else:
+            raise KeyError(path)
+    return data
+
+
+def substitute(value: Any, values: Mapping[str, Any]) -> Any:
+    """
+    Returns value with the `{{name}}` placeholders of its strings replaced by registered values.
+    A string which is a single placeholder is replaced by the value itself, keeping its JSON type.
+
+    Args:
+        value (Any): A parameter value or request body.
+        values (Mapping[str, Any]): The registered values; unknown placeholders are left as they are.
+
+    Returns:
+        Any: The substituted value, value itself if it has no placeholder.
+    """
+    if isinstance(value, str):
+        if "{{" not in value:
+            return value
+        match = PLACEHOLDER_RE.fullmatch(value.strip())
+        if match is not None and match.group(1) in values:
+            return values[match.group(1)]
+        return PLACEHOLDER_RE.sub(lambda m: str(values[m.group(1)]) if m.group(1) in values else m.group(0), value)
+    if isinstance(value, dict):
+        return {key: substitute(item, values) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [substitute(item, values) for item in value]
+    return value
+
+
+def scenario_label(scenario: Any) -> str:
+    return f"{scenario.get_name()} ({scenario.data_path})"
+
+
+class ScenarioGraph:
+    """
+    ScenarioGraph class represents the dependency DAG of a suite: a scenario depends on the
+    producers of the values it consumes. The graph is checked when built, so that cycles and
+    missing producers are reported before any request is sent.
+
+    Attributes:
+        scenarios (List[Any]): The scenarios, a node being the position of its scenario in this list.
+        producers (Dict[str, int]): The node producing every value.
+        dependencies (List[Tuple[int, ...]]): The nodes every node waits for.
+        dependents (List[List[int]]): The nodes waiting for every node.
+        order (List[int]): The nodes in a topological order, producers before their consumers.
+    """
+
+    def __init__(self, scenarios: Iterable[Any], available: Optional[Sequence[Any]] = None) -> None:
+        """
+        Initializes ScenarioGraph instance and checks the dependencies.
+
+        Args:
+            scenarios (Iterable[Any]): The selected scenarios.
+            available (Optional[Sequence[Any]]): Every scenario of the project. The producers a selected
+                scenario needs are taken from it when they are not selected themselves.
+
+        Returns: None
+
+        Raises:
+            DependencyError: If a value has several producers, a consumed value has none, or the
+                dependencies contain a cycle.
+        """
+        scenarios = list(scenarios)
+        if available is not None:
+            scenarios = self._with_producers(scenarios, available)
+        self.scenarios: List[Any] = scenarios
+        self.producers = self._producers(scenarios)
+
+        self.dependencies: List[Tuple[int, ...]] = []
+        self.dependents: List[List[int]] = [[] for _ in scenarios]
+        for node, scenario in enumerate(scenarios):
+            producers = []
+            for name in consumed_values(scenario):
+                producer = self.producers.get(name)
+                if producer is None:
+                    raise DependencyError(f"{scenario_label(scenario)} consumes {name!r}, which no scenario produces")
+                if producer == node:
+                    raise DependencyError(f"{scenario_label(scenario)} consumes {name!r}, which it produces itself")
+                if producer not in producers:
+                    producers.append(producer)
+            self.dependencies.append(tuple(producers))
+            for producer in producers:
+                self.dependents[producer].append(node)
+        self.order = self._topological_order()
+
+    @staticmethod
+    def _producers(scenarios: Sequence[Any]) -> Dict[str, int]:
+        producers: Dict[str, int] = {}
+        for node, scenario in enumerate(scenarios):
+            for name, _ in produced_values(scenario):
+                if name in producers and producers[name] != node:
+                    other = scenarios[producers[name]]
+                    raise DependencyError(
+                        f"{name!r} is produced by both {scenario_label(other)} and {scenario_label(scenario)}"
+                    )
+                producers[name] = node
+        return producers
+
+    @classmethod
+    def _with_producers(cls, scenarios: List[Any], available: Sequence[Any]) -> List[Any]:
+        # Adds the producers the selection needs, transitively, keeping the project order
+        producers = cls._producers(available)
+        selected = {id(scenario) for scenario in scenarios}
+        pending = list(scenarios)
+        added = False
+        while pending:
+            for name in consumed_values(pending.pop()):
+                producer = producers.get(name)
+                if producer is not None and id(available[producer]) not in selected:
+                    selected.add(id(available[producer]))
+                    pending.append(available[producer])
+                    added = True
+        if not added:
+            return scenarios
+        chosen = {id(scenario) for scenario in scenarios}
+        positions = {id(scenario): position for position, scenario in enumerate(available)}
+        scenarios = scenarios + [s for s in available if id(s) in selected and id(s) not in chosen]
+        return sorted(scenarios, key=lambda scenario: positions.get(id(scenario), len(positions)))
+
+    def _topological_order(self) -> List[int]:
+        waiting = [len(dependencies) for dependencies in self.dependencies]
+        order = [node for node, count in enumerate(waiting) if count == 0]
+        for node in order:
+            for dependent in self.dependents[node]:
+                waiting[dependent] -= 1
+                if waiting[dependent] == 0:
+                    order.append(dependent)
+        if len(order) < len(self.scenarios):
+            raise DependencyError(f"Scenario dependencies contain a cycle: {self._cycle(waiting)}")
+        return order
+
+    def _cycle(self, waiting: List[int]) -> str:
+        # Nodes left waiting are on a cycle or behind one, following their waiting producers finds it
+        node = next(node for node, count in enumerate(waiting) if count > 0)
+        path: List[int] = []
+        while node not in path:
+            path.append(node)
+            node = next(producer for producer in self.dependencies[node] if waiting[producer] > 0)
+        cycle = path[path.index(node) :] + [node]
+        return " -> ".join(scenario_label(self.scenarios[n]) for n in reversed(cycle))
+
+    @property
+    def has_dependencies(self) -> bool:
+        """Whether any scenario waits for another one."""
+        return any(self.dependencies)
+
+    def __len__(self) -> int:
+        return len(self.scenarios)
@@ -0,0 +1,291 @@
+"""
+Watches directory trees for changed files, with inotify on Linux and polling elsewhere.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+WATCH_POLLING_ENV = "ROUTESTPY_WATCH_POLLING"
+DEFAULT_POLL_INTERVAL = 0.5
+DEFAULT_SETTLE = 0.05
+
+# inotify constants, see inotify(7)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0o2000000)
+
+WATCH_MASK = (
+    IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+)
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class FileWatcher:
+    """
+    FileWatcher class represents a watcher of directory trees. Bursts of changes, such as an editor
+    writing a file in several steps, are reported together once no change happened for `settle`
+    seconds.
+
+    Attributes:
+        directories (List[Path]): The watched roots, as absolute paths.
+    """
+
+    def __init__(self, directories: Iterable[Path], settle: float = DEFAULT_SETTLE) -> None:
+        """
+        Initializes FileWatcher instance with the roots to watch.
+
+        Args:
+            directories (Iterable[Path]): The directories to watch recursively, missing ones are skipped.
+            settle (float): Seconds without changes after which a burst of changes is reported.
+
+        Returns: None
+        """
+        self.directories = [Path(os.path.abspath(directory)) for directory in directories]
+        self.settle = settle
+
+    def changes(self, timeout: Optional[float] = None) -> Set[Path]:
+        """
+        Waits for files to change.
+
+        Args:
+            timeout (Optional[float]): Seconds to wait for a first change, forever if None.
+
+        Returns:
+            Set[Path]: The absolute paths of the changed, created and deleted files, empty on timeout.
+            A watched root is reported itself when the changes could not be tracked individually.
+        """
+        changed = self._wait(timeout)
+        while changed:
+            more = self._wait(self.settle)
+            if not more:
+                break
+            changed |= more
+        return changed
+
+    def add(self, directories: Iterable[Path]) -> List[Path]:
+        """
+        Starts watching more directory trees. Missing directories and directories inside a watched
+        tree are skipped.
+
+        Args:
+            directories (Iterable[Path]): The directories to watch recursively.
+
+        Returns:
+            List[Path]: The roots added, as absolute paths.
+        """
+        added: List[Path] = []
+        for directory in directories:
+            directory = Path(os.path.abspath(directory))
+            watched = self.directories + added
+            if directory.is_dir() and not any(directory == root or root in directory.parents for root in watched):
+                added.append(directory)
+        if added:
+            self._watch(added)
+            self.directories.extend(added)
+        return added
+
+    def _wait(self, timeout: Optional[float]) -> Set[Path]:
+        raise NotImplementedError
+
+    def _watch(self, directories: List[Path]) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "FileWatcher":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class PollingWatcher(FileWatcher):
+    """
+    PollingWatcher class detects changes by comparing the modification time and size of every file
+    of the watched trees every `interval` seconds.
+    """
+
+    def __init__(self, directories: Iterable[Path], interval: float = DEFAULT_POLL_INTERVAL) -> None:
+        super().__init__(directories, settle=interval)
+        self.interval = interval
+        self._files = self._scan(self.directories)
+
+    def _scan(self, directories: List[Path]) -> Dict[str, Tuple[int, int]]:
+        files = {}
+        for directory in directories:
+            for root, _, names in os.walk(directory):
+                for name in names:
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    files[path] = (stat.st_mtime_ns, stat.st_size)
+        return files
+
+    def _wait(self, timeout: Optional[float]) -> Set[Path]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            delay = self.interval if deadline is None else min(self.interval, max(0.0, deadline - time.monotonic()))
+            time.sleep(delay)
+            files = self._scan(self.directories)
+            previous, self._files = self._files, files
+            changed = {Path(path) for path in files.keys() | previous.keys() if files.get(path) != previous.get(path)}
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def _watch(self, directories: List[Path]) -> None:
+        # Files already present when a tree is added are not changes
+        self._files.update(self._scan(directories))
+
+
+class InotifyWatcher(FileWatcher):
+    """
+    InotifyWatcher class receives changes from the Linux kernel through inotify, called with ctypes.
+    Every directory of the watched trees gets a watch, and directories created later are added as
+    they appear.
+    """
+
+    def __init__(self, directories: Iterable[Path], settle: float = DEFAULT_SETTLE) -> None:
+        """
+        Initializes InotifyWatcher instance and adds a watch to every directory of the trees.
+
+        Args:
+            directories (Iterable[Path]): The directories to watch recursively, missing ones are skipped.
+            settle (float): Seconds without changes after which a burst of changes is reported.
+
+        Returns: None
+
+        Raises:
+            OSError: If inotify is not available or the watch limit is reached.
+        """
+        super().__init__(directories, settle)
+        libc_name = ctypes.util.find_library("c")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self._libc.inotify_add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise self._error("inotify_init1")
+        self._paths: Dict[int, str] = {}
+        try:
+            for directory in self.directories:
+                if directory.is_dir():
+                    self._add_tree(str(directory))
+        except OSError:
+            self.close()
+            raise
+
+    def _error(self, call: str) -> OSError:
+        errno = ctypes.get_errno()
+        return OSError(errno, f"{call}: {os.strerror(errno)}")
+
+    def _add_tree(self, directory: str) -> List[Path]:
+        # Returns the files found, which may have been written before the watch existed
+        files = []
+        for root, _, names in os.walk(directory):
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(root), WATCH_MASK)
+            if wd < 0:
+                raise self._error("inotify_add_watch")
+            self._paths[wd] = root
+            files.extend(Path(root, name) for name in names)
+        return files
+
+    def _watch(self, directories: List[Path]) -> None:
+        for directory in directories:
+            self._add_tree(str(directory))
+
+    def _wait(self, timeout: Optional[float]) -> Set[Path]:
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+        try:
+            data = os.read(self._fd, 65536)
+        except BlockingIOError:
+            return set()
+
+        changed: Set[Path] = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped, so every root must be considered changed
+                changed.update(self.directories)
+                continue
+            if mask & IN_IGNORED:
+                self._paths.pop(wd, None)
+                continue
+            root = self._paths.get(wd)
+            if root is None:
+                continue
+            path = os.path.join(root, name) if name else root
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    try:
+                        changed.update(self._add_tree(path))
+                    except OSError:
+                        changed.update(self.directories)
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    # The files of a directory moved away are not reported one by one
+                    changed.add(Path(path))
+                continue
+            if name:
+                changed.add(Path(path))
+        return changed
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def create_watcher(
+    directories: Iterable[Path], polling: Optional[bool] = None, interval: float = DEFAULT_POLL_INTERVAL
+) -> FileWatcher:
+    """
+    Returns an inotify watcher on Linux, or a polling watcher if inotify is unavailable or disabled.
+
+    Args:
+        directories (Iterable[Path]): The directories to watch recursively.
+        polling (Optional[bool]): Whether to poll, defaults to ROUTESTPY_WATCH_POLLING.
+        interval (float): Seconds between two scans of a polling watcher.
+
+    Returns:
+        FileWatcher: The watcher.
+    """
+    directories = list(directories)
+    if polling is None:
+        polling = os.getenv(WATCH_POLLING_ENV, default="0").lower() in ("1", "true", "yes", "on")
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(directories)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(directories, interval)
@@ -0,0 +1,231 @@
+"""
+Layered inheritance of parameters, meta and hooks from the app to its routes and scenarios.
+
+Every level is a layer holding only its own entries and pointing to the layer of its parent, like
+a ChainMap. Own entries come first and override parent entries with the same key; list-valued
+meta fields get the parent items they are missing appended. Layers are immutable and resolved
+once per level, and a level without own entries shares the layer of its parent, so memory and
+load time grow with the number of overrides rather than with scenarios times inherited entries.
+"""
+from collections import abc
+from itertools import islice
+from typing import Any
+from typing import Callable
+from typing import Hashable
+from typing import Iterator
+from typing import Mapping
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+PARAMETER_TYPES = ("headers", "path_variables", "query_params")
+
+
+def freeze(value: Any) -> Hashable:
+    """
+    Returns a hashable key for YAML data, distinguishing booleans from numbers and lists from mappings.
+
+    Args:
+        value (Any): The data.
+
+    Returns:
+        Hashable: The key.
+
+    Raises:
+        TypeError: If the data contains an unhashable value other than a list or a mapping.
+    """
+    if value.__class__ is str:
+        return value
+    if isinstance(value, abc.Mapping):
+        return ("map", tuple((key, freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return ("seq", tuple(freeze(item) for item in value))
+    hash(value)
+    return (value.__class__, value)
+
+
+def merge_items(items: Sequence[Any], inherited: Sequence[Any]) -> Tuple[Any, ...]:
+    """
+    Returns items followed by the inherited items they are missing, keeping the order of both.
+
+    Args:
+        items (Sequence[Any]): The own items.
+        inherited (Sequence[Any]): The parent items.
+
+    Returns:
+        Tuple[Any, ...]: The merged items.
+    """
+    try:
+        seen = set(items)
+    except TypeError:
+        return tuple(items) + tuple(item for item in inherited if item not in items)
+    return tuple(items) + tuple(item for item in inherited if item not in seen)
+
+
+class Layer(abc.Mapping):
+    """
+    Layer class represents an immutable, order-preserving mapping stacked over a parent layer.
+    Only the own entries are stored; lookups fall through to the parent, and iteration yields
+    the own keys first, then the parent keys which are not overridden.
+    """
+
+    __slots__ = ("own", "parent", "_length")
+
+    def __init__(self, own: Mapping[Hashable, Any], parent: Optional["Layer"] = None) -> None:
+        """
+        Initializes Layer instance with its own entries and its parent.
+
+        Args:
+            own (Mapping[Hashable, Any]): The own entries, already merged with the parent values.
+            parent (Optional[Layer]): The parent layer.
+
+        Returns: None
+        """
+        self.own = dict(own)
+        self.parent = parent
+        inherited = sum(1 for key in parent if key not in self.own) if parent is not None else 0
+        self._length = len(self.own) + inherited
+
+    def __getitem__(self, key: Hashable) -> Any:
+        layer: Optional[Layer] = self
+        while layer is not None:
+            if key in layer.own:
+                return layer.own[key]
+            layer = layer.parent
+        raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        layer: Optional[Layer] = self
+        while layer is not None:
+            if key in layer.own:
+                return True
+            layer = layer.parent
+        return False
+
+    def __iter__(self) -> Iterator[Hashable]:
+        yield from self.own
+        if self.parent is not None:
+            for key in self.parent:
+                if key not in self.own:
+                    yield key
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __repr__(self) -> str:
+        return f"Layer({dict(self)!r})"
+
+
+class EntryList(abc.Sequence):
+    """
+    EntryList class represents an immutable, order-preserving list of keyed entries, such as
+    headers or hooks, backed by a Layer mapping each entry key to its entry.
+    """
+
+    __slots__ = ("layer",)
+
+    def __init__(self, layer: Layer) -> None:
+        self.layer = layer
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice) or index < 0:
+            return list(self)[index]
+        if index >= len(self.layer):
+            raise IndexError(index)
+        return next(islice(iter(self), index, None))
+
+    def __iter__(self) -> Iterator[Any]:
+        layer = self.layer
+        return (layer[key] for key in layer)
+
+    def __len__(self) -> int:
+        return len(self.layer)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (EntryList, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None  # type: ignore
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+def meta_layer(own: Mapping[str, Any], parent: Optional[Layer] = None) -> Layer:
+    """
+    Returns the meta layer of a level.
+
+    Args:
+        own (Mapping[str, Any]): The own meta of the level.
+        parent (Optional[Layer]): The meta layer of the parent level.
+
+    Returns:
+        Layer: The resolved meta, list values are tuples, or parent itself if own is empty.
+    """
+    if not own and parent is not None:
+        return parent
+
+    resolved = {}
+    for key, value in own.items():
+        if isinstance(value, (list, tuple)):
+            inherited = parent.get(key) if parent is not None else None
+            value = merge_items(value, inherited) if isinstance(inherited, tuple) else tuple(value)
+        resolved[key] = value
+    return Layer(resolved, parent)
+
+
+def entry_list(own: Sequence[Any], parent: Optional[EntryList], key: Callable[[Any], Hashable]) -> EntryList:
+    """
+    Returns the entry list of a level, in which own entries override parent entries with the same key.
+
+    Args:
+        own (Sequence[Any]): The own entries of the level.
+        parent (Optional[EntryList]): The entry list of the parent level.
+        key (Callable[[Any], Hashable]): Returns the key of an entry.
+
+    Returns:
+        EntryList: The resolved entries, or parent itself if own is empty.
+    """
+    if not own and parent is not None:
+        return parent
+    return EntryList(Layer({key(entry): entry for entry in own}, parent.layer if parent is not None else None))
+
+
+def parameter_layers(own: Mapping[str, Sequence[dict]], parent: Optional[Mapping[str, EntryList]] = None) -> dict:
+    """
+    Returns the parameters of a level, keyed by parameter type.
+
+    Args:
+        own (Mapping[str, Sequence[dict]]): The own parameters of the level.
+        parent (Optional[Mapping[str, EntryList]]): The parameters of the parent level.
+
+    Returns:
+        dict: An EntryList per parameter type, in which entries are keyed by their "key".
+    """
+    return {
+        param_type: entry_list(
+            own.get(param_type) or (),
+            parent[param_type] if parent is not None else None,
+            _parameter_key,
+        )
+        for param_type in PARAMETER_TYPES
+    }
+
+
+def hook_layer(own: Sequence[dict], parent: Optional[EntryList] = None) -> EntryList:
+    """
+    Returns the hooks of a level: its own hooks followed by the parent hooks it does not repeat.
+
+    Args:
+        own (Sequence[dict]): The own hooks of the level.
+        parent (Optional[EntryList]): The hooks of the parent level.
+
+    Returns:
+        EntryList: The resolved hooks.
+    """
+    return entry_list(own, parent, freeze)
+
+
+def _parameter_key(entry: dict) -> Hashable:
+    return entry["key"]
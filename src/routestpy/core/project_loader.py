@@ -0,0 +1,193 @@
+import os
+from concurrent.futures import Executor
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Set
+from typing import Tuple
+
+from .base_yaml_schema import BaseYamlSchema
+from .snapshot import ProjectSnapshot
+
+LOAD_WORKERS_ENV = "ROUTESTPY_LOAD_WORKERS"
+LOAD_EXECUTOR_ENV = "ROUTESTPY_LOAD_EXECUTOR"
+
+
+def load_document(schema_path: Path, data_path: Path) -> Tuple[dict, Set[str]]:
+    """
+    Loads the data file, resolves its `$ref` keys and validates it against the schema.
+
+    Args:
+    - schema_path (Path): path to the schema file
+    - data_path (Path): path to the data file
+
+    Returns:
+    - Tuple[dict, Set[str]]: the resolved and validated data, and the paths of the files it was loaded from
+    """
+    document = BaseYamlSchema(schema_path, data_path)
+    return document.data, document.dependencies
+
+
+def load_header(data_path: Path) -> Tuple[dict, Set[str]]:
+    """
+    Reads the header of a scenario file without validating it, see scenario.read_header.
+
+    Args:
+    - data_path (Path): path to the scenario file
+
+    Returns:
+    - Tuple[dict, Set[str]]: the header, and the paths of the files it was loaded from
+    """
+    from .scenario import read_header
+
+    dependencies = {os.path.abspath(data_path)}
+    return read_header(data_path, dependencies), dependencies
+
+
+class ProjectLoader:
+    """
+    ProjectLoader class parses and validates project files on a thread or process pool. Only
+    the per-file work runs in the pool, merging parent data into children is left to the caller
+    so that it happens in dependency order.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        executor: Optional[str] = None,
+        snapshot: Optional[ProjectSnapshot] = None,
+    ) -> None:
+        """
+        Initializes ProjectLoader instance with the pool configuration.
+
+        Args:
+        - workers (Optional[int]): number of workers, defaults to ROUTESTPY_LOAD_WORKERS or the CPU count.
+          A single worker loads the files sequentially in the calling thread.
+        - executor (Optional[str]): "thread" or "process", defaults to ROUTESTPY_LOAD_EXECUTOR or "thread"
+        - snapshot (Optional[ProjectSnapshot]): snapshot answering for files which did not change
+
+        Returns: None
+        """
+        if workers is None:
+            workers = int(os.getenv(LOAD_WORKERS_ENV, default="0")) or os.cpu_count() or 1
+        if executor is None:
+            executor = os.getenv(LOAD_EXECUTOR_ENV, default="thread")
+        if workers < 1:
+            raise ValueError(f"Invalid number of load workers: {workers}")
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Invalid load executor: {executor}")
+
+        self.workers = workers
+        self.executor = executor
+        self.snapshot = snapshot
+        # Other files each document was loaded from through `$ref` keys, by absolute document path
+        self.references: Dict[str, Set[str]] = {}
+
+    def load(self, schema_path: Path, data_paths: Sequence[Path]) -> List[dict]:
+        """
+        Loads and validates every data file against the schema.
+
+        Args:
+        - schema_path (Path): path to the schema file
+        - data_paths (Sequence[Path]): paths to the data files
+
+        Returns:
+        - List[dict]: the validated data, in the order of data_paths
+
+        Raises:
+        - ValueError: for the first invalid data file, in the order of data_paths
+        """
+        results = self.cached(data_paths)
+        missing = [index for index, data in enumerate(results) if data is None]
+        loaded = self.map(partial(load_document, schema_path), [data_paths[index] for index in missing])
+        for index, (data, dependencies) in zip(missing, loaded):
+            if self.snapshot is not None:
+                self.snapshot.put(data_paths[index], data, dependencies)
+            self.record(data_paths[index], dependencies)
+            results[index] = data
+
+        return results  # type: ignore
+
+    def headers(self, data_paths: Sequence[Path]) -> List[dict]:
+        """
+        Reads the header of every scenario file, without validating them.
+
+        Args:
+        - data_paths (Sequence[Path]): paths to the scenario files
+
+        Returns:
+        - List[dict]: the headers, in the order of data_paths
+        """
+        results = []
+        for data_path, (header, dependencies) in zip(data_paths, self.map(load_header, data_paths)):
+            self.record(data_path, dependencies)
+            results.append(header)
+        return results
+
+    def record(self, data_path: Path, dependencies: Set[str]) -> None:
+        """
+        Records the files a document was loaded from, other than the document itself.
+
+        Args:
+        - data_path (Path): path to the document
+        - dependencies (Set[str]): absolute paths of the document and every file it references
+
+        Returns: None
+        """
+        key = os.path.abspath(data_path)
+        references = dependencies - {key}
+        if references:
+            self.references[key] = references
+        else:
+            self.references.pop(key, None)
+
+    def cached(self, data_paths: Sequence[Path]) -> List[Optional[dict]]:
+        """
+        Returns the validated data of every file the snapshot has an up-to-date entry for.
+
+        Args:
+        - data_paths (Sequence[Path]): paths to the data files
+
+        Returns:
+        - List[Optional[dict]]: the validated data, or None for files which must be loaded
+        """
+        if self.snapshot is None:
+            return [None] * len(data_paths)
+        results = [self.snapshot.get(data_path) for data_path in data_paths]
+        for data_path, data in zip(data_paths, results):
+            if data is not None:
+                self.record(data_path, self.snapshot.dependencies(data_path))
+        return results
+
+    def map(self, function: Callable[[Path], Any], data_paths: Sequence[Path]) -> List[Any]:
+        """
+        Applies function to every data path on the pool.
+
+        Args:
+        - function (Callable[[Path], Any]): a picklable function when the process executor is used
+        - data_paths (Sequence[Path]): paths to the data files
+
+        Returns:
+        - List[Any]: the results, in the order of data_paths
+        """
+        if self.workers == 1 or len(data_paths) < 2:
+            return [function(data_path) for data_path in data_paths]
+
+        workers = min(self.workers, len(data_paths))
+        pool: Executor
+        if self.executor == "process":
+            pool = ProcessPoolExecutor(max_workers=workers)
+            chunksize = max(1, len(data_paths) // (workers * 4))
+        else:
+            pool = ThreadPoolExecutor(max_workers=workers)
+            chunksize = 1
+
+        with pool:
+            return list(pool.map(function, data_paths, chunksize=chunksize))
@@ -0,0 +1,279 @@
+import os
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+from yaml import YAMLError
+
+from .application import Application
+from .file_watcher import DEFAULT_POLL_INTERVAL
+from .file_watcher import FileWatcher
+from .file_watcher import create_watcher
+from .route import Route
+from .scenario import LazyScenario
+from .scenario import Scenario
+
+# Errors reported for a file which cannot be reloaded, the previous version is kept
+RELOAD_ERRORS = (ValueError, OSError, KeyError, TypeError, YAMLError)
+
+
+class ReloadResult:
+    """
+    ReloadResult class represents the outcome of applying a batch of file changes to a project.
+
+    Attributes:
+        changed (List[str]): The changed files.
+        reloaded (int): Number of route and scenario files parsed again.
+        full (bool): Whether the whole application had to be rebuilt.
+        affected (List[Any]): The scenarios whose data, parents or environment changed.
+        errors (List[str]): One message per file which could not be reloaded.
+        duration (float): Seconds spent applying the changes.
+    """
+
+    def __init__(self, changed: Iterable[str]) -> None:
+        self.changed = sorted(changed)
+        self.reloaded = 0
+        self.full = False
+        self.affected: List[Any] = []
+        self.errors: List[str] = []
+        self.duration = 0.0
+
+
+class ProjectWatcher:
+    """
+    ProjectWatcher class keeps a loaded application in memory and applies file changes to it
+    incrementally. A changed scenario file is parsed, validated and merged again on its own; a
+    changed route file rebuilds the route and re-merges its scenarios, reusing the snapshot for
+    the unchanged ones; a changed file referenced through `$ref` reloads the documents using it,
+    its directory being watched too when it is outside the project trees; a changed config file
+    reloads the config. Only a change of the app tree rebuilds everything.
+    """
+
+    def __init__(
+        self,
+        app: Application,
+        watcher: Optional[FileWatcher] = None,
+        polling: Optional[bool] = None,
+        interval: float = DEFAULT_POLL_INTERVAL,
+    ) -> None:
+        """
+        Initializes ProjectWatcher instance and starts watching the app, routes and config trees,
+        and the directories of the files they reference through `$ref`.
+
+        Args:
+        - app (Application): the loaded application
+        - watcher (Optional[FileWatcher]): the file watcher, created with create_watcher if not given
+        - polling (Optional[bool]): whether to poll for changes, see create_watcher
+        - interval (float): seconds between two scans of a polling watcher
+
+        Returns: None
+        """
+        self.app = app
+        self.app_path = os.path.abspath(app.project_path.joinpath("app"))
+        self.routes_path = os.path.abspath(app.app_routes_path)
+        self.config_path = os.path.abspath(app.config_loader.config_path)
+        if watcher is None:
+            roots = [Path(self.app_path), Path(self.routes_path), Path(self.config_path)]
+            watcher = create_watcher(roots + self._reference_directories(), polling, interval)
+        self.watcher = watcher
+        self._routes: Dict[str, Route] = {}
+        self._scenarios: Dict[str, Tuple[Route, int]] = {}
+        self._users: Dict[str, Set[str]] = {}
+        self._index()
+
+    def _index(self) -> None:
+        # Documents by absolute path, and the documents using each referenced file
+        self._routes = {os.path.abspath(route.data_path): route for route in self.app.routes}
+        self._scenarios = {
+            os.path.abspath(scenario.data_path): (route, position)
+            for route in self.app.routes
+            for position, scenario in enumerate(route.scenarios)
+        }
+        users: Dict[str, Set[str]] = defaultdict(set)
+        for document, references in self.app.loader.references.items():
+            for reference in references:
+                users[reference].add(document)
+        self._users = dict(users)
+        # References added by a reload may point outside the watched trees
+        self.watcher.add(self._reference_directories())
+
+    def _reference_directories(self) -> List[Path]:
+        # Returns the directories of the referenced files, see FileWatcher.add
+        references = set().union(*self.app.loader.references.values())
+        return [Path(directory) for directory in sorted({os.path.dirname(path) for path in references})]
+
+    def changes(self, timeout: Optional[float] = None) -> Set[Path]:
+        """
+        Waits for files of the project to change, see FileWatcher.changes.
+
+        Args:
+        - timeout (Optional[float]): seconds to wait for a first change, forever if None
+
+        Returns:
+        - Set[Path]: the changed files, empty on timeout
+        """
+        return self.watcher.changes(timeout)
+
+    def apply(self, changed: Iterable[Path]) -> ReloadResult:
+        """
+        Reloads what depends on the changed files. Files which cannot be reloaded are reported in
+        the result and their previous version is kept.
+
+        Args:
+        - changed (Iterable[Path]): the changed, created or deleted files
+
+        Returns:
+        - ReloadResult: the reloaded files and the affected scenarios
+        """
+        started = time.perf_counter()
+        paths = {os.path.abspath(path) for path in changed}
+        result = ReloadResult(paths)
+        if self.app.snapshot is not None:
+            self.app.snapshot.forget(paths)
+
+        app_documents = {os.path.abspath(self.app.app_yaml_path)} | self.app.loader.references.get(
+            os.path.abspath(self.app.app_yaml_path), set()
+        )
+        roots = {self.app_path, self.routes_path, self.config_path}
+        if paths & roots or any(_is_under(path, self.app_path) for path in paths) or paths & app_documents:
+            self._reload_application(result)
+        else:
+            routes, scenarios = self._documents(paths)
+            for route_path in sorted(routes):
+                self._reload_route(route_path, result)
+            for scenario_path in sorted(scenarios):
+                if self._scenarios[scenario_path][0] in self.app.routes:
+                    self._reload_scenario(scenario_path, result)
+            if any(_is_under(path, self.config_path) for path in paths):
+                self._reload_config(result)
+
+            if result.reloaded:
+                self.app.collect_scenarios()
+                self.app.invalidate_tag_index()
+                self.app.save_snapshot()
+                self._index()
+
+        result.duration = time.perf_counter() - started
+        return result
+
+    def _documents(self, paths: Set[str]) -> Tuple[Set[str], Set[str]]:
+        # Returns the route files to rebuild and the scenario files to reload for changed paths
+        routes: Set[str] = set()
+        scenarios: Set[str] = set()
+        for path in paths:
+            documents = {path} | self._users.get(path, set())
+            if not os.path.exists(path):
+                # A deleted directory takes every document below it along
+                documents.update(p for p in self._routes if _is_under(p, path))
+                documents.update(p for p in self._scenarios if _is_under(p, path))
+            for document in documents:
+                if document in self._routes or _is_route_file(document, self.routes_path):
+                    routes.add(document)
+                elif document in self._scenarios:
+                    scenarios.add(document)
+        # Scenarios of rebuilt routes are re-merged with them
+        scenarios = {path for path in scenarios if os.path.abspath(self._scenarios[path][0].data_path) not in routes}
+        return routes, scenarios
+
+    def _reload_application(self, result: ReloadResult) -> None:
+        app, loader = self.app, self.app.loader
+        try:
+            self.app = Application(
+                app.project_path,
+                workers=loader.workers,
+                executor=loader.executor,
+                snapshot=app.snapshot is not None,
+                lazy=app.lazy,
+                environment=app.environment,
+            )
+        except RELOAD_ERRORS as e:
+            result.errors.append(f"{app.app_yaml_path}: {e}")
+            return
+        self.app.collect_scenarios()
+        result.full = True
+        result.reloaded = len(self.app.routes) + len(self.app.scenario_collection)
+        result.affected = list(self.app.scenario_collection)
+        self._index()
+
+    def _reload_route(self, route_path: str, result: ReloadResult) -> None:
+        previous = self._routes.get(route_path)
+        if not os.path.exists(route_path):
+            if previous is not None and previous in self.app.routes:
+                self.app.routes.remove(previous)
+                result.reloaded += 1
+            return
+
+        try:
+            route = self.app.load_routes([Path(previous.data_path if previous is not None else route_path)])[0]
+        except RELOAD_ERRORS as e:
+            result.errors.append(f"{route_path}: {e}")
+            return
+        if previous is not None and previous in self.app.routes:
+            self.app.routes[self.app.routes.index(previous)] = route
+        else:
+            self.app.routes.append(route)
+        result.reloaded += 1 + len(route.scenarios)
+        result.affected.extend(route.scenarios)
+
+    def _reload_scenario(self, scenario_path: str, result: ReloadResult) -> None:
+        route, position = self._scenarios[scenario_path]
+        data_path = route.scenarios[position].data_path
+        try:
+            # Changed scenarios are validated right away, so that errors show up on save
+            data = self.app.loader.load(Scenario.SCHEMA_PATH, [data_path])[0]
+            scenario: Any
+            if self.app.lazy:
+                scenario = LazyScenario(route, data_path, data=data)
+            else:
+                scenario = Scenario.create_new_scenario(route, data_path, data)
+        except RELOAD_ERRORS as e:
+            result.errors.append(f"{scenario_path}: {e}")
+            return
+        route.scenarios[position] = scenario
+        result.reloaded += 1
+        result.affected.append(scenario)
+
+    def _reload_config(self, result: ReloadResult) -> None:
+        try:
+            self.app.config = self.app.config_loader.load()
+        except Exception as e:  # ConfigLoader raises plain exceptions
+            result.errors.append(f"{self.config_path}: {e}")
+            return
+        self.app.collect_scenarios()
+        result.affected = list(self.app.scenario_collection)
+        result.reloaded += 1
+
+    def close(self) -> None:
+        """
+        Stops watching the project.
+
+        Returns: None
+        """
+        self.watcher.close()
+
+    def __enter__(self) -> "ProjectWatcher":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def _is_under(path: str, directory: str) -> bool:
+    return path.startswith(directory + os.sep)
+
+
+def _is_route_file(path: str, routes_path: str) -> bool:
+    # A route.yaml directly inside a *_route directory of the routes tree, as found by find_routes
+    directory = os.path.dirname(path)
+    return (
+        os.path.basename(path) == "route.yaml"
+        and directory.endswith("_route")
+        and os.path.dirname(directory) == routes_path
+    )
@@ -0,0 +1,219 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import Optional
+from typing import Set
+from typing import Tuple
+from typing import Union
+
+from routestpy.loaders.yaml_reader import load_file
+
+
+class RefResolver:
+    """
+    RefResolver class resolves `$ref` keys in JSON/YAML documents.
+
+    A reference has the form `path#/json/pointer`. Relative paths are resolved against the
+    directory of the referring document, and a reference starting with `#` points into the
+    referring document itself. Every referenced file is parsed once and kept as parsed; the resolved
+    target of each reference is built once, cached and shared, without copying, by all documents
+    referring to it, until the target or a file it references changes.
+
+    Attributes:
+        hits (int): Number of references answered from the cache.
+        misses (int): Number of references that had to be resolved.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes an empty RefResolver instance.
+
+        Returns: None
+        """
+        self._documents: Dict[str, Tuple[int, Any]] = {}
+        self._targets: Dict[Tuple[str, str], Tuple[Any, Dict[str, int]]] = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def load_document(self, path: str) -> Any:
+        """
+        Returns the parsed document at path, parsing it only if it is not cached or has changed.
+
+        Args:
+            path (str): The absolute path to the document.
+
+        Returns:
+            Any: The parsed document.
+
+        Raises:
+            ValueError: If the file extension is not supported.
+        """
+        mtime = os.stat(path).st_mtime_ns
+        with self._lock:
+            entry = self._documents.get(path)
+            if entry is not None and entry[0] == mtime:
+                return entry[1]
+
+            if path.endswith(".json"):
+                with open(path) as f:
+                    document = json.load(f)
+            elif path.endswith(".yaml") or path.endswith(".yml"):
+                document = load_file(path)
+            else:
+                raise ValueError("Invalid file extension: " + path)
+            self._documents[path] = (mtime, document)
+            return document
+
+    def resolve(
+        self,
+        base_path: Path,
+        node: Any,
+        dependencies: Optional[Set[str]] = None,
+        document_path: Optional[Union[str, Path]] = None,
+    ) -> Any:
+        """
+        Recursively resolves all `$ref` keys in node, replacing them in place.
+
+        Args:
+            base_path (Path): The directory against which relative references are resolved.
+            node (Any): The document or subtree to resolve.
+            dependencies (Optional[Set[str]]): If given, receives the path of every referenced file.
+            document_path (Optional[Union[str, Path]]): The document node belongs to, for `#` references.
+
+        Returns:
+            Any: The resolved node.
+
+        Raises:
+            ValueError: If a reference is circular, cannot be resolved or has an unsupported extension.
+        """
+        if document_path is not None:
+            document_path = os.path.abspath(document_path)
+        return self._resolve(Path(base_path), node, dependencies, document_path, ())
+
+    def _resolve(
+        self,
+        base_path: Path,
+        node: Any,
+        dependencies: Optional[Set[str]],
+        document_path: Optional[str],
+        stack: Tuple[Tuple[str, str], ...],
+        copy: bool = False,
+    ) -> Any:
+        # Nodes of cached documents are copied rather than resolved in place, so that a document
+        # keeps its own references and a changed target is picked up when the document is resolved again
+        if isinstance(node, dict):
+            ref = node.get("$ref")
+            if isinstance(ref, str):
+                return self._resolve_ref(base_path, ref, dependencies, document_path, stack)
+            if copy:
+                node = dict(node)
+            for key, value in node.items():
+                if isinstance(value, (dict, list)):
+                    node[key] = self._resolve(base_path, value, dependencies, document_path, stack, copy)
+        elif isinstance(node, list):
+            if copy:
+                node = list(node)
+            for index, value in enumerate(node):
+                if isinstance(value, (dict, list)):
+                    node[index] = self._resolve(base_path, value, dependencies, document_path, stack, copy)
+        return node
+
+    def _resolve_ref(
+        self,
+        base_path: Path,
+        ref: str,
+        dependencies: Optional[Set[str]],
+        document_path: Optional[str],
+        stack: Tuple[Tuple[str, str], ...],
+    ) -> Any:
+        file_part, _, pointer = ref.partition("#")
+        if file_part:
+            path = os.path.abspath(os.path.join(base_path, file_part))
+        elif document_path is not None:
+            path = document_path
+        else:
+            raise ValueError(f"Cannot resolve local reference {ref!r} without a document path")
+
+        key = (path, pointer)
+        if key in stack:
+            cycle = " -> ".join(p + ("#" + f if f else "") for p, f in (*stack[stack.index(key) :], key))
+            raise ValueError(f"Circular $ref: {cycle}")
+
+        with self._lock:
+            entry = self._targets.get(key)
+            if entry is not None and self._is_fresh(entry[1]):
+                self.hits += 1
+            else:
+                self.misses += 1
+                target_dependencies: Set[str] = {path}
+                target = self._lookup(self.load_document(path), pointer, ref)
+                target = self._resolve(Path(path).parent, target, target_dependencies, path, (*stack, key), True)
+                entry = (target, {p: os.stat(p).st_mtime_ns for p in target_dependencies})
+                self._targets[key] = entry
+
+        if dependencies is not None:
+            dependencies.update(entry[1])
+        return entry[0]
+
+    @staticmethod
+    def _is_fresh(dependencies: Dict[str, int]) -> bool:
+        try:
+            return all(os.stat(path).st_mtime_ns == mtime for path, mtime in dependencies.items())
+        except OSError:
+            return False
+
+    @staticmethod
+    def _lookup(document: Any, pointer: str, ref: str) -> Any:
+        """
+        Returns the node of document addressed by the JSON pointer.
+
+        Raises:
+            ValueError: If the pointer does not address a node of the document.
+        """
+        if not pointer:
+            return document
+        if not pointer.startswith("/"):
+            raise ValueError(f"Invalid JSON pointer in $ref: {ref}")
+
+        node = document
+        for token in pointer[1:].split("/"):
+            token = token.replace("~1", "/").replace("~0", "~")
+            try:
+                node = node[int(token)] if isinstance(node, list) else node[token]
+            except (KeyError, IndexError, TypeError, ValueError):
+                raise ValueError(f"Unresolvable JSON pointer in $ref: {ref}")
+        return node
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the cache counters.
+
+        Returns:
+            Dict[str, int]: The number of hits, misses, parsed documents and cached targets.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "documents": len(self._documents),
+                "targets": len(self._targets),
+            }
+
+    def clear(self) -> None:
+        """
+        Drops every cached document and reference target and resets the counters.
+
+        Returns: None
+        """
+        with self._lock:
+            self._documents.clear()
+            self._targets.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+ref_resolver = RefResolver()
@@ -1,12 +1,20 @@
 import os
 from pathlib import Path
+from typing import TYPE_CHECKING
 from typing import List
 from typing import Optional
-
-import requests
+from typing import Union
 
 from .application import Application
 from .base_yaml_schema import BaseYamlSchema
+from .dependency_graph import check_dependency_fields
+from .inheritance import hook_layer
+from .inheritance import meta_layer
+from .inheritance import parameter_layers
+
+if TYPE_CHECKING:
+    # The runner depends on the core, not the other way round
+    from routestpy.runner.http_client import HttpResponse
 
 
 class BaseRoute(BaseYamlSchema):
@@ -15,21 +23,24 @@ class BaseRoute(BaseYamlSchema):
     file specified by data_path.
     """
 
-    def __init__(self, data_path: Path) -> None:
+    SCHEMA_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../schema/route_schema.yaml"))
+
+    def __init__(self, data_path: Path, data: Optional[dict] = None) -> None:
         """
         Initializes BaseRoute instance with schema and data file paths.
 
         Args:
         - data_path (Path): path to the data file
+        - data (Optional[dict]): already loaded and validated route data
 
         Returns: None
         """
+        from .scenario import LazyScenario
         from .scenario import Scenario
 
-        schema_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../schema/route_schema.yaml"))
-        super().__init__(schema_path, data_path)
-        self.response: Optional[requests.Response] = None
-        self.scenarios: List[Scenario] = []
+        super().__init__(self.SCHEMA_PATH, data_path, data)
+        self.response: Optional["HttpResponse"] = None  # Last response received for one of the scenarios
+        self.scenarios: List[Union[Scenario, LazyScenario]] = []
 
 
 class Route(BaseRoute):
@@ -38,61 +49,90 @@ class Route(BaseRoute):
     which are loaded from YAML file specified by data_path.
     """
 
-    def __init__(self, parent: Application, data_path: Path) -> None:
+    def __init__(
+        self,
+        parent: Application,
+        data_path: Path,
+        data: Optional[dict] = None,
+        scenarios_data: Optional[List[Optional[dict]]] = None,
+        scenarios_headers: Optional[List[Optional[dict]]] = None,
+    ) -> None:
         """
         Initializes Route instance with parent Application and data file paths.
 
         Args:
         - parent (Application): parent application instance
         - data_path (Path): path to the data file
+        - data (Optional[dict]): already loaded and validated route data
+        - scenarios_data (Optional[List[Optional[dict]]]): already loaded and validated data of every scenario
+        - scenarios_headers (Optional[List[Optional[dict]]]): if given, scenarios are created as LazyScenario
+          objects from these headers, see scenario.read_header
 
         Returns: None
         """
+        from .scenario import LazyScenario
         from .scenario import Scenario
 
-        super().__init__(data_path)
+        super().__init__(data_path, data)
         self.parent: Application = parent
 
-        parameter_types = ["headers", "path_variables", "query_params"]
-        for param_type in parameter_types:
-            target = self.route["parameters"][param_type]
-            keys_set = {d['key'] for d in target}
-            missing_entries = [d for d in self.parent.app["parameters"][param_type] if d['key'] not in keys_set]
-            target.extend(missing_entries)
-            self.route["parameters"][param_type] = target
-
-        # Copy missing meta properties from Parent app meta to the route meta
-        target = self.route["meta"]
-        for key, value in self.parent.app["meta"].items():
-            if key not in target:
-                target[key] = value
-            elif isinstance(value, list):
-                # Copy missing items from app to route
-                target[key] = list(set(target[key] + value))
-
-        self.route["meta"] = target
-
-        # Copy missing hooks from Parent app hooks to the route hooks
-        route_hooks = self.route["hooks"]
-        for hook in self.parent.app["hooks"]:
-            if hook not in route_hooks:
-                route_hooks.append(hook)
-        self.route["hooks"] = route_hooks
-
-        for sc in self.route['scenarios']:
-            s = Scenario.create_new_scenario(self, self.data_path.parent.joinpath(sc[2:]))
-            self.scenarios.append(s)
+        # Parameters, meta and hooks are layered over the app ones instead of copying them
+        self.route = self.data["route"] = dict(self.route)
+        check_dependency_fields(self.route["meta"], data_path)
+        self.route["parameters"] = parameter_layers(self.route["parameters"], self.parent.app["parameters"])
+        self.route["meta"] = meta_layer(self.route["meta"], self.parent.app["meta"])
+        self.route["hooks"] = hook_layer(self.route["hooks"], self.parent.app["hooks"])
+
+        for index, scenario_path in enumerate(self.scenario_paths()):
+            scenario_data = scenarios_data[index] if scenarios_data is not None else None
+            if scenarios_headers is not None:
+                self.scenarios.append(LazyScenario(self, scenario_path, scenarios_headers[index], scenario_data))
+            else:
+                self.scenarios.append(Scenario.create_new_scenario(self, scenario_path, scenario_data))
+
+    def scenario_paths(self) -> List[Path]:
+        """
+        Returns the paths of the scenario files listed by the route.
+
+        Returns:
+        - List[Path]: scenario file paths, relative to the route file
+        """
+        return scenario_paths(self.data_path, self.route)
 
     @classmethod
-    def new_route(cls, parent: Application, data_path: Path) -> "Route":
+    def new_route(
+        cls,
+        parent: Application,
+        data_path: Path,
+        data: Optional[dict] = None,
+        scenarios_data: Optional[List[Optional[dict]]] = None,
+        scenarios_headers: Optional[List[Optional[dict]]] = None,
+    ) -> "Route":
         """
         Creates a new Route instance and populates it with data from the given data dictionary.
 
         Args:
         - parent (Application): parent application instance
         - data_path (str): path to the data file
+        - data (Optional[dict]): already loaded and validated route data
+        - scenarios_data (Optional[List[Optional[dict]]]): already loaded and validated data of every scenario
+        - scenarios_headers (Optional[List[Optional[dict]]]): headers of lazily created scenarios
 
         Returns:
         - Route: new Route instance populated with data from the given data dictionary
         """
-        return cls(parent, data_path)
+        return cls(parent, data_path, data, scenarios_data, scenarios_headers)
+
+
+def scenario_paths(route_path: Path, route: dict) -> List[Path]:
+    """
+    Returns the paths of the scenario files listed in route data.
+
+    Args:
+    - route_path (Path): path to the route file
+    - route (dict): the `route` section of the route data
+
+    Returns:
+    - List[Path]: scenario file paths, relative to the route file
+    """
+    return [Path(route_path).parent.joinpath(sc[2:]) for sc in route['scenarios']]
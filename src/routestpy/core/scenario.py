@@ -1,8 +1,20 @@
 import os
 from pathlib import Path
+from typing import Any
 from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Set
+from typing import Union
+
+from routestpy.loaders.yaml_reader import load_file
 
 from .base_yaml_schema import BaseYamlSchema
+from .inheritance import Layer
+from .inheritance import hook_layer
+from .inheritance import meta_layer
+from .inheritance import parameter_layers
+from .ref_resolver import ref_resolver
 from .route import Route
 
 
@@ -12,17 +24,19 @@ class BaseScenario(BaseYamlSchema):
     metadata loaded from a YAML file.
     """
 
-    def __init__(self, data_path: Path) -> None:
+    SCHEMA_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../schema/scenario_schema.yaml"))
+
+    def __init__(self, data_path: Path, data: Optional[dict] = None) -> None:
         """
         Initializes BaseScenario instance with schema and data file paths.
 
         Args:
         - data_path (str): path to the data file
+        - data (Optional[dict]): already loaded and validated scenario data
 
         Returns: None
         """
-        schema_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../schema/scenario_schema.yaml"))
-        super().__init__(schema_path, data_path)
+        super().__init__(self.SCHEMA_PATH, data_path, data)
 
 
 class Scenario(BaseScenario):
@@ -31,52 +45,33 @@ class Scenario(BaseScenario):
     request body, response, and other metadata loaded from a YAML file.
     """
 
-    def __init__(self, parent: Route, data_path: Path) -> None:
+    def __init__(self, parent: Route, data_path: Path, data: Optional[dict] = None) -> None:
         """
         Initializes Scenario instance with parent route and data file paths.
 
         Args:
         - parent (Route): parent route instance
         - data_path (str): path to the data file
+        - data (Optional[dict]): already loaded and validated scenario data
 
         Returns: None
         """
         self.parent = parent
         self.body = None
         self.response = None
-        super().__init__(data_path)
-
-        parameter_types = ["headers", "path_variables", "query_params"]
-        for param_type in parameter_types:
-            target = self.scenario["parameters"][param_type]
-            keys_set = {d['key'] for d in target}
-            missing_entries = [d for d in self.parent.route["parameters"][param_type] if d['key'] not in keys_set]
-            target.extend(missing_entries)
-
-        # Copy missing meta properties from Parent app meta to the route meta
-        target = self.scenario["meta"]
-        for key in self.parent.route["meta"]:
-            if key not in target:
-                target[key] = self.parent.route["meta"][key]
-            elif (
-                key in self.parent.route["meta"] and key in target and isinstance(self.parent.route["meta"][key], list)
-            ):
-                # Copy missing items from app to route
-                for item in self.parent.route["meta"][key]:
-                    if item not in target[key]:
-                        target[key].append(item)
-
-        self.scenario["meta"] = target
-
-        # Copy missing hooks from Parent app hooks to the route hooks
-        target = self.scenario["hooks"]
-        for hook in self.parent.route["hooks"]:
-            if hook not in target:
-                target.append(hook)
-        self.scenario["hooks"] = target
-
-    def get_tags(self) -> List[str]:
-        return self.scenario["meta"]["tags"]
+        super().__init__(data_path, data)
+
+        # Parameters, meta and hooks are layered over the route ones instead of copying them
+        self.scenario = self.data["scenario"] = dict(self.scenario)
+        self.scenario["parameters"] = parameter_layers(self.scenario["parameters"], self.parent.route["parameters"])
+        self.scenario["meta"] = meta_layer(self.scenario["meta"], self.parent.route["meta"])
+        self.scenario["hooks"] = hook_layer(self.scenario["hooks"], self.parent.route["hooks"])
+
+    def get_tags(self) -> Sequence[str]:
+        return self.scenario["meta"].get("tags", ())
+
+    def get_meta(self) -> Layer:
+        return self.scenario["meta"]
 
     def get_name(self) -> List[str]:
         return self.scenario["info"]["name"]
@@ -88,15 +83,115 @@ class Scenario(BaseScenario):
         return f"{self.scenario}"
 
     @classmethod
-    def create_new_scenario(cls, parent: Route, data_path: Path) -> "Scenario":
+    def create_new_scenario(cls, parent: Route, data_path: Path, data: Optional[dict] = None) -> "Scenario":
         """
         Creates a new Scenario instance with parent route and data file paths.
 
         Args:
         - parent (Route): parent route instance
         - data_path (str): path to the data file
+        - data (Optional[dict]): already loaded and validated scenario data
 
         Returns:
         - scenario (Scenario): a new instance of the Scenario class
         """
-        return cls(parent=parent, data_path=data_path)
+        return cls(parent=parent, data_path=data_path, data=data)
+
+
+class LazyScenario:
+    """
+    LazyScenario class stands in for a Scenario until it is used. Only a cheap header, the
+    scenario name and its meta merged with the route meta, is read up front, so tag filters
+    can run without validating every scenario. The Scenario is validated and merged with its
+    parent on first access to any other attribute, or by materialize().
+    """
+
+    def __init__(self, parent: Route, data_path: Path, header: Optional[dict] = None, data: Optional[dict] = None):
+        """
+        Initializes LazyScenario instance with parent route, data file path and header.
+
+        Args:
+        - parent (Route): parent route instance
+        - data_path (Path): path to the data file
+        - header (Optional[dict]): header read by read_header, derived from data if not given
+        - data (Optional[dict]): already loaded and validated scenario data, if available
+
+        Returns: None
+        """
+        self.parent = parent
+        self.data_path = data_path
+        self._data = data
+        self._scenario: Optional[Scenario] = None
+
+        if header is None:
+            header = scenario_header(data) if data is not None else read_header(data_path)
+        self.name: str = header["name"]
+        self.meta: Layer = meta_layer(header["meta"], parent.route["meta"])
+
+    def is_materialized(self) -> bool:
+        return self._scenario is not None
+
+    def materialize(self, data: Optional[dict] = None) -> Scenario:
+        """
+        Validates the scenario and merges it with its parent route, once.
+
+        Args:
+        - data (Optional[dict]): already loaded and validated scenario data, if available
+
+        Returns:
+        - Scenario: the full scenario
+        """
+        if self._scenario is None:
+            self._scenario = Scenario.create_new_scenario(self.parent, self.data_path, data or self._data)
+            self._data = None
+        return self._scenario
+
+    def get_tags(self) -> Sequence[str]:
+        return self.meta.get("tags", ())
+
+    def get_meta(self) -> Layer:
+        return self.meta
+
+    def get_name(self) -> str:
+        return self.name
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes LazyScenario does not define itself
+        if name.startswith("__") or name in ("_scenario", "_data", "parent", "data_path"):
+            raise AttributeError(name)
+        return getattr(self.materialize(), name)
+
+    def __str__(self):
+        return str(self._scenario) if self._scenario is not None else f"{self.name} ({self.data_path})"
+
+    def __repr__(self):
+        return repr(self._scenario) if self._scenario is not None else f"<LazyScenario {self.name!r}>"
+
+
+def scenario_header(data: dict) -> dict:
+    """
+    Returns the header of scenario data: the scenario name and its own meta.
+
+    Args:
+    - data (dict): the scenario data
+
+    Returns:
+    - dict: the header, with "name" and "meta" keys
+    """
+    scenario = data.get("scenario") or {}
+    return {"name": (scenario.get("info") or {}).get("name", ""), "meta": scenario.get("meta") or {}}
+
+
+def read_header(data_path: Union[str, Path], dependencies: Optional[Set[str]] = None) -> dict:
+    """
+    Reads the header of a scenario file without validating it.
+
+    Args:
+    - data_path (Union[str, Path]): path to the data file
+    - dependencies (Optional[Set[str]]): if given, receives the path of every referenced file
+
+    Returns:
+    - dict: the header, with "name" and "meta" keys
+    """
+    data = ref_resolver.resolve(Path(data_path).parent, load_file(data_path), dependencies, document_path=data_path)
+    return scenario_header(data if isinstance(data, dict) else {})
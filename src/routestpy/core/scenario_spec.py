@@ -0,0 +1,330 @@
+"""
+Compact, immutable representations of scenarios for very large suites.
+
+A ScenarioSpec keeps only what is needed to run and select a scenario: no raw data, no schema and
+no parent chain, with tag, meta and header strings interned so suites share one copy of each. A
+ScenarioColumns store goes further and keeps selected fields of a whole suite in dictionary
+encoded arrays, for selection and scheduling without touching the specs.
+"""
+import sys
+from array import array
+from collections import abc
+from collections import defaultdict
+from typing import Any
+from typing import Dict
+from typing import Hashable
+from typing import Iterable
+from typing import List
+from typing import Mapping
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+from .inheritance import Layer
+from .inheritance import freeze
+
+SPEC_FIELDS = (
+    "name",
+    "route",
+    "method",
+    "path",
+    "headers",
+    "path_variables",
+    "query_params",
+    "body",
+    "meta",
+    "hooks",
+    "response_body_schema",
+    "data_path",
+    "route_path",
+)
+
+DEFAULT_META_COLUMNS = ("component", "priority", "automation_status")
+
+
+def intern_value(value: Any) -> Any:
+    """
+    Returns value with every string it contains interned, lists becoming tuples.
+
+    Args:
+        value (Any): A YAML value.
+
+    Returns:
+        Any: The interned value.
+    """
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, (list, tuple)):
+        return tuple(intern_value(item) for item in value)
+    return value
+
+
+class SpecInterner:
+    """
+    SpecInterner class shares equal values between the specs built with it, e.g. the headers every
+    scenario of a route inherits. It only lives while specs are built, so nothing outlives them.
+    """
+
+    def __init__(self) -> None:
+        self._values: Dict[Hashable, Any] = {}
+
+    def share(self, key: Hashable, value: Any) -> Any:
+        """Returns the value first shared under key, or value itself."""
+        return self._values.setdefault(key, value)
+
+    def value(self, value: Any) -> Any:
+        """Returns the shared, interned copy of a YAML value."""
+        value = intern_value(value)
+        try:
+            return self.share(("value", freeze(value)), value)
+        except TypeError:
+            return value
+
+    def pairs(self, entries: Iterable[Mapping[str, Any]]) -> Tuple[Tuple[str, Any], ...]:
+        """Returns `key`/`value` parameter entries as a shared tuple of shared key/value pairs."""
+        pairs = tuple(self.value((entry["key"], entry["value"])) for entry in entries)
+        return self.share(("pairs", pairs), pairs)
+
+    def hooks(self, hooks: Iterable[dict]) -> Tuple[dict, ...]:
+        """Returns hooks as a shared tuple of shared hook mappings, which must not be modified."""
+        shared = tuple(self.share(("hook", freeze(hook)), hook) for hook in hooks)
+        return self.share(("hooks", tuple(map(id, shared))), shared)
+
+
+class ScenarioSpec:
+    """
+    ScenarioSpec class represents a frozen, slotted snapshot of a merged scenario.
+
+    Attributes:
+        name (str): The scenario name.
+        route (str): The name of the scenario's route.
+        method (str): The HTTP method.
+        path (str): The path template, with `{name}` placeholders for path variables.
+        headers (Tuple[Tuple[str, Any], ...]): The merged headers, as key/value pairs.
+        path_variables (Tuple[Tuple[str, Any], ...]): The merged path variables.
+        query_params (Tuple[Tuple[str, Any], ...]): The merged query parameters.
+        body (Any): The request body, if any.
+        meta (Layer): The merged meta, layered over the meta of the route.
+        hooks (Tuple[dict, ...]): The merged hooks, which must not be modified.
+        response_body_schema (Optional[dict]): The resolved response body schema, shared with the route.
+        data_path (str): The path of the scenario file.
+        route_path (str): The path of the route file, which tells apart routes with the same name.
+    """
+
+    __slots__ = SPEC_FIELDS
+
+    def __init__(
+        self,
+        name: str,
+        route: str,
+        method: str,
+        path: str,
+        headers: Sequence[Tuple[str, Any]] = (),
+        path_variables: Sequence[Tuple[str, Any]] = (),
+        query_params: Sequence[Tuple[str, Any]] = (),
+        body: Any = None,
+        meta: Optional[Mapping[str, Any]] = None,
+        hooks: Sequence[dict] = (),
+        response_body_schema: Optional[dict] = None,
+        data_path: str = "",
+        route_path: str = "",
+    ) -> None:
+        values = (
+            sys.intern(name),
+            sys.intern(route),
+            sys.intern(method),
+            sys.intern(path),
+            tuple(headers),
+            tuple(path_variables),
+            tuple(query_params),
+            body,
+            meta if isinstance(meta, Layer) else Layer(meta or {}),
+            tuple(hooks),
+            response_body_schema,
+            data_path,
+            sys.intern(route_path),
+        )
+        for field, value in zip(SPEC_FIELDS, values):
+            object.__setattr__(self, field, value)
+
+    @classmethod
+    def from_scenario(cls, scenario: Any, interner: Optional[SpecInterner] = None) -> "ScenarioSpec":
+        """
+        Creates the spec of a scenario, materializing it if it is lazy.
+
+        Args:
+            scenario (Any): A Scenario or LazyScenario instance.
+            interner (Optional[SpecInterner]): Shares equal values with the other specs built with it.
+
+        Returns:
+            ScenarioSpec: The spec, which holds no reference to the scenario, its data or its schema.
+        """
+        from routestpy.runner.scenario_request import route_name
+        from routestpy.runner.scenario_request import scenario_info
+
+        if interner is None:
+            interner = SpecInterner()
+        info = scenario_info(scenario)
+        parameters = scenario.scenario.get("parameters") or {}
+        meta = scenario.get_meta()
+        own = {sys.intern(key): interner.value(value) for key, value in getattr(meta, "own", meta).items()}
+        # The route and app meta layers are shared, only the own meta of the scenario is copied
+        return cls(
+            name=info.get("name") or "",
+            route=route_name(scenario),
+            method=info["method"],
+            path=info.get("path") or "/",
+            headers=interner.pairs(parameters.get("headers") or ()),
+            path_variables=interner.pairs(parameters.get("path_variables") or ()),
+            query_params=interner.pairs(parameters.get("query_params") or ()),
+            body=scenario.body,
+            meta=Layer(own, meta.parent if isinstance(meta, Layer) else None),
+            hooks=interner.hooks(scenario.scenario.get("hooks") or ()),
+            response_body_schema=info.get("response_body_schema"),
+            data_path=str(scenario.data_path),
+            route_path=str(scenario.parent.data_path),
+        )
+
+    def get_name(self) -> str:
+        return self.name
+
+    def get_meta(self) -> Layer:
+        return self.meta
+
+    def get_tags(self) -> Sequence[str]:
+        return self.meta.get("tags", ())
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"ScenarioSpec is immutable, cannot set {name}")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"ScenarioSpec is immutable, cannot delete {name}")
+
+    def __reduce__(self) -> Tuple[Any, Tuple[Any, ...]]:
+        return (self.__class__, tuple(getattr(self, field) for field in SPEC_FIELDS))
+
+    def __repr__(self) -> str:
+        return f"<ScenarioSpec {self.route}/{self.name!r} {self.method} {self.path}>"
+
+
+class Column:
+    """
+    Column class represents a dictionary encoded column: the distinct values, and per row the
+    position of its value in an unsigned int array.
+    """
+
+    __slots__ = ("values", "codes", "_positions")
+
+    def __init__(self) -> None:
+        self.values: List[Hashable] = []
+        self.codes = array("I")
+        self._positions: Dict[Hashable, int] = {}
+
+    def append(self, value: Hashable) -> None:
+        position = self._positions.get(value)
+        if position is None:
+            position = self._positions[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(position)
+
+    def code(self, value: Hashable) -> Optional[int]:
+        return self._positions.get(value)
+
+    def __getitem__(self, row: int) -> Hashable:
+        return self.values[self.codes[row]]
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+
+class ScenarioColumns:
+    """
+    ScenarioColumns class represents a columnar store of a suite: the route, method, path and
+    selected scalar meta fields of every spec, dictionary encoded, plus the load weights, indexed
+    by row, a row being the position of the spec in the suite.
+
+    Attributes:
+        columns (Dict[str, Column]): The encoded columns, by field name.
+        weights (array): The `load_weight` meta field of every row, 1.0 when missing.
+    """
+
+    def __init__(self, specs: Iterable[ScenarioSpec], meta_columns: Sequence[str] = DEFAULT_META_COLUMNS) -> None:
+        """
+        Initializes ScenarioColumns instance and encodes specs.
+
+        Args:
+            specs (Iterable[ScenarioSpec]): The specs of the suite.
+            meta_columns (Sequence[str]): Scalar meta fields to store, list values are skipped.
+
+        Returns: None
+        """
+        self.columns: Dict[str, Column] = {name: Column() for name in ("route", "method", "path", *meta_columns)}
+        self.weights = array("d")
+        self.meta_columns = tuple(meta_columns)
+        for spec in specs:
+            self.columns["route"].append(spec.route)
+            self.columns["method"].append(spec.method)
+            self.columns["path"].append(spec.path)
+            for field in self.meta_columns:
+                value = spec.meta.get(field)
+                scalar = isinstance(value, abc.Hashable) and not isinstance(value, tuple)
+                self.columns[field].append(value if scalar else None)
+            self.weights.append(float(spec.meta.get("load_weight", 1.0)))
+
+    def __len__(self) -> int:
+        return len(self.weights)
+
+    def column(self, name: str) -> Column:
+        """
+        Returns the column of a field.
+
+        Args:
+            name (str): "route", "method", "path" or one of the meta columns.
+
+        Returns:
+            Column: The column.
+
+        Raises:
+            KeyError: If the field is not stored.
+        """
+        return self.columns[name]
+
+    def rows(self, name: str, value: Hashable) -> List[int]:
+        """
+        Returns the rows whose field has value.
+
+        Args:
+            name (str): The field.
+            value (Hashable): The value to look up.
+
+        Returns:
+            List[int]: The matching rows, in ascending order.
+        """
+        column = self.columns[name]
+        code = column.code(value)
+        if code is None:
+            return []
+        return [row for row, row_code in enumerate(column.codes) if row_code == code]
+
+    def groups(self, name: str) -> Dict[Hashable, List[int]]:
+        """
+        Returns the rows grouped by the value of a field, e.g. by route for scheduling.
+
+        Args:
+            name (str): The field.
+
+        Returns:
+            Dict[Hashable, List[int]]: The rows of every value, in ascending order.
+        """
+        column = self.columns[name]
+        grouped: Dict[int, List[int]] = defaultdict(list)
+        for row, code in enumerate(column.codes):
+            grouped[code].append(row)
+        return {column.values[code]: rows for code, rows in grouped.items()}
+
+    @property
+    def nbytes(self) -> int:
+        """The size of the row arrays in bytes, excluding the distinct values."""
+        return sum(column.codes.itemsize * len(column.codes) for column in self.columns.values()) + (
+            self.weights.itemsize * len(self.weights)
+        )
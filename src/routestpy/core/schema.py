@@ -1,16 +1,80 @@
+import json
+import time
 from pathlib import Path
+from typing import TYPE_CHECKING
 from typing import Any
+from typing import Callable
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+from typing import Union
 
-import jsonschema
-import pykwalify.core
-import yaml
 from jsonschema import validators
+from jsonschema.exceptions import SchemaError
 from jsonschema.exceptions import ValidationError
 
+from routestpy.loaders.yaml_reader import load_file
+
+from .ref_resolver import ref_resolver
+from .schema_registry import schema_registry
+from .validators import get_validator_engine
+
+if TYPE_CHECKING:
+    # The runner depends on the core, not the other way round
+    from routestpy.runner.http_client import HttpResponse
+
+
+class BatchResult:
+    """
+    BatchResult class represents the outcome of validating many bodies against one schema.
+
+    Attributes:
+    - count (int): number of bodies validated
+    - errors (List[Tuple[int, str]]): position and error message of every invalid body
+    - duration (float): seconds spent validating, including reading and decoding the bodies
+    """
+
+    def __init__(self, count: int = 0, errors: Optional[List[Tuple[int, str]]] = None, duration: float = 0.0) -> None:
+        self.count = count
+        self.errors: List[Tuple[int, str]] = errors if errors is not None else []
+        self.duration = duration
+
+    @property
+    def valid(self) -> bool:
+        return not self.errors
+
+    @property
+    def items_per_second(self) -> float:
+        return self.count / self.duration if self.duration > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.count} bodies, {len(self.errors)} invalid, "
+            f"in {self.duration:.3f}s ({self.items_per_second:.0f} bodies/s)"
+        )
+
+
+def error_message(error: ValidationError) -> str:
+    """
+    Returns a validation error message prefixed with the path of the offending value, if any.
+
+    Args:
+    - error (ValidationError): the validation error
+
+    Returns:
+    - str: the message
+    """
+    path = "/".join(str(part) for part in error.absolute_path)
+    return f"{path}: {error.message}" if path else error.message
+
 
 class BaseBodySchema:
     """
-    BaseBodySchema class represents a base schema for HTTP request and response bodies.
+    BaseBodySchema class represents a base schema for HTTP request and response bodies. Schemas
+    are loaded, resolved and meta-validated once per file and shared through the schema registry,
+    and the validator compiled for a schema is shared by every instance using it.
     """
 
     def __init__(self, schema_path: Path) -> None:
@@ -18,7 +82,7 @@ class BaseBodySchema:
         Initializes BaseBodySchema instance with schema file path.
 
         Args:
-        - schema_path (str): path to the schema file
+        - schema_path (Path): path to the schema file
 
         Returns: None
         """
@@ -28,62 +92,85 @@ class BaseBodySchema:
         if not schema_path.exists():
             raise ValueError("schema_path is not a valid file path or URL")
 
-        # Load the schema from a file or URL
+        self.schema_path = schema_path
         try:
-            with open(schema_path) as f:
-                schema_data = yaml.safe_load(f)
-        except (FileNotFoundError, OSError):
+            self.schema: dict = schema_registry.get(schema_path, self.compile_schema)
+        except OSError:
             raise ValueError("Failed to load schema file")
 
-        # Validate the schema
-        try:
-            pykwalify.core.Core(source_data=schema_data, schema_data=schema_data).validate()
-        except pykwalify.errors.SchemaError as e:
-            raise ValueError(f"Invalid schema: {e}")
-
-        resolver = jsonschema.RefResolver(base_uri=schema_path, referrer=schema_data)
-        self.schema = jsonschema.validators.extend(
-            validators.Draft7Validator,
-            validators=[jsonschema.validators.RefResolver(self.schema, resolver=resolver)],
-        )
-        self.data_path: Path = None
+        self._data_path: Optional[Path] = None
         self.data: Any = {}
 
-        # Add dynamic properties to the class based on the schema
-        for prop, val in self.schema.schema["properties"].items():
+        # Add dynamic properties to the instance based on the schema, without shadowing its own attributes
+        properties = self.schema.get("properties") or {}
+        self._properties = tuple(prop for prop in properties if not hasattr(self, prop))
+        for prop in self._properties:
             setattr(self, prop, None)
 
+    def compile_schema(self, schema_path: Path, dependencies: Optional[Set[str]] = None) -> dict:
+        """
+        Loads the schema, resolves its `$ref` keys and validates it against its meta-schema.
+
+        Args:
+        - schema_path (Path): path to the schema file
+        - dependencies (Optional[Set[str]]): if given, receives the path of every referenced file
+
+        Returns:
+        - dict: the resolved schema
+
+        Raises:
+        - ValueError: if the schema is invalid
+        """
+        schema = ref_resolver.resolve(schema_path.parent, load_file(schema_path), dependencies, schema_path)
+        if not isinstance(schema, dict):
+            raise ValueError(f"Invalid schema: {schema_path} is not a mapping")
+        try:
+            validators.validator_for(schema).check_schema(schema)
+        except SchemaError as e:
+            raise ValueError(f"Invalid schema: {e.message}")
+        return schema
+
     @property
-    def data_path(self) -> Path:
+    def validator(self) -> Callable[[Any], None]:
+        """The compiled validator of the schema, raising jsonschema.ValidationError for invalid data."""
+        return get_validator_engine().validator(self.schema)
+
+    @property
+    def data_path(self) -> Optional[Path]:
         return self._data_path
 
     @data_path.setter
-    def data_path(self, value: str) -> None:
-        if not isinstance(value, str):
-            raise TypeError("data_path must be a string")
+    def data_path(self, value: Union[str, Path, None]) -> None:
+        if value is None:
+            self._data_path = None
+            return
+        if not isinstance(value, (str, Path)):
+            raise TypeError("data_path must be a string or a Path")
         path = Path(value)
+        if path == self._data_path:
+            return
         if not path.exists():
             raise ValueError("data_path is not a valid file path or URL")
 
-        # Load the data from a file or URL
+        # Load the data from a file, once per path
         try:
-            with open(value) as f:
-                self.data = yaml.safe_load(f)
-        except (FileNotFoundError, OSError):
+            data = load_file(path)
+        except OSError:
             raise ValueError("Failed to load data file")
 
         # Validate the data against the schema
         try:
-            self.schema.validate(self.data)
-        except jsonschema.exceptions.ValidationError:
-            raise ValueError("Data file does not match schema")
+            self.validator(data)
+        except ValidationError as e:
+            raise ValueError(f"Data file does not match schema: {error_message(e)}")
 
-        # Set property values from the data file
-        for prop, val in self.data.items():
-            if hasattr(self, prop):
-                setattr(self, prop, val)
+        self.data = data
+        self._data_path = path
 
-        self._data_path = value
+        # Set property values from the data file
+        if isinstance(data, dict):
+            for prop in self._properties:
+                setattr(self, prop, data.get(prop))
 
     def validate(self) -> None:
         """
@@ -95,9 +182,66 @@ class BaseBodySchema:
         """
         # Validate the stored data against the schema
         try:
-            self.schema.validate(self.data)
+            self.validator(self.data)
         except ValidationError as e:
-            raise ValueError(str(e))
+            raise ValueError(error_message(e))
+
+    def validate_many(self, bodies: Iterable[Any], decode: Optional[Callable[[Any], Any]] = None) -> BatchResult:
+        """
+        Validates every body against the schema with a single compiled validator.
+
+        Args:
+        - bodies (Iterable[Any]): the bodies, consumed lazily so they can be streamed from a file
+        - decode (Optional[Callable[[Any], Any]]): turns each body into data first, e.g. json.loads;
+          a ValueError it raises is recorded as the error of that body
+
+        Returns:
+        - BatchResult: the number of bodies, the error of every invalid body and the throughput
+        """
+        validate = self.validator
+        errors: List[Tuple[int, str]] = []
+        count = 0
+        started = time.perf_counter()
+        for index, body in enumerate(bodies):
+            count += 1
+            try:
+                validate(decode(body) if decode is not None else body)
+            except ValidationError as e:
+                errors.append((index, error_message(e)))
+            except ValueError as e:
+                errors.append((index, f"Invalid body: {e}"))
+        return BatchResult(count, errors, time.perf_counter() - started)
+
+    def validate_jsonl(self, path: Union[str, Path]) -> BatchResult:
+        """
+        Validates every line of a JSON Lines file, e.g. a file of fixtures.
+
+        Args:
+        - path (Union[str, Path]): path to the file
+
+        Returns:
+        - BatchResult: the batch result, an error position is the line number minus one
+        """
+        with open(path, encoding="utf-8") as f:
+            return self.validate_many(f, decode=json.loads)
+
+    def validate_responses(self, responses: Iterable[Optional["HttpResponse"]]) -> BatchResult:
+        """
+        Validates the JSON bodies of responses, e.g. the responses to every scenario of a route.
+
+        Args:
+        - responses (Iterable[Optional[HttpResponse]]): the responses, None for a scenario which has not run
+
+        Returns:
+        - BatchResult: the batch result, a missing response is reported as an error
+        """
+        return self.validate_many(responses, decode=_response_data)
+
+
+def _response_data(response: Optional["HttpResponse"]) -> Any:
+    if response is None:
+        raise ValueError("no response")
+    return json.loads(response.body)
 
 
 class BodySchema(BaseBodySchema):
@@ -0,0 +1,95 @@
+import os
+import threading
+from pathlib import Path
+from typing import Callable
+from typing import Dict
+from typing import Set
+from typing import Tuple
+
+
+class SchemaRegistry:
+    """
+    SchemaRegistry class represents a process-wide cache of loaded, resolved and meta-validated
+    schemas, keyed by the schema file path. An entry is reloaded when the schema file or any file
+    it pulls in through `$ref` has been modified.
+
+    Attributes:
+        hits (int): Number of lookups answered from the cache.
+        misses (int): Number of lookups that had to load the schema from disk.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes an empty SchemaRegistry instance.
+
+        Returns: None
+        """
+        self._entries: Dict[str, Tuple[Dict[str, int], dict]] = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, schema_path: Path, loader: Callable[[Path, Set[str]], dict]) -> dict:
+        """
+        Returns the compiled schema for schema_path, loading it with loader on the first call
+        or when the file or one of the files it references has been modified since it was cached.
+
+        Args:
+            schema_path (Path): The path to the schema file.
+            loader (Callable[[Path, Set[str]], dict]): Loads, resolves and meta-validates the schema,
+                adding the path of every file referenced through `$ref` to the given set.
+
+        Returns:
+            dict: The resolved schema data.
+
+        Raises:
+            OSError: If the schema file cannot be read.
+        """
+        key = os.path.abspath(schema_path)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._is_fresh(entry[0]):
+                self.hits += 1
+                return entry[1]
+
+            self.misses += 1
+            dependencies: Set[str] = {key}
+            versions = {key: os.stat(key).st_mtime_ns}
+            schema = loader(Path(key), dependencies)
+            for path in dependencies:
+                if path not in versions:
+                    versions[path] = os.stat(path).st_mtime_ns
+            self._entries[key] = (versions, schema)
+            return schema
+
+    @staticmethod
+    def _is_fresh(versions: Dict[str, int]) -> bool:
+        try:
+            return all(os.stat(path).st_mtime_ns == mtime for path, mtime in versions.items())
+        except OSError:
+            return False
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the cache counters.
+
+        Returns:
+            Dict[str, int]: The number of hits, misses and cached schemas.
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+    def clear(self) -> None:
+        """
+        Drops every cached schema and resets the counters.
+
+        Returns: None
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+schema_registry = SchemaRegistry()
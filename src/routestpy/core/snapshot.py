@@ -0,0 +1,231 @@
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict
+from typing import Iterable
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+from routestpy.__about__ import __version__
+
+SNAPSHOT_ENV = "ROUTESTPY_SNAPSHOT"
+SNAPSHOT_DIR = ".routestpy_cache"
+SNAPSHOT_FILE = "snapshot.jsonl"
+
+# Bump whenever the snapshot layout or the meaning of the cached data changes
+SNAPSHOT_VERSION = 2
+
+SCHEMA_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../schema"))
+
+
+def snapshot_enabled() -> bool:
+    """
+    Returns whether project snapshots are enabled, which can be turned off with ROUTESTPY_SNAPSHOT=0.
+
+    Returns:
+    - bool: True unless ROUTESTPY_SNAPSHOT is "0", "false", "no" or "off"
+    """
+    return os.getenv(SNAPSHOT_ENV, default="1").lower() not in ("0", "false", "no", "off")
+
+
+class ProjectSnapshot:
+    """
+    ProjectSnapshot class represents an on-disk cache of the resolved and validated data of every
+    project file. Each entry is keyed by the content hashes of the file and of every file its
+    `$ref` keys point to, and the whole snapshot is discarded when a schema file, the snapshot
+    version or the routestpy version changes.
+
+    The snapshot is a data-only JSON Lines file: a header line, then one line per entry with its
+    path and hashes, a tab, and the JSON data, decoded only when the entry is used. Data which
+    does not survive a JSON round trip, e.g. YAML dates or integer keys, is not cached.
+    """
+
+    def __init__(self, project_path: Path, schema_dir: str = SCHEMA_DIR) -> None:
+        """
+        Initializes ProjectSnapshot instance and loads the snapshot of the project, if any.
+
+        Args:
+        - project_path (Path): path to the project
+        - schema_dir (str): directory of the schema files the data is validated against
+
+        Returns: None
+        """
+        self.path = Path(project_path).joinpath(SNAPSHOT_DIR, SNAPSHOT_FILE)
+        self._hashes: Dict[str, str] = {}
+        self.header = {
+            "version": SNAPSHOT_VERSION,
+            "routestpy": __version__,
+            "schemas": {path: self.file_hash(path) for path in self._schema_files(schema_dir)},
+        }
+        self._cached: Dict[str, Tuple[Dict[str, str], str]] = {}
+        self._entries: Dict[str, Tuple[Dict[str, str], str]] = {}
+        # Whether an entry was added or replaced since the snapshot was read
+        self.changed = False
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    @staticmethod
+    def _schema_files(schema_dir: str) -> Iterable[str]:
+        return sorted(str(path) for path in Path(schema_dir).glob("*") if path.suffix in (".yaml", ".yml", ".json"))
+
+    def file_hash(self, path: str) -> str:
+        """
+        Returns the content hash of a file, hashing each file at most once per snapshot.
+
+        Args:
+        - path (str): absolute path to the file
+
+        Returns:
+        - str: hex digest of the file content
+        """
+        digest = self._hashes.get(path)
+        if digest is None:
+            with open(path, "rb") as f:
+                digest = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+            self._hashes[path] = digest
+        return digest
+
+    def load(self) -> None:
+        """
+        Reads the snapshot file, ignoring it if it is missing, unreadable or out of date.
+
+        Returns: None
+        """
+        entries = {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                if json.loads(f.readline()) != self.header:
+                    return
+                for line in f:
+                    meta, _, data = line.rstrip("\n").partition("\t")
+                    path, hashes = json.loads(meta)
+                    entries[path] = (hashes, data)
+        except (OSError, ValueError, TypeError):
+            return
+        self._cached = entries
+
+    def get(self, data_path: Path) -> Optional[dict]:
+        """
+        Returns the cached data of a file if neither the file nor its dependencies changed.
+
+        Args:
+        - data_path (Path): path to the data file
+
+        Returns:
+        - Optional[dict]: a fresh copy of the resolved and validated data, or None
+        """
+        key = os.path.abspath(data_path)
+        entry = self._cached.get(key)
+        try:
+            fresh = entry is not None and all(self.file_hash(p) == h for p, h in entry[0].items())
+        except OSError:
+            fresh = False
+
+        if not fresh:
+            self.misses += 1
+            return None
+
+        try:
+            data = json.loads(entry[1])
+        except ValueError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries[key] = entry
+        return data
+
+    def put(self, data_path: Path, data: dict, dependencies: Iterable[str]) -> None:
+        """
+        Stores the resolved and validated data of a file.
+
+        Args:
+        - data_path (Path): path to the data file
+        - data (dict): the resolved and validated data, serialized before it is merged into the project
+        - dependencies (Iterable[str]): paths of the data file and every file it references
+
+        Returns: None
+        """
+        key = os.path.abspath(data_path)
+        try:
+            text = json.dumps(data, ensure_ascii=False, separators=(",", ":"), allow_nan=False)
+            cacheable = json.loads(text) == data
+        except (TypeError, ValueError):
+            cacheable = False
+        if not cacheable:
+            self._entries.pop(key, None)
+            if self._cached.pop(key, None) is not None:
+                self.changed = True
+            return
+
+        entry = ({path: self.file_hash(path) for path in dependencies}, text)
+        if self._cached.get(key) != entry:
+            self.changed = True
+        self._entries[key] = entry
+
+    def dependencies(self, data_path: Path) -> Set[str]:
+        """
+        Returns the paths of the files an entry was loaded from.
+
+        Args:
+        - data_path (Path): path to the data file
+
+        Returns:
+        - Set[str]: absolute paths of the data file and every file it references, empty if there is no entry
+        """
+        key = os.path.abspath(data_path)
+        entry = self._entries.get(key) or self._cached.get(key)
+        return set(entry[0]) if entry is not None else set()
+
+    def forget(self, paths: Iterable[str]) -> None:
+        """
+        Drops the content hashes computed for files, to be called when they change.
+
+        Args:
+        - paths (Iterable[str]): absolute paths of the changed files
+
+        Returns: None
+        """
+        for path in paths:
+            self._hashes.pop(path, None)
+
+    def save(self) -> None:
+        """
+        Atomically writes the snapshot if an entry was added or replaced since it was read. Entries
+        not used by this run are kept as long as their data file exists.
+
+        Returns: None
+        """
+        if not self.changed:
+            return
+
+        entries = {path: entry for path, entry in self._cached.items() if os.path.exists(path)}
+        entries.update(self._entries)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=str(self.path.parent), prefix=SNAPSHOT_FILE)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(json.dumps(self.header) + "\n")
+                for path, (hashes, data) in entries.items():
+                    f.write(f"{json.dumps([path, hashes])}\t{data}\n")
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._cached = entries
+        self.changed = False
+
+    def clear(self) -> None:
+        """
+        Deletes the snapshot file, forcing the next run to re-process every file.
+
+        Returns: None
+        """
+        self._cached = {}
+        self._entries = {}
+        self.changed = False
+        if self.path.exists():
+            self.path.unlink()
@@ -0,0 +1,230 @@
+import codecs
+import json
+import re
+import threading
+from collections import OrderedDict
+from typing import Any
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from jsonschema.exceptions import ValidationError
+
+from .validators import VALIDATOR_CACHE_SIZE
+from .validators import ValidatorEngine
+from .validators import get_validator_engine
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+# Array keywords checked while streaming, any other keyword needs the whole array
+STREAMABLE_KEYWORDS = {"type", "items", "minItems", "maxItems", "$schema", "$id", "$comment", "title", "description"}
+
+
+# Batch schemas by id of their items schema, which each entry keeps alive so that ids are not reused
+_batch_schemas: "OrderedDict[int, Tuple[Any, dict]]" = OrderedDict()
+_batch_schemas_lock = threading.Lock()
+
+
+class StreamValidationError(ValueError):
+    """
+    Raised for a streamed body which is not valid JSON or does not match the schema.
+
+    Attributes:
+        index (Optional[int]): Position of the offending array item, if any.
+    """
+
+    def __init__(self, message: str, index: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.index = index
+
+
+def is_streamable(schema: Any) -> bool:
+    """
+    Returns whether a schema describes a top-level array which can be validated one item at a time.
+
+    Args:
+        schema (Any): The resolved schema.
+
+    Returns:
+        bool: True for an array schema with a single items schema and only count constraints.
+    """
+    return (
+        isinstance(schema, dict)
+        and schema.get("type") == "array"
+        and isinstance(schema.get("items", {}), dict)
+        and set(schema) <= STREAMABLE_KEYWORDS
+    )
+
+
+def batch_schema(items_schema: Any) -> dict:
+    """
+    Returns the array schema validating batches of items, the same object for the same items
+    schema, so the validator engine compiles it once rather than once per response.
+
+    Args:
+        items_schema (Any): The `items` schema of a streamable array schema.
+
+    Returns:
+        dict: The array schema.
+    """
+    key = id(items_schema)
+    with _batch_schemas_lock:
+        entry = _batch_schemas.get(key)
+        if entry is None:
+            entry = _batch_schemas[key] = (items_schema, {"type": "array", "items": items_schema})
+            if len(_batch_schemas) > VALIDATOR_CACHE_SIZE:
+                _batch_schemas.popitem(last=False)
+        else:
+            _batch_schemas.move_to_end(key)
+        return entry[1]
+
+
+class ArrayStreamValidator:
+    """
+    ArrayStreamValidator class validates a JSON array against an array schema while it is being
+    received. Each item is decoded and validated against the `items` schema as soon as it is
+    complete and then discarded, so memory stays bounded by the largest item rather than by the
+    body, and the first invalid item stops the transfer.
+
+    Items are located with json.JSONDecoder.raw_decode on the received text. A decode attempt on
+    an incomplete item is retried only once the buffered text has doubled, which keeps the work
+    linear in the body size even for items spanning many chunks. Decoded items are validated in
+    batches of at most batch_size, as one validator call per item costs more than the item.
+
+    Attributes:
+        count (int): The number of items validated so far.
+    """
+
+    def __init__(self, schema: dict, engine: Optional[ValidatorEngine] = None, batch_size: int = 256) -> None:
+        """
+        Initializes ArrayStreamValidator instance.
+
+        Args:
+            schema (dict): The resolved array schema, see is_streamable().
+            engine (Optional[ValidatorEngine]): Validates the items, the configured engine if None.
+            batch_size (int): The number of decoded items held before they are validated.
+
+        Raises:
+            ValueError: If the schema cannot be validated incrementally.
+        """
+        if not is_streamable(schema):
+            raise ValueError("Only array schemas with a single items schema can be validated incrementally")
+        self.schema = schema
+        self.items_schema = schema.get("items", {})
+        self.min_items = schema.get("minItems", 0)
+        self.max_items = schema.get("maxItems")
+        # Batches are validated as arrays, with one schema object per items schema
+        self.batch_schema = batch_schema(self.items_schema)
+        self.validate_batch = (engine or get_validator_engine()).validator(self.batch_schema)
+        self.batch_size = batch_size
+        self.batch: List[Any] = []
+        self.decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.position = 0
+        # One of "start", "first", "item", "separator" and "end"
+        self.state = "start"
+        self.count = 0
+        self._retry_size = 0
+
+    def feed(self, chunk: bytes) -> None:
+        """
+        Validates the items completed by a chunk of the body.
+
+        Args:
+            chunk (bytes): The next bytes of the body.
+
+        Raises:
+            StreamValidationError: At the first invalid item or syntax error.
+        """
+        self.buffer += self._text.decode(chunk)
+        self._parse(final=False)
+        self._flush()
+        if self.position > 65536 and self.position * 2 > len(self.buffer):
+            # Drop the consumed text so the buffer only holds the item being received
+            self.buffer = self.buffer[self.position :]
+            self.position = 0
+
+    def close(self) -> int:
+        """
+        Validates the rest of the body once it has been received completely.
+
+        Returns:
+            int: The number of items.
+
+        Raises:
+            StreamValidationError: If the body is invalid or incomplete.
+        """
+        self.buffer += self._text.decode(b"", final=True)
+        self._parse(final=True)
+        self._flush()
+        if self.state != "end":
+            raise StreamValidationError("Incomplete JSON array")
+        if self.count < self.min_items:
+            raise StreamValidationError(f"Expected at least {self.min_items} items, received {self.count}")
+        return self.count
+
+    def _parse(self, final: bool) -> None:
+        buffer = self.buffer
+        while True:
+            position = self.position = WHITESPACE.match(buffer, self.position).end()
+            if position == len(buffer):
+                return
+            char = buffer[position]
+
+            if self.state == "start":
+                if char != "[":
+                    raise StreamValidationError(f"Expected a JSON array, found {char!r}")
+                self.position += 1
+                self.state = "first"
+            elif self.state == "separator" or (self.state == "first" and char == "]"):
+                if char == "]":
+                    self.position += 1
+                    self.state = "end"
+                elif char == "," and self.state == "separator":
+                    self.position += 1
+                    self.state = "item"
+                else:
+                    raise StreamValidationError(f"Expected ',' or ']' after item {self.count - 1}, found {char!r}")
+            elif self.state == "end":
+                raise StreamValidationError(f"Unexpected data after the JSON array: {char!r}")
+            else:
+                available = len(buffer) - position
+                if not final and available < self._retry_size:
+                    return
+                try:
+                    item, end = self.decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError as e:
+                    if final:
+                        raise StreamValidationError(f"Invalid JSON in item {self.count}: {e}", self.count) from e
+                    self._retry_size = 2 * available
+                    return
+                if end == len(buffer) and not final:
+                    # A number may continue in the next chunk, wait for the character after it
+                    self._retry_size = available + 1
+                    return
+                self._retry_size = 0
+                self._validate(item)
+                self.position = end
+                self.state = "separator"
+
+    def _validate(self, item: Any) -> None:
+        if self.max_items is not None and self.count + len(self.batch) >= self.max_items:
+            self._flush()
+            raise StreamValidationError(f"Expected at most {self.max_items} items", self.count)
+        self.batch.append(item)
+        if len(self.batch) >= self.batch_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self.batch:
+            return
+        try:
+            self.validate_batch(self.batch)
+        except ValidationError as e:
+            path = list(e.absolute_path)
+            index = self.count + path[0] if path else self.count
+            where = "".join(f"[{part!r}]" for part in path[1:])
+            raise StreamValidationError(f"Item {index}{where}: {e.message}", index) from e
+        self.count += len(self.batch)
+        self.batch = []
@@ -0,0 +1,356 @@
+"""
+Boolean tag-expression language used to select scenarios.
+
+Grammar, from lowest to highest precedence::
+
+    expression := and_expr ("OR" and_expr)*
+    and_expr   := not_expr ("AND" not_expr)*
+    not_expr   := "NOT" not_expr | primary
+    primary    := "(" expression ")"
+                | "IS" ["NOT"] value                tag test
+                | ["NOT"] "IN" list                 any of the tags
+                | field ("==" | "!=") value         meta field test
+                | field ["NOT"] "IN" list           meta field has any of the values
+                | value                             tag test
+    list       := "[" value ("," value)* "]"
+
+Values are bare words or quoted strings. In field tests, bare `true`/`false` compare as booleans
+and bare numbers such as `1` or `0.5` as numbers, like the YAML values they are tested against;
+quote them to compare as strings.
+List-valued meta fields such as `tags` match when they contain the value.
+
+Examples: `smoke AND NOT slow`, `(smoke OR sanity) AND component == "billing"`,
+`IS NOT flaky`, `priority IN [P0, P1]`.
+"""
+import re
+from functools import lru_cache
+from functools import reduce
+from typing import Any
+from typing import Callable
+from typing import Hashable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from .tag_index import TagIndex
+
+KEYWORDS = {"AND", "OR", "NOT", "IS", "IN"}
+
+INTEGER_RE = re.compile(r"[-+]?[0-9]+")
+FLOAT_RE = re.compile(r"[-+]?(?:[0-9]+\.[0-9]*|\.[0-9]+|[0-9]+)(?:[eE][-+]?[0-9]+)?")
+
+TOKEN_RE = re.compile(
+    r"""\s*(?:
+        (?P<punct>==|!=|[()\[\],])
+      | "(?P<dstring>(?:[^"\\]|\\.)*)"
+      | '(?P<sstring>(?:[^'\\]|\\.)*)'
+      | (?P<word>[^\s()\[\],=!"']+)
+    )""",
+    re.VERBOSE,
+)
+
+
+class TagExpressionError(ValueError):
+    """Raised for a tag expression which cannot be parsed."""
+
+
+class Node:
+    """
+    Node class represents a node of a parsed tag expression.
+    """
+
+    def bits(self, index: TagIndex) -> int:
+        """Returns the bitset of the scenarios of index matching the node."""
+        raise NotImplementedError
+
+    def predicate(self) -> Callable[[dict], bool]:
+        """Returns a function testing whether scenario meta matches the node."""
+        raise NotImplementedError
+
+
+class FieldIn(Node):
+    """Matches scenarios whose meta field has, or contains, one of the values."""
+
+    def __init__(self, field: str, values: Tuple[Hashable, ...]) -> None:
+        self.field = field
+        self.values = values
+
+    def bits(self, index: TagIndex) -> int:
+        return reduce(lambda bits, value: bits | index.field(self.field, value), self.values, 0)
+
+    def predicate(self) -> Callable[[dict], bool]:
+        field, values = self.field, self.values
+
+        def matches(meta: dict) -> bool:
+            value = meta.get(field)
+            items = value if isinstance(value, (list, tuple)) else [value]
+            return any(_equal(item, expected) for item in items for expected in values)
+
+        return matches
+
+    def __repr__(self) -> str:
+        return f"FieldIn({self.field!r}, {self.values!r})"
+
+
+class Not(Node):
+    """Matches scenarios not matching its operand."""
+
+    def __init__(self, operand: Node) -> None:
+        self.operand = operand
+
+    def bits(self, index: TagIndex) -> int:
+        return index.negate(self.operand.bits(index))
+
+    def predicate(self) -> Callable[[dict], bool]:
+        operand = self.operand.predicate()
+        return lambda meta: not operand(meta)
+
+    def __repr__(self) -> str:
+        return f"Not({self.operand!r})"
+
+
+class And(Node):
+    """Matches scenarios matching all of its operands."""
+
+    def __init__(self, operands: List[Node]) -> None:
+        self.operands = operands
+
+    def bits(self, index: TagIndex) -> int:
+        return reduce(lambda bits, operand: bits & operand.bits(index), self.operands[1:], self.operands[0].bits(index))
+
+    def predicate(self) -> Callable[[dict], bool]:
+        operands = [operand.predicate() for operand in self.operands]
+        return lambda meta: all(operand(meta) for operand in operands)
+
+    def __repr__(self) -> str:
+        return f"And({self.operands!r})"
+
+
+class Or(Node):
+    """Matches scenarios matching any of its operands."""
+
+    def __init__(self, operands: List[Node]) -> None:
+        self.operands = operands
+
+    def bits(self, index: TagIndex) -> int:
+        return reduce(lambda bits, operand: bits | operand.bits(index), self.operands, 0)
+
+    def predicate(self) -> Callable[[dict], bool]:
+        operands = [operand.predicate() for operand in self.operands]
+        return lambda meta: any(operand(meta) for operand in operands)
+
+    def __repr__(self) -> str:
+        return f"Or({self.operands!r})"
+
+
+def _equal(item: Any, expected: Hashable) -> bool:
+    # Keep True distinct from 1, as YAML booleans are distinct from numbers
+    return item == expected and isinstance(item, bool) == isinstance(expected, bool)
+
+
+class Parser:
+    """
+    Parser class turns a tag expression into a tree of Node objects.
+    """
+
+    def __init__(self, text: str) -> None:
+        """
+        Initializes Parser instance and tokenizes the expression.
+
+        Args:
+            text (str): The tag expression.
+
+        Raises:
+            TagExpressionError: If the expression contains an invalid character.
+        """
+        self.text = text
+        # Tokens are (kind, value, position) with kind one of "punct", "string", "word" and "keyword"
+        self.tokens: List[Tuple[str, str, int]] = []
+        position = 0
+        while text[position:].strip():
+            match = TOKEN_RE.match(text, position)
+            if match is None:
+                raise self.error("Unexpected character", len(text) - len(text[position:].lstrip()))
+            kind = match.lastgroup or ""
+            value, start = match.group(kind), match.start(kind)
+            if kind in ("dstring", "sstring"):
+                kind, value = "string", re.sub(r"\\(.)", r"\1", value)
+            elif kind == "word" and value in KEYWORDS:
+                kind = "keyword"
+            self.tokens.append((kind, value, start))
+            position = match.end()
+        self.position = 0
+
+    def error(self, message: str, position: Optional[int] = None) -> TagExpressionError:
+        if position is None:
+            position = self.tokens[self.position][2] if self.position < len(self.tokens) else len(self.text)
+        return TagExpressionError(f"{message} at position {position} of tag expression {self.text!r}")
+
+    def peek(self, offset: int = 0) -> Tuple[str, str, int]:
+        if self.position + offset < len(self.tokens):
+            return self.tokens[self.position + offset]
+        return ("end", "", len(self.text))
+
+    def accept(self, kind: str, value: Optional[str] = None) -> bool:
+        token = self.peek()
+        if token[0] == kind and (value is None or token[1] == value):
+            self.position += 1
+            return True
+        return False
+
+    def expect(self, kind: str, value: Optional[str] = None) -> str:
+        token = self.peek()
+        if not self.accept(kind, value):
+            raise self.error(f"Expected {value or kind}, found {token[1] or 'end of expression'!r}")
+        return token[1]
+
+    def parse(self) -> Node:
+        """
+        Parses the whole expression.
+
+        Returns:
+            Node: The root of the expression tree.
+
+        Raises:
+            TagExpressionError: If the expression is invalid.
+        """
+        if not self.tokens:
+            raise self.error("Empty expression")
+        node = self.expression()
+        if self.peek()[0] != "end":
+            raise self.error(f"Unexpected {self.peek()[1]!r}")
+        return node
+
+    def expression(self) -> Node:
+        operands = [self.and_expr()]
+        while self.accept("keyword", "OR"):
+            operands.append(self.and_expr())
+        return operands[0] if len(operands) == 1 else Or(operands)
+
+    def and_expr(self) -> Node:
+        operands = [self.not_expr()]
+        while self.accept("keyword", "AND"):
+            operands.append(self.not_expr())
+        return operands[0] if len(operands) == 1 else And(operands)
+
+    def not_expr(self) -> Node:
+        if self.peek()[:2] == ("keyword", "NOT") and self.peek(1)[:2] != ("keyword", "IN"):
+            self.position += 1
+            return Not(self.not_expr())
+        return self.primary()
+
+    def primary(self) -> Node:
+        if self.accept("punct", "("):
+            node = self.expression()
+            self.expect("punct", ")")
+            return node
+        if self.accept("keyword", "IS"):
+            negate = self.accept("keyword", "NOT")
+            node: Node = FieldIn("tags", (self.value(),))
+            return Not(node) if negate else node
+        if self.peek()[0] == "keyword":
+            return self.membership("tags")
+
+        kind, word, _ = self.peek()
+        if kind == "word" and self.peek(1)[:2] in (("punct", "=="), ("punct", "!=")):
+            self.position += 1
+            negate = self.expect("punct") == "!="
+            node = FieldIn(word, (self.value(literal=True),))
+            return Not(node) if negate else node
+        if kind == "word" and self.peek(1)[0] == "keyword" and self.peek(1)[1] in ("IN", "NOT"):
+            self.position += 1
+            return self.membership(word)
+        return FieldIn("tags", (self.value(),))
+
+    def membership(self, field: str) -> Node:
+        negate = self.accept("keyword", "NOT")
+        self.expect("keyword", "IN")
+        self.expect("punct", "[")
+        values = [self.value(literal=field != "tags")]
+        while self.accept("punct", ","):
+            values.append(self.value(literal=field != "tags"))
+        self.expect("punct", "]")
+        node: Node = FieldIn(field, tuple(values))
+        return Not(node) if negate else node
+
+    def value(self, literal: bool = False) -> Hashable:
+        kind, value, _ = self.peek()
+        if kind not in ("word", "string"):
+            raise self.error(f"Expected a value, found {value or 'end of expression'!r}")
+        self.position += 1
+        if literal and kind == "word":
+            if value in ("true", "false"):
+                return value == "true"
+            if INTEGER_RE.fullmatch(value):
+                return int(value)
+            if FLOAT_RE.fullmatch(value):
+                return float(value)
+        return value
+
+
+class TagExpression:
+    """
+    TagExpression class represents a compiled tag expression, usable both against a TagIndex
+    and as a predicate on a single scenario.
+    """
+
+    def __init__(self, text: str) -> None:
+        """
+        Initializes TagExpression instance by parsing and compiling text.
+
+        Args:
+            text (str): The tag expression.
+
+        Raises:
+            TagExpressionError: If the expression is invalid.
+        """
+        self.text = text
+        self.tree = Parser(text).parse()
+        self._predicate = self.tree.predicate()
+
+    def bits(self, index: TagIndex) -> int:
+        """
+        Returns the bitset of the scenarios of index matching the expression.
+
+        Args:
+            index (TagIndex): The index to evaluate against.
+
+        Returns:
+            int: The bitset of matching scenario ids.
+        """
+        return self.tree.bits(index)
+
+    def select(self, index: TagIndex) -> List[Any]:
+        """
+        Returns the scenarios of index matching the expression, in collection order.
+
+        Args:
+            index (TagIndex): The index to evaluate against.
+
+        Returns:
+            List[Any]: The matching scenarios.
+        """
+        return index.select(self.bits(index))
+
+    def __call__(self, scenario: Any) -> bool:
+        return self._predicate(scenario.get_meta())
+
+    def __repr__(self) -> str:
+        return f"TagExpression({self.text!r})"
+
+
+@lru_cache(maxsize=256)
+def compile_expression(text: str) -> TagExpression:
+    """
+    Returns the compiled tag expression, reusing it for repeated selections.
+
+    Args:
+        text (str): The tag expression.
+
+    Returns:
+        TagExpression: The compiled expression.
+
+    Raises:
+        TagExpressionError: If the expression is invalid.
+    """
+    return TagExpression(text)
@@ -0,0 +1,153 @@
+from collections import abc
+from collections import defaultdict
+from typing import Any
+from typing import Dict
+from typing import Hashable
+from typing import Iterable
+from typing import List
+from typing import Sequence
+from typing import Tuple
+
+
+class TagIndex:
+    """
+    TagIndex class represents an inverted index of scenario meta. Every value of every meta
+    field, e.g. each tag, component, priority or automation_status, maps to a bitset of the ids
+    of the scenarios having it, stored as a Python int, so that filters are bitset operations.
+    Booleans are kept distinct from numbers, e.g. `true` from 1, like in tag expression predicates.
+
+    Attributes:
+        scenarios (List[Any]): The indexed scenarios, a scenario id is its position in this list.
+        all (int): The bitset of every scenario.
+    """
+
+    def __init__(self, scenarios: Iterable[Any]) -> None:
+        """
+        Initializes TagIndex instance and indexes the meta of every scenario.
+
+        Args:
+            scenarios (Iterable[Any]): Scenario or LazyScenario objects.
+
+        Returns: None
+        """
+        self.scenarios: List[Any] = list(scenarios)
+        self.all = (1 << len(self.scenarios)) - 1
+
+        ids: Dict[str, Dict[Tuple[bool, Hashable], List[int]]] = defaultdict(lambda: defaultdict(list))
+        for scenario_id, scenario in enumerate(self.scenarios):
+            for field, value in scenario.get_meta().items():
+                for item in value if isinstance(value, (list, tuple)) else [value]:
+                    if isinstance(item, abc.Hashable):
+                        ids[field][_key(item)].append(scenario_id)
+
+        self._index: Dict[str, Dict[Tuple[bool, Hashable], int]] = {
+            field: {value: self._bitset(value_ids) for value, value_ids in values.items()}
+            for field, values in ids.items()
+        }
+
+    def _bitset(self, ids: Sequence[int]) -> int:
+        # Setting bits in a bytearray keeps building linear in the number of scenarios
+        bits = bytearray((len(self.scenarios) + 7) // 8)
+        for scenario_id in ids:
+            bits[scenario_id >> 3] |= 1 << (scenario_id & 7)
+        return int.from_bytes(bits, "little")
+
+    def field(self, field: str, value: Hashable) -> int:
+        """
+        Returns the bitset of the scenarios whose meta field has value, or contains it for list fields.
+
+        Args:
+            field (str): The meta field, e.g. "component".
+            value (Hashable): The value to look up.
+
+        Returns:
+            int: The bitset of matching scenario ids.
+        """
+        return self._index.get(field, {}).get(_key(value), 0)
+
+    def tag(self, tag: str) -> int:
+        """
+        Returns the bitset of the scenarios tagged with tag.
+
+        Args:
+            tag (str): The tag to look up.
+
+        Returns:
+            int: The bitset of matching scenario ids.
+        """
+        return self.field("tags", tag)
+
+    def values(self, field: str) -> List[Hashable]:
+        """
+        Returns every indexed value of a meta field.
+
+        Args:
+            field (str): The meta field.
+
+        Returns:
+            List[Hashable]: The distinct values.
+        """
+        return [value for _, value in self._index.get(field, {})]
+
+    def negate(self, bits: int) -> int:
+        """
+        Returns the bitset of the scenarios not in bits.
+
+        Args:
+            bits (int): A bitset of scenario ids.
+
+        Returns:
+            int: The complement of bits.
+        """
+        return self.all & ~bits
+
+    @staticmethod
+    def count(bits: int) -> int:
+        """
+        Returns the number of scenarios in bits.
+
+        Args:
+            bits (int): A bitset of scenario ids.
+
+        Returns:
+            int: The number of set bits.
+        """
+        return bin(bits).count("1")
+
+    def ids(self, bits: int) -> List[int]:
+        """
+        Returns the scenario ids in bits, in ascending order.
+
+        Args:
+            bits (int): A bitset of scenario ids.
+
+        Returns:
+            List[int]: The scenario ids.
+        """
+        result = []
+        data = bits.to_bytes((len(self.scenarios) + 7) // 8, "little")
+        # Scanning 64-bit words skips empty regions of sparse selections quickly
+        for offset in range(0, len(data), 8):
+            word = int.from_bytes(data[offset : offset + 8], "little")
+            while word:
+                low = word & -word
+                result.append((offset << 3) + low.bit_length() - 1)
+                word ^= low
+        return result
+
+    def select(self, bits: int) -> List[Any]:
+        """
+        Returns the scenarios in bits, in collection order.
+
+        Args:
+            bits (int): A bitset of scenario ids.
+
+        Returns:
+            List[Any]: The selected scenarios.
+        """
+        return [self.scenarios[scenario_id] for scenario_id in self.ids(bits)]
+
+
+def _key(value: Hashable) -> Tuple[bool, Hashable]:
+    # A plain dict lookup would find 1 for True, as True == 1 and hash(True) == hash(1)
+    return (isinstance(value, bool), value)
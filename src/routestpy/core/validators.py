@@ -0,0 +1,433 @@
+import abc
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+from jsonschema import validators
+from jsonschema.exceptions import best_match
+
+VALIDATOR_ENGINE_ENV = "ROUTESTPY_VALIDATOR_ENGINE"
+
+# Number of compiled validators an engine keeps, the least recently used ones are dropped
+VALIDATOR_CACHE_SIZE = 1024
+
+# Keywords which never affect the validation result
+ANNOTATION_KEYWORDS = {"$schema", "$id", "$comment", "title", "description", "default", "examples", "format"}
+
+
+class UnsupportedSchemaError(Exception):
+    """Raised when the code generator meets a keyword it cannot compile."""
+
+
+class ValidatorEngine(abc.ABC):
+    """
+    ValidatorEngine class represents a strategy for validating data against a resolved schema.
+    Compiled validators are cached per schema object in a bounded LRU cache, so each schema in use
+    is compiled once and schemas no longer used are eventually released.
+    """
+
+    name = ""
+
+    def __init__(self, cache_size: int = VALIDATOR_CACHE_SIZE) -> None:
+        """
+        Initializes ValidatorEngine instance with an empty compiled validator cache.
+
+        Args:
+            cache_size (int): The maximum number of compiled validators kept.
+
+        Returns: None
+        """
+        # The schema is kept alongside its validator so that its id() is not reused while cached
+        self._compiled: "OrderedDict[int, Tuple[dict, Callable[[Any], None]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.cache_size = cache_size
+
+    def validator(self, schema: dict) -> Callable[[Any], None]:
+        """
+        Returns the compiled validator for schema, compiling it on first use.
+
+        Args:
+            schema (dict): The resolved schema.
+
+        Returns:
+            Callable[[Any], None]: A function raising jsonschema.ValidationError for invalid data.
+        """
+        key = id(schema)
+        with self._lock:
+            entry = self._compiled.get(key)
+            if entry is not None:
+                self._compiled.move_to_end(key)
+                return entry[1]
+            entry = self._compiled[key] = (schema, self.compile(schema))
+            if len(self._compiled) > self.cache_size:
+                self._compiled.popitem(last=False)
+            return entry[1]
+
+    def validate(self, data: Any, schema: dict) -> None:
+        """
+        Validates data against schema.
+
+        Args:
+            data (Any): The data to validate.
+            schema (dict): The resolved schema.
+
+        Raises:
+            jsonschema.ValidationError: If the data is invalid.
+        """
+        self.validator(schema)(data)
+
+    @abc.abstractmethod
+    def compile(self, schema: dict) -> Callable[[Any], None]:
+        """
+        Compiles a validator for schema.
+
+        Args:
+            schema (dict): The resolved schema.
+
+        Returns:
+            Callable[[Any], None]: A function raising jsonschema.ValidationError for invalid data.
+        """
+
+
+class JsonSchemaEngine(ValidatorEngine):
+    """
+    JsonSchemaEngine class builds one jsonschema validator object per schema and reuses it.
+    """
+
+    name = "jsonschema"
+
+    def compile(self, schema: dict) -> Callable[[Any], None]:
+        # The schema has already been meta-validated by the schema registry
+        validator = validators.validator_for(schema)(schema)
+
+        def validate(data: Any) -> None:
+            error = best_match(validator.iter_errors(data))
+            if error is not None:
+                raise error
+
+        return validate
+
+
+class CodegenEngine(ValidatorEngine):
+    """
+    CodegenEngine class turns a resolved schema into a plain Python function. Invalid data is
+    re-validated with jsonschema to produce the same error messages, and schemas using keywords
+    the generator does not support are validated with jsonschema altogether.
+    """
+
+    name = "codegen"
+
+    def __init__(self, cache_size: int = VALIDATOR_CACHE_SIZE) -> None:
+        super().__init__(cache_size)
+        # Only used to compile, its own cache stays empty
+        self.fallback = JsonSchemaEngine()
+
+    def compile(self, schema: dict) -> Callable[[Any], None]:
+        explain = self.fallback.compile(schema)
+        try:
+            check = SchemaCodeGenerator(schema).build()
+        except UnsupportedSchemaError:
+            return explain
+
+        def validate(data: Any) -> None:
+            if not check(data):
+                explain(data)
+
+        return validate
+
+
+def _is_integer(value: Any) -> bool:
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, float):
+        return value.is_integer()
+    return isinstance(value, int)
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _json_equal(one: Any, two: Any) -> bool:
+    if isinstance(one, bool) or isinstance(two, bool):
+        return isinstance(one, bool) and isinstance(two, bool) and one == two
+    if isinstance(one, dict) and isinstance(two, dict):
+        return one.keys() == two.keys() and all(_json_equal(one[k], two[k]) for k in one)
+    if isinstance(one, list) and isinstance(two, list):
+        return len(one) == len(two) and all(_json_equal(a, b) for a, b in zip(one, two))
+    return one == two
+
+
+def _is_unique(items: List[Any]) -> bool:
+    for i, item in enumerate(items):
+        for other in items[i + 1 :]:
+            if _json_equal(item, other):
+                return False
+    return True
+
+
+TYPE_CHECKS = {
+    "object": "isinstance({v}, dict)",
+    "array": "isinstance({v}, list)",
+    "string": "isinstance({v}, str)",
+    "boolean": "isinstance({v}, bool)",
+    "null": "{v} is None",
+    "integer": "_is_integer({v})",
+    "number": "_is_number({v})",
+}
+
+
+class SchemaCodeGenerator:
+    """
+    SchemaCodeGenerator class compiles a resolved JSON schema into Python source with one
+    function per schema node, each returning whether its argument is valid.
+    """
+
+    supported_keywords = {
+        "type",
+        "enum",
+        "const",
+        "allOf",
+        "anyOf",
+        "oneOf",
+        "not",
+        "minLength",
+        "maxLength",
+        "pattern",
+        "minimum",
+        "maximum",
+        "exclusiveMinimum",
+        "exclusiveMaximum",
+        "items",
+        "minItems",
+        "maxItems",
+        "uniqueItems",
+        "properties",
+        "required",
+        "patternProperties",
+        "additionalProperties",
+        "propertyNames",
+        "minProperties",
+        "maxProperties",
+    }
+
+    def __init__(self, schema: Any) -> None:
+        """
+        Initializes SchemaCodeGenerator instance with the schema to compile.
+
+        Args:
+            schema (Any): The resolved schema.
+
+        Returns: None
+        """
+        self.schema = schema
+        self.known_keywords = set(validators.validator_for(schema if isinstance(schema, dict) else {}).VALIDATORS)
+        self.functions: List[str] = []
+        self.constants: Dict[str, Any] = {}
+
+    def build(self) -> Callable[[Any], bool]:
+        """
+        Generates and compiles the validation function.
+
+        Returns:
+            Callable[[Any], bool]: A function returning True if the data is valid.
+
+        Raises:
+            UnsupportedSchemaError: If the schema uses a keyword the generator cannot compile.
+        """
+        entry = self.node(self.schema)
+        namespace: Dict[str, Any] = {
+            "re": re,
+            "_is_integer": _is_integer,
+            "_is_number": _is_number,
+            "_json_equal": _json_equal,
+            "_is_unique": _is_unique,
+        }
+        namespace.update(self.constants)
+        exec(compile("\n\n".join(self.functions), "<routestpy-validator>", "exec"), namespace)  # noqa: S102
+        return namespace[entry]
+
+    def constant(self, value: Any) -> str:
+        name = f"_c{len(self.constants)}"
+        self.constants[name] = value
+        return name
+
+    def node(self, schema: Any) -> str:
+        name = f"_v{len(self.functions)}"
+        self.functions.append("")  # reserve the slot so that nested functions get distinct names
+        lines = [f"def {name}(x):"]
+
+        if schema is True or schema == {}:
+            lines.append("    return True")
+        elif schema is False:
+            lines.append("    return False")
+        elif isinstance(schema, dict):
+            lines.extend(self.body(schema))
+            lines.append("    return True")
+        else:
+            raise UnsupportedSchemaError(f"Unsupported schema: {schema!r}")
+
+        self.functions[int(name[2:])] = "\n".join(lines)
+        return name
+
+    def body(self, schema: dict) -> List[str]:
+        lines: List[str] = []
+        unsupported = set(schema) & (self.known_keywords - self.supported_keywords - ANNOTATION_KEYWORDS)
+        if unsupported:
+            raise UnsupportedSchemaError(f"Unsupported keywords: {sorted(unsupported)}")
+
+        if "type" in schema:
+            types = schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+            if any(t not in TYPE_CHECKS for t in types):
+                raise UnsupportedSchemaError(f"Unsupported type: {schema['type']!r}")
+            checks = " or ".join(TYPE_CHECKS[t].format(v="x") for t in types)
+            lines.append(f"    if not ({checks}):\n        return False")
+
+        if "enum" in schema:
+            lines.append(f"    if not any(_json_equal(x, e) for e in {self.constant(schema['enum'])}):\n        return False")
+        if "const" in schema:
+            lines.append(f"    if not _json_equal(x, {self.constant(schema['const'])}):\n        return False")
+
+        for keyword in ("allOf", "anyOf", "oneOf"):
+            if keyword in schema:
+                calls = ", ".join(f"{self.node(sub)}(x)" for sub in schema[keyword])
+                test = {"allOf": f"all(({calls},))", "anyOf": f"any(({calls},))", "oneOf": f"sum(({calls},)) == 1"}
+                lines.append(f"    if not {test[keyword]}:\n        return False")
+        if "not" in schema:
+            lines.append(f"    if {self.node(schema['not'])}(x):\n        return False")
+
+        lines.extend(self.string_checks(schema))
+        lines.extend(self.number_checks(schema))
+        lines.extend(self.array_checks(schema))
+        lines.extend(self.object_checks(schema))
+        return lines
+
+    def string_checks(self, schema: dict) -> List[str]:
+        checks = []
+        if "minLength" in schema:
+            checks.append(f"len(x) < {int(schema['minLength'])}")
+        if "maxLength" in schema:
+            checks.append(f"len(x) > {int(schema['maxLength'])}")
+        if "pattern" in schema:
+            checks.append(f"{self.constant(re.compile(schema['pattern']))}.search(x) is None")
+        return self.guarded("isinstance(x, str)", checks)
+
+    def number_checks(self, schema: dict) -> List[str]:
+        checks = []
+        for keyword, operator in (
+            ("minimum", "<"),
+            ("maximum", ">"),
+            ("exclusiveMinimum", "<="),
+            ("exclusiveMaximum", ">="),
+        ):
+            if keyword in schema:
+                if isinstance(schema[keyword], bool):
+                    raise UnsupportedSchemaError(f"Unsupported {keyword}: {schema[keyword]!r}")
+                checks.append(f"x {operator} {self.constant(schema[keyword])}")
+        return self.guarded("_is_number(x)", checks)
+
+    def array_checks(self, schema: dict) -> List[str]:
+        checks = []
+        if "minItems" in schema:
+            checks.append(f"len(x) < {int(schema['minItems'])}")
+        if "maxItems" in schema:
+            checks.append(f"len(x) > {int(schema['maxItems'])}")
+        if schema.get("uniqueItems") is True:
+            checks.append("not _is_unique(x)")
+        if "items" in schema:
+            if isinstance(schema["items"], list):
+                raise UnsupportedSchemaError("Unsupported tuple form of items")
+            checks.append(f"not all({self.node(schema['items'])}(i) for i in x)")
+        return self.guarded("isinstance(x, list)", checks)
+
+    def object_checks(self, schema: dict) -> List[str]:
+        checks = []
+        if "minProperties" in schema:
+            checks.append(f"len(x) < {int(schema['minProperties'])}")
+        if "maxProperties" in schema:
+            checks.append(f"len(x) > {int(schema['maxProperties'])}")
+        if schema.get("required"):
+            checks.append(f"not all(k in x for k in {self.constant(tuple(schema['required']))})")
+        for key, sub in schema.get("properties", {}).items():
+            key = self.constant(key)
+            checks.append(f"{key} in x and not {self.node(sub)}(x[{key}])")
+        patterns = [
+            (self.constant(re.compile(pattern)), self.node(sub))
+            for pattern, sub in schema.get("patternProperties", {}).items()
+        ]
+        for pattern, function in patterns:
+            checks.append(f"not all({function}(v) for k, v in x.items() if {pattern}.search(k))")
+        if "additionalProperties" in schema:
+            known = self.constant(frozenset(schema.get("properties", {})))
+            extra = f"k not in {known}" + "".join(f" and not {p}.search(k)" for p, _ in patterns)
+            checks.append(f"not all({self.node(schema['additionalProperties'])}(v) for k, v in x.items() if {extra})")
+        if "propertyNames" in schema:
+            checks.append(f"not all({self.node(schema['propertyNames'])}(k) for k in x)")
+        return self.guarded("isinstance(x, dict)", checks)
+
+    @staticmethod
+    def guarded(guard: str, checks: List[str]) -> List[str]:
+        if not checks:
+            return []
+        lines = [f"    if {guard}:"]
+        for check in checks:
+            lines.append(f"        if {check}:\n            return False")
+        return lines
+
+
+ENGINES: Dict[str, Callable[[], ValidatorEngine]] = {
+    JsonSchemaEngine.name: JsonSchemaEngine,
+    CodegenEngine.name: CodegenEngine,
+}
+
+_engines: Dict[str, ValidatorEngine] = {}
+_engines_lock = threading.Lock()
+_engine_name = os.getenv(VALIDATOR_ENGINE_ENV, default=JsonSchemaEngine.name)
+
+
+def get_validator_engine(name: str = "") -> ValidatorEngine:
+    """
+    Returns the shared validator engine called name, or the configured engine if name is empty.
+
+    Args:
+        name (str): The engine name, "jsonschema" or "codegen".
+
+    Returns:
+        ValidatorEngine: The shared engine instance.
+
+    Raises:
+        ValueError: If the engine name is unknown.
+    """
+    name = name or _engine_name
+    if name not in ENGINES:
+        raise ValueError(f"Invalid validator engine: {name}")
+    engine = _engines.get(name)
+    if engine is None:
+        # Project loader threads may ask for the engine concurrently, only one instance is shared
+        with _engines_lock:
+            engine = _engines.get(name)
+            if engine is None:
+                engine = _engines[name] = ENGINES[name]()
+    return engine
+
+
+def set_validator_engine(name: str) -> None:
+    """
+    Selects the validator engine used by BaseYamlSchema.is_valid_data.
+
+    Args:
+        name (str): The engine name, "jsonschema" or "codegen".
+
+    Raises:
+        ValueError: If the engine name is unknown.
+    """
+    global _engine_name
+
+    get_validator_engine(name)
+    _engine_name = name
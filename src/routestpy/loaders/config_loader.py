@@ -1,12 +1,156 @@
-import glob
 import os
+import threading
 from pathlib import Path
-from types import SimpleNamespace
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Hashable
+from typing import List
+from typing import Optional
+from typing import Tuple
 
 from routestpy import DotEnvLoader
 from routestpy import JsonLoader
 from routestpy import TomlLoader
 from routestpy import YamlLoader
+from routestpy.core.config import Config
+from routestpy.core.config import environment_layer
+from routestpy.core.config import merge_layers
+
+# Name of the optional config file every environment file is layered over, e.g. config/base.yaml
+BASE_CONFIG_NAME = "base"
+
+LOADERS: Dict[str, Callable[[], Any]] = {
+    "json": JsonLoader,
+    "yaml": YamlLoader,
+    "toml": TomlLoader,
+    "env": DotEnvLoader,
+}
+
+
+class ConfigCache:
+    """
+    ConfigCache class represents a process-wide cache of parsed config files, keyed by path,
+    modification time and size, and of the configs merged from them, so that building many
+    applications reads and merges each config once. Only the latest version of each file and of
+    each combination of files is kept, so a long-running process reloading edited configs does
+    not accumulate them.
+
+    Attributes:
+        hits (int): Number of loads answered from the cache.
+        misses (int): Number of loads that had to read a file or merge layers.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes an empty ConfigCache instance.
+
+        Returns: None
+        """
+        self._files: Dict[str, Tuple[Tuple[int, int], dict]] = {}
+        self._listings: Dict[str, Tuple[int, List[str]]] = {}
+        # By the paths of the layered files: the key of the cached version and its config
+        self._configs: Dict[Tuple[str, ...], Tuple[Hashable, Config]] = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def listing(self, directory: Path) -> List[str]:
+        """
+        Returns the names of the files of a directory, listed again only when it was modified.
+
+        Args:
+            directory (Path): The config directory.
+
+        Returns:
+            List[str]: The file names, empty if the directory does not exist.
+        """
+        key = os.path.abspath(directory)
+        try:
+            mtime = os.stat(key).st_mtime_ns
+        except OSError:
+            return []
+        with self._lock:
+            entry = self._listings.get(key)
+            if entry is None or entry[0] != mtime:
+                entry = self._listings[key] = (mtime, sorted(os.listdir(key)))
+            return entry[1]
+
+    def version(self, path: str) -> Tuple[int, int]:
+        """
+        Returns the modification time and size identifying the content of a file.
+
+        Args:
+            path (str): The absolute path of the file.
+
+        Returns:
+            Tuple[int, int]: The modification time in nanoseconds and the size.
+        """
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def file(self, path: str, loader: Callable[[str], Any]) -> dict:
+        """
+        Returns the data of a config file, parsing it on the first call or when it was modified.
+
+        Args:
+            path (str): The absolute path of the file.
+            loader (Callable[[str], Any]): Parses the file.
+
+        Returns:
+            dict: The parsed data, which must not be modified.
+        """
+        version = self.version(path)
+        with self._lock:
+            entry = self._files.get(path)
+            if entry is not None and entry[0] == version:
+                return entry[1]
+            data = loader(path)
+            if data is None:
+                data = {}
+            if not isinstance(data, dict):
+                raise Exception(f"Invalid config file {path}: not a mapping")
+            self._files[path] = (version, data)
+            return data
+
+    def config(self, paths: Tuple[str, ...], key: Hashable, build: Callable[[], Config]) -> Config:
+        """
+        Returns the config merged from files, built again when key changes, which replaces the
+        previous config of the same files.
+
+        Args:
+            paths (Tuple[str, ...]): The absolute paths of the layered files.
+            key (Hashable): Identifies the content of the layers, e.g. the file versions and the environment layer.
+            build (Callable[[], Config]): Merges the layers.
+
+        Returns:
+            Config: The config.
+        """
+        with self._lock:
+            entry = self._configs.get(paths)
+            if entry is not None and entry[0] == key:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            config = build()
+            self._configs[paths] = (key, config)
+            return config
+
+    def clear(self) -> None:
+        """
+        Drops every cached file and config and resets the counters.
+
+        Returns: None
+        """
+        with self._lock:
+            self._files.clear()
+            self._listings.clear()
+            self._configs.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+config_cache = ConfigCache()
 
 
 class ConfigLoader:
@@ -16,35 +160,64 @@ class ConfigLoader:
         self.env = env
         self.config_path = Path.cwd() / "config"
 
-    def load(self) -> SimpleNamespace:
-        files = glob.glob(os.path.join(self.config_path, f"{self.env}.*"))
-        if len(files) != 1:
-            raise Exception(f"Invalid number of config files for {self.env} environment")
-
-        file = files[0]
-        extension = file.split(".")[-1]
-
-        if extension == "json":
-            loader = JsonLoader()
-        elif extension == "yaml":
-            loader = YamlLoader()
-        elif extension == "toml":
-            loader = TomlLoader()
-        elif extension == "env":
-            loader = DotEnvLoader()
-        else:
-            raise Exception(f"Invalid config file format: {extension}")
+    def find_file(self, name: str, required: bool = True) -> Optional[str]:
+        """
+        Returns the config file with the given name and any extension.
 
-        return self.convert_dict_to_namespace(loader.load(file))
+        Args:
+            name (str): The file name without extension, e.g. the environment.
+            required (bool): Whether a missing file is an error.
+
+        Returns:
+            Optional[str]: The absolute path, None if the file is missing and not required.
+        """
+        files = [n for n in config_cache.listing(self.config_path) if n.rpartition(".")[0] == name]
+        if len(files) != 1 and (required or files):
+            raise Exception(f"Invalid number of config files for {name} environment")
+        return os.path.join(os.path.abspath(self.config_path), files[0]) if files else None
+
+    def load(self) -> Config:
+        """
+        Returns the config of the environment: the base config file if any, overridden by the
+        environment config file, overridden by the ROUTESTPY_CONFIG_* environment variables.
+        Files are parsed once per process and modification, and os.environ is never modified.
+
+        Returns:
+            Config: The frozen config, shared by every loader of the same layers.
+        """
+        paths = (self.find_file(BASE_CONFIG_NAME, required=False), self.find_file(self.env))
+        # The base environment is layered over nothing but itself
+        files = tuple(path for path in dict.fromkeys(paths) if path is not None)
+        environment = environment_layer()
+        key = (tuple(config_cache.version(path) for path in files), repr(sorted(environment.items())))
+        return config_cache.config(
+            files, key, lambda: Config(merge_layers(*(self.load_file(path) for path in files), environment))
+        )
+
+    def load_file(self, path: str) -> dict:
+        """
+        Returns the data of a config file, from the process-wide cache.
+
+        Args:
+            path (str): The absolute path of the file.
+
+        Returns:
+            dict: The parsed data, which must not be modified.
+        """
+        extension = path.split(".")[-1]
+        loader = LOADERS.get(extension)
+        if loader is None:
+            raise Exception(f"Invalid config file format: {extension}")
+        return config_cache.file(path, loader().load)
 
     def convert_dict_to_namespace(self, d):
         """
-        Recursively converts all nested dictionaries to SimpleNamespace objects.
+        Returns mappings as a frozen Config, whose keys are read as attributes like the
+        SimpleNamespace objects this method used to return, and lists with their items converted.
+        The data is not copied nor modified.
         """
         if isinstance(d, dict):
-            for key, value in d.items():
-                d[key] = self.convert_dict_to_namespace(value)
-            return SimpleNamespace(**d)
+            return Config(d)
         elif isinstance(d, list):
             return [self.convert_dict_to_namespace(item) for item in d]
         else:
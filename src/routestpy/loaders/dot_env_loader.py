@@ -1,10 +1,8 @@
-import os
-
-from dotenv import load_dotenv
+from dotenv import dotenv_values
 
 
 class DotEnvLoader:
-    def load(self, file):
-        load_dotenv(file)
-        config_dict = os.environ
+    def load(self, file) -> dict:
+        # Only the variables of the file, os.environ is left untouched
+        config_dict = dict(dotenv_values(file))
         return config_dict
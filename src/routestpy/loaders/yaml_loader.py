@@ -1,8 +1,12 @@
-import yaml
+from .yaml_reader import load_all_file
+from .yaml_reader import load_file
 
 
 class YamlLoader:
     def load(self, file):
-        with open(file) as f:
-            config_dict = yaml.safe_load(f)
-            return config_dict
+        config_dict = load_file(file)
+        return config_dict
+
+    def load_all(self, file):
+        config_dicts = load_all_file(file)
+        return config_dicts
@@ -0,0 +1,74 @@
+"""
+Shared YAML reading layer.
+
+Every YAML file read by routestpy goes through this module, which parses with the libyaml based
+`CSafeLoader` when PyYAML was built with libyaml and falls back to the pure-Python `SafeLoader`
+otherwise. Both loaders only construct standard Python objects.
+"""
+from pathlib import Path
+from typing import Any
+from typing import List
+from typing import Union
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader  # type: ignore
+
+LIBYAML = SafeLoader.__name__ == "CSafeLoader"
+
+
+def safe_load(stream: Union[str, bytes]) -> Any:
+    """
+    Parses a single YAML document.
+
+    Args:
+        stream (Union[str, bytes]): The YAML text.
+
+    Returns:
+        Any: The parsed document.
+    """
+    return yaml.load(stream, Loader=SafeLoader)  # noqa: S506
+
+
+def safe_load_all(stream: Union[str, bytes]) -> List[Any]:
+    """
+    Parses every document of a multi-document YAML stream in one pass.
+
+    Args:
+        stream (Union[str, bytes]): The YAML text.
+
+    Returns:
+        List[Any]: The parsed documents.
+    """
+    return list(yaml.load_all(stream, Loader=SafeLoader))  # noqa: S506
+
+
+def load_file(path: Union[str, Path]) -> Any:
+    """
+    Reads and parses a single-document YAML file.
+
+    Args:
+        path (Union[str, Path]): The path to the file.
+
+    Returns:
+        Any: The parsed document.
+    """
+    with open(path, "rb") as f:
+        return safe_load(f.read())
+
+
+def load_all_file(path: Union[str, Path]) -> List[Any]:
+    """
+    Reads and parses every document of a multi-document YAML file in one pass.
+
+    Args:
+        path (Union[str, Path]): The path to the file.
+
+    Returns:
+        List[Any]: The parsed documents.
+    """
+    with open(path, "rb") as f:
+        return safe_load_all(f.read())
@@ -0,0 +1,375 @@
+import asyncio
+import inspect
+import os
+import time
+from collections import Counter
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+
+from routestpy.core.scenario_spec import ScenarioSpec
+from routestpy.core.stream_validator import StreamValidationError
+
+from .http_client import HttpError
+from .http_client import POOL_SIZE_ENV
+from .http_client import HttpRequest
+from .http_client import HttpResponse
+from .http_client import Transport
+from .hooks import HookEngine
+from .hooks import HookError
+from .hooks import HookRun
+from .metrics import MetricsRegistry
+from .metrics import result_labels
+from .response_check import ResponseCheck
+from .response_check import ResponseValidationError
+from .scenario_request import build_request
+from .scenario_request import response_schema
+from .scenario_request import route_name
+
+
+class ScenarioResult:
+    """
+    ScenarioResult class represents the outcome of running one scenario.
+    """
+
+    __slots__ = ("name", "method", "url", "status", "elapsed", "error", "started_at", "response", "route")
+
+    def __init__(
+        self,
+        name: str,
+        method: str,
+        url: str,
+        status: Optional[int],
+        elapsed: float,
+        error: Optional[str],
+        started_at: float,
+        response: Optional[HttpResponse] = None,
+        route: str = "",
+    ) -> None:
+        """
+        Initializes ScenarioResult instance.
+
+        Args:
+        - name (str): the scenario name
+        - method (str): the HTTP method
+        - url (str): the request URL
+        - status (Optional[int]): the response status code, None if the request failed
+        - elapsed (float): seconds from sending the request to receiving the whole response
+        - error (Optional[str]): the failure description, None if a response was received
+        - started_at (float): time.perf_counter() value when the request was sent
+        - response (Optional[HttpResponse]): the response
+        - route (str): the name of the scenario's route
+
+        Returns: None
+        """
+        self.name = name
+        self.method = method
+        self.url = url
+        self.status = status
+        self.elapsed = elapsed
+        self.error = error
+        self.started_at = started_at
+        self.response = response
+        self.route = route
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self) -> str:
+        outcome = self.error if self.error is not None else self.status
+        return f"<ScenarioResult {self.name!r} {self.method} {self.url} {outcome} {self.elapsed * 1000:.1f}ms>"
+
+
+class RunSummary:
+    """
+    RunSummary class represents the results of a run. Counters are kept for every result, while
+    the results themselves are only kept when the runner is asked to.
+
+    Attributes:
+        results (List[ScenarioResult]): The kept results, in the order of the scenarios.
+        count (int): The number of results.
+        errors (int): The number of results with an error.
+        duration (float): Seconds taken by the whole run.
+        connections (Dict[str, int]): Connection counters of the transport, see Transport.total_stats().
+    """
+
+    def __init__(
+        self,
+        results: Optional[List[ScenarioResult]] = None,
+        duration: float = 0.0,
+        connections: Optional[Dict[str, int]] = None,
+    ) -> None:
+        self.results: List[ScenarioResult] = []
+        self.count = 0
+        self.errors = 0
+        self.statuses: Counter = Counter()
+        self.duration = duration
+        self.connections = connections or {}
+        for result in results or []:
+            self.add(result)
+
+    def add(self, result: ScenarioResult, keep: bool = True) -> None:
+        """
+        Counts a result.
+
+        Args:
+        - result (ScenarioResult): the result
+        - keep (bool): whether to append it to results
+
+        Returns: None
+        """
+        self.count += 1
+        self.statuses[result.status] += 1
+        if result.error is not None:
+            self.errors += 1
+        if keep:
+            self.results.append(result)
+
+    def status_counts(self) -> Dict[Optional[int], int]:
+        return dict(self.statuses)
+
+    @property
+    def requests_per_second(self) -> float:
+        return self.count / self.duration if self.duration else 0.0
+
+
+async def report_result(
+    on_result: Callable[[ScenarioResult], Optional[Awaitable[None]]], result: ScenarioResult
+) -> None:
+    """
+    Passes a result to an on_result callback, waiting for it if it returns an awaitable.
+
+    Args:
+    - on_result (Callable[[ScenarioResult], Optional[Awaitable[None]]]): the callback, e.g. ResultSink.put_async
+    - result (ScenarioResult): the result
+
+    Returns: None
+    """
+    outcome = on_result(result)
+    if inspect.isawaitable(outcome):
+        await outcome
+
+
+class AsyncRunner:
+    """
+    AsyncRunner class sends the requests of scenarios on an asyncio event loop, keeping exactly
+    parallel_count requests in flight until fewer scenarios remain. Requests share keep-alive
+    connections, with as many connections per host as requests in flight unless ROUTESTPY_POOL_SIZE
+    says otherwise.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        parallel_count: int,
+        timeout: float = 30.0,
+        transport: Optional[Transport] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        on_result: Optional[Callable[[ScenarioResult], Optional[Awaitable[None]]]] = None,
+        keep_results: bool = True,
+        retain_bodies: bool = False,
+        hooks: Optional[HookEngine] = None,
+    ) -> None:
+        """
+        Initializes AsyncRunner instance.
+
+        Args:
+        - base_url (str): the scheme, host and optional path prefix of the environment
+        - parallel_count (int): the number of requests in flight
+        - timeout (float): seconds allowed for each request
+        - transport (Optional[Transport]): sends the requests, a new pooled Transport per run if None
+        - metrics (Optional[MetricsRegistry]): records the latency, status and in-flight requests
+        - on_result (Optional[Callable[[ScenarioResult], Optional[Awaitable[None]]]]): called with each
+          result as soon as its scenario finishes, and awaited if it returns an awaitable, e.g.
+          ResultSink.put_async, which makes the runner wait for the report writers
+        - keep_results (bool): whether the RunSummary keeps every result, or only counts them
+        - retain_bodies (bool): whether response bodies are kept once on_result has seen them,
+          otherwise only the status and headers stay on the scenario and the result
+        - hooks (Optional[HookEngine]): runs the app, route and scenario hooks around the scenarios,
+          which are not run if None
+
+        Returns: None
+        """
+        if parallel_count < 1:
+            raise ValueError(f"parallel_count must be at least 1, got {parallel_count}")
+        self.base_url = base_url
+        self.parallel_count = parallel_count
+        self.timeout = timeout
+        self.transport = transport
+        self.metrics = metrics
+        self.on_result = on_result
+        self.keep_results = keep_results
+        self.retain_bodies = retain_bodies
+        self.hooks = hooks
+
+    def create_transport(self) -> Transport:
+        """
+        Returns a Transport whose pools hold parallel_count connections per host, or
+        ROUTESTPY_POOL_SIZE connections if it is set.
+
+        Returns:
+        - Transport: the transport
+        """
+        pool_size = int(os.getenv(POOL_SIZE_ENV, default=str(self.parallel_count)))
+        return Transport(self.timeout, max_connections_per_host=pool_size)
+
+    def build_request(self, scenario: Any) -> HttpRequest:
+        """
+        Returns the request of a scenario.
+
+        Args:
+        - scenario (Any): a Scenario instance or a ScenarioSpec
+
+        Returns:
+        - HttpRequest: the request
+        """
+        return build_request(scenario, self.base_url)
+
+    def response_check(self, scenario: Any) -> ResponseCheck:
+        """
+        Returns the check of the response body of a scenario. Bodies are only streamed when they
+        are not retained.
+
+        Args:
+        - scenario (Any): a Scenario instance or a ScenarioSpec
+
+        Returns:
+        - ResponseCheck: the check
+        """
+        return ResponseCheck(response_schema(scenario), stream=not self.retain_bodies)
+
+    async def run_scenario(self, transport: Transport, scenario: Any) -> ScenarioResult:
+        """
+        Sends the request of a scenario and stores the response on it.
+
+        Args:
+        - transport (Transport): sends the request
+        - scenario (Any): a Scenario instance, or a ScenarioSpec, which is immutable and does not keep the response
+
+        Returns:
+        - ScenarioResult: the outcome, with request failures recorded rather than raised
+        """
+        name = scenario.get_name()
+        route = route_name(scenario)
+        try:
+            request = self.build_request(scenario)
+        except (KeyError, ValueError) as e:
+            error = f"Invalid request: {e}"
+            return ScenarioResult(name, "", "", None, 0.0, error, time.perf_counter(), route=route)
+
+        labels = result_labels(route, name, request.method, request.url)
+        response_check = self.response_check(scenario)
+        if self.metrics is not None:
+            self.metrics.started(labels)
+        started_at = time.perf_counter()
+        response: Optional[HttpResponse] = None
+        error: Optional[str] = None
+        try:
+            response = await transport.request(request, response_check.body_consumer)
+            response_check.check(response)
+        except asyncio.TimeoutError:
+            error = f"Timed out after {self.timeout}s"
+        except (StreamValidationError, ResponseValidationError) as e:
+            error = f"Invalid response body: {e}"
+        except (HttpError, OSError, ValueError, asyncio.IncompleteReadError, asyncio.LimitOverrunError) as e:
+            error = f"{type(e).__name__}: {e}"
+        elapsed = time.perf_counter() - started_at
+
+        status = response.status if response is not None else response_check.status
+        if self.metrics is not None:
+            self.metrics.finished(labels, elapsed, status)
+        if response is not None and not isinstance(scenario, ScenarioSpec):
+            scenario.response = scenario.parent.response = response
+        return ScenarioResult(name, request.method, request.url, status, elapsed, error, started_at, response, route)
+
+    async def run_hooked(self, transport: Transport, scenario: Any, hook_run: Optional[HookRun]) -> ScenarioResult:
+        """
+        Runs a scenario between its before and after hooks.
+
+        Args:
+        - transport (Transport): sends the request
+        - scenario (Any): a Scenario instance or a ScenarioSpec
+        - hook_run (Optional[HookRun]): the hooks of the run, None to run the scenario alone
+
+        Returns:
+        - ScenarioResult: the outcome, failed without sending the request if a before hook failed,
+          or failed if an after hook failed
+        """
+        if hook_run is None:
+            return await self.run_scenario(transport, scenario)
+        try:
+            await hook_run.before_scenario(scenario)
+        except HookError as e:
+            result = ScenarioResult(
+                scenario.get_name(), "", "", None, 0.0, str(e), time.perf_counter(), route=route_name(scenario)
+            )
+        else:
+            result = await self.run_scenario(transport, scenario)
+        try:
+            await hook_run.after_scenario(scenario)
+        except HookError as e:
+            if result.error is None:
+                result.error = str(e)
+        return result
+
+    async def run_async(self, scenarios: Iterable[Any]) -> RunSummary:
+        """
+        Runs the scenarios on the running event loop.
+
+        Args:
+        - scenarios (Iterable[Any]): Scenario instances
+
+        Returns:
+        - RunSummary: the results, in the order of the scenarios
+        """
+        scenarios = list(scenarios)
+        summary = RunSummary()
+        results: List[Optional[ScenarioResult]] = [None] * len(scenarios) if self.keep_results else []
+        pending: Iterator[int] = iter(range(len(scenarios)))
+        hook_run = HookRun(self.hooks, scenarios) if self.hooks is not None else None
+        transport = self.transport or self.create_transport()
+
+        async def worker() -> None:
+            # Workers share one iterator, so a worker starts the next scenario as soon as it is free
+            for position in pending:
+                result = await self.run_hooked(transport, scenarios[position], hook_run)
+                if self.on_result is not None:
+                    await report_result(self.on_result, result)
+                if not self.retain_bodies and result.response is not None:
+                    result.response.body = b""
+                summary.add(result, keep=False)
+                if self.keep_results:
+                    results[position] = result
+
+        started = time.perf_counter()
+        try:
+            if hook_run is not None:
+                await hook_run.before_app()
+            await asyncio.gather(*(worker() for _ in range(min(self.parallel_count, len(scenarios)))))
+            if hook_run is not None:
+                await hook_run.after_app()
+        finally:
+            if self.transport is None:
+                await transport.close()
+        summary.results = [result for result in results if result is not None]
+        summary.duration = time.perf_counter() - started
+        summary.connections = transport.total_stats()
+        return summary
+
+    def run(self, scenarios: Iterable[Any]) -> RunSummary:
+        """
+        Runs the scenarios on a new event loop.
+
+        Args:
+        - scenarios (Iterable[Any]): Scenario instances
+
+        Returns:
+        - RunSummary: the results, in the order of the scenarios
+        """
+        return asyncio.run(self.run_async(scenarios))
@@ -0,0 +1,185 @@
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import Deque
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Union
+
+from routestpy.core.dependency_graph import ScenarioGraph
+from routestpy.core.dependency_graph import consumed_values
+from routestpy.core.dependency_graph import extract_value
+from routestpy.core.dependency_graph import produced_values
+
+from .async_runner import AsyncRunner
+from .async_runner import RunSummary
+from .async_runner import ScenarioResult
+from .async_runner import report_result
+from .hooks import HookEngine
+from .hooks import HookRun
+from .http_client import HttpRequest
+from .http_client import Transport
+from .metrics import MetricsRegistry
+from .response_check import ResponseCheck
+from .scenario_request import build_request
+from .scenario_request import response_schema
+from .scenario_request import route_name
+
+
+class DagRunner(AsyncRunner):
+    """
+    DagRunner class runs scenarios which depend on values produced by other scenarios, see
+    routestpy.core.dependency_graph. A scenario starts as soon as every producer it waits for has
+    finished, so independent branches of the graph run in parallel, up to parallel_count requests
+    in flight. Produced values are registered in a shared mapping and substituted into the
+    requests of their consumers; the consumers of a value which was not produced are skipped.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        parallel_count: int,
+        timeout: float = 30.0,
+        transport: Optional[Transport] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        on_result: Optional[Callable[[ScenarioResult], Optional[Awaitable[None]]]] = None,
+        keep_results: bool = True,
+        retain_bodies: bool = False,
+        register: Optional[Dict[str, Any]] = None,
+        hooks: Optional[HookEngine] = None,
+    ) -> None:
+        """
+        Initializes DagRunner instance.
+
+        Args:
+        - base_url (str): the scheme, host and optional path prefix of the environment
+        - parallel_count (int): the maximum number of requests in flight
+        - timeout (float): seconds allowed for each request
+        - transport (Optional[Transport]): sends the requests, a new pooled Transport per run if None
+        - metrics (Optional[MetricsRegistry]): records the latency, status and in-flight requests
+        - on_result (Optional[Callable[[ScenarioResult], Optional[Awaitable[None]]]]): called with each
+          result as soon as its scenario finishes, and awaited if it returns an awaitable
+        - keep_results (bool): whether the RunSummary keeps every result, or only counts them
+        - retain_bodies (bool): whether response bodies are kept once on_result has seen them
+        - register (Optional[Dict[str, Any]]): the mapping produced values are registered in, e.g.
+          Application.register
+        - hooks (Optional[HookEngine]): runs the app, route and scenario hooks around the scenarios
+
+        Returns: None
+        """
+        super().__init__(
+            base_url, parallel_count, timeout, transport, metrics, on_result, keep_results, retain_bodies, hooks
+        )
+        self.register: Dict[str, Any] = register if register is not None else {}
+
+    def build_request(self, scenario: Any) -> HttpRequest:
+        return build_request(scenario, self.base_url, self.register)
+
+    def response_check(self, scenario: Any) -> ResponseCheck:
+        # Produced values are extracted from the body, which a streamed check does not keep
+        stream = not self.retain_bodies and not produced_values(scenario)
+        return ResponseCheck(response_schema(scenario), stream=stream)
+
+    async def run_scenario(self, transport: Transport, scenario: Any) -> ScenarioResult:
+        """
+        Sends the request of a scenario once the values it consumes are registered, then registers
+        the values it produces.
+
+        Args:
+        - transport (Transport): sends the request
+        - scenario (Any): a Scenario instance or a ScenarioSpec
+
+        Returns:
+        - ScenarioResult: the outcome, skipped with an error if a consumed value is missing
+        """
+        missing = [name for name in consumed_values(scenario) if name not in self.register]
+        if missing:
+            error = f"Skipped: {', '.join(repr(name) for name in missing)} not produced"
+            return ScenarioResult(
+                scenario.get_name(), "", "", None, 0.0, error, time.perf_counter(), route=route_name(scenario)
+            )
+
+        result = await super().run_scenario(transport, scenario)
+        produced = produced_values(scenario)
+        if produced and result.error is None:
+            try:
+                data = json.loads(result.response.body) if result.response is not None else None
+                for name, path in produced:
+                    self.register[name] = extract_value(data, path)
+            except ValueError as e:
+                result.error = f"Cannot produce values, invalid JSON: {e}"
+            except KeyError as e:
+                result.error = f"Cannot produce values, no {e} in the response body"
+        return result
+
+    async def run_async(self, scenarios: Union[Iterable[Any], ScenarioGraph]) -> RunSummary:
+        """
+        Runs the scenarios in dependency order on the running event loop.
+
+        Args:
+        - scenarios (Union[Iterable[Any], ScenarioGraph]): Scenario instances, or their checked graph
+
+        Returns:
+        - RunSummary: the results, in the order of the graph scenarios
+
+        Raises:
+        - DependencyError: if the dependencies of the scenarios cannot be satisfied
+        """
+        graph = scenarios if isinstance(scenarios, ScenarioGraph) else ScenarioGraph(scenarios)
+        for name in graph.producers:
+            self.register.pop(name, None)
+
+        summary = RunSummary()
+        results: List[Optional[ScenarioResult]] = [None] * len(graph) if self.keep_results else []
+        waiting = [len(dependencies) for dependencies in graph.dependencies]
+        ready: Deque[int] = deque(node for node, count in enumerate(waiting) if count == 0)
+        remaining = len(graph)
+        changed = asyncio.Event()
+        hook_run = HookRun(self.hooks, graph.scenarios) if self.hooks is not None else None
+        transport = self.transport or self.create_transport()
+
+        async def worker() -> None:
+            nonlocal remaining
+            while remaining:
+                if not ready:
+                    # Every ready scenario is taken, wait for a running one to release its dependents
+                    changed.clear()
+                    await changed.wait()
+                    continue
+                node = ready.popleft()
+                result = await self.run_hooked(transport, graph.scenarios[node], hook_run)
+                if self.on_result is not None:
+                    await report_result(self.on_result, result)
+                if not self.retain_bodies and result.response is not None:
+                    result.response.body = b""
+                summary.add(result, keep=False)
+                if self.keep_results:
+                    results[node] = result
+
+                remaining -= 1
+                for dependent in graph.dependents[node]:
+                    waiting[dependent] -= 1
+                    if waiting[dependent] == 0:
+                        ready.append(dependent)
+                changed.set()
+
+        started = time.perf_counter()
+        try:
+            if hook_run is not None:
+                await hook_run.before_app()
+            await asyncio.gather(*(worker() for _ in range(min(self.parallel_count, len(graph)))))
+            if hook_run is not None:
+                await hook_run.after_app()
+        finally:
+            if self.transport is None:
+                await transport.close()
+        summary.results = [result for result in results if result is not None]
+        summary.duration = time.perf_counter() - started
+        summary.connections = transport.total_stats()
+        return summary
@@ -0,0 +1,386 @@
+"""
+Coordinator and workers running one suite over several machines.
+
+Every worker loads the project from its own copy, so only scenario ids, positions in the
+application's scenario_collection, go over the wire. Messages are JSON objects, one per line:
+
+    coordinator -> worker   {"type": "hello", "environment": ..., "fingerprint": ...}
+    worker -> coordinator   {"type": "ready", "worker": ...} or {"type": "error", "message": ...}
+    coordinator -> worker   {"type": "batch", "ids": [...]}              repeated
+    worker -> coordinator   {"type": "result", "id": ..., "result": {...}}  one per scenario
+    coordinator -> worker   {"type": "finish"}
+    worker -> coordinator   {"type": "bye", "connections": {...}}
+
+The coordinator keeps up to two batches outstanding per worker. Ids outstanding on a worker
+which disconnects or stays silent longer than the worker timeout go back to the front of the
+queue for the other workers.
+
+Workers are not authenticated, so the coordinator listens on the loopback interface unless it
+is given a host, e.g. 0.0.0.0 to accept workers from other machines of a trusted network.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import socket
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import Deque
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Set
+from typing import Tuple
+
+from .async_runner import AsyncRunner
+from .async_runner import RunSummary
+from .async_runner import ScenarioResult
+from .async_runner import report_result
+from .http_client import POOL_STATS
+from .metrics import MetricsRegistry
+
+RESULT_FIELDS = ("name", "method", "url", "status", "elapsed", "error", "started_at", "route")
+
+# Bytes allowed in one message, batches of ids and single results stay far below it
+MESSAGE_LIMIT = 2**24
+
+# Host used by an address without one, e.g. ":9000"
+DEFAULT_HOST = "127.0.0.1"
+
+
+def project_fingerprint(project_path: Path, scenarios: Sequence[Any]) -> str:
+    """
+    Returns a digest of the scenario files and names in collection order, which must match
+    between the coordinator and its workers for scenario ids to mean the same scenarios.
+
+    Args:
+    - project_path (Path): path to the project
+    - scenarios (Sequence[Any]): the application's scenario_collection
+
+    Returns:
+    - str: hex digest
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for scenario in scenarios:
+        relative = os.path.relpath(scenario.data_path, project_path).replace(os.sep, "/")
+        digest.update(f"{relative}\0{scenario.get_name()}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    """
+    Splits a "host:port" address.
+
+    Args:
+    - address (str): the address, the host defaults to DEFAULT_HOST if empty
+
+    Returns:
+    - Tuple[str, int]: the host and port
+
+    Raises:
+    - ValueError: if the port is missing or not a number
+    """
+    host, _, port = address.rpartition(":")
+    if not port.isdigit():
+        raise ValueError(f"Invalid address, expected host:port: {address}")
+    return host.strip("[]") or DEFAULT_HOST, int(port)
+
+
+async def send(writer: asyncio.StreamWriter, message: dict) -> None:
+    writer.write(json.dumps(message, separators=(",", ":")).encode("utf-8") + b"\n")
+    await writer.drain()
+
+
+async def receive(reader: asyncio.StreamReader) -> dict:
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("Connection closed by peer")
+    return json.loads(line)
+
+
+def encode_result(result: ScenarioResult) -> dict:
+    return {field: getattr(result, field) for field in RESULT_FIELDS}
+
+
+def decode_result(data: dict) -> ScenarioResult:
+    return ScenarioResult(**{field: data.get(field) for field in RESULT_FIELDS})
+
+
+class Coordinator:
+    """
+    Coordinator class hands out scenario ids to the workers connecting to it and collects
+    their results.
+    """
+
+    def __init__(
+        self,
+        ids: Sequence[int],
+        environment: str,
+        fingerprint: str,
+        address: str,
+        batch_size: int = 20,
+        worker_timeout: float = 120.0,
+        metrics: Optional[MetricsRegistry] = None,
+        on_result: Optional[Callable[[ScenarioResult], Optional[Awaitable[None]]]] = None,
+    ) -> None:
+        """
+        Initializes Coordinator instance.
+
+        Args:
+        - ids (Sequence[int]): ids of the scenarios to run, positions in the scenario_collection
+        - environment (str): the environment the workers load their config for
+        - fingerprint (str): project_fingerprint() of the coordinator's project
+        - address (str): the "host:port" to listen on
+        - batch_size (int): the number of ids sent to a worker at once
+        - worker_timeout (float): seconds a worker with outstanding ids may stay silent
+        - metrics (Optional[MetricsRegistry]): records the results as the workers stream them
+        - on_result (Optional[Callable[[ScenarioResult], Optional[Awaitable[None]]]]): called with each
+          result as the workers stream it, in completion order, and awaited if it returns an awaitable
+
+        Returns: None
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+        self.ids = list(ids)
+        self.environment = environment
+        self.fingerprint = fingerprint
+        self.host, self.port = parse_address(address)
+        self.batch_size = batch_size
+        self.worker_timeout = worker_timeout
+        self.metrics = metrics
+        self.on_result = on_result
+        self.pending: Deque[int] = deque(self.ids)
+        self.results: Dict[int, ScenarioResult] = {}
+        self.connections = dict.fromkeys(POOL_STATS, 0)
+        self.workers: Set[str] = set()
+        self._changed: Optional[asyncio.Condition] = None
+        self._done: Optional[asyncio.Event] = None
+        self._no_workers: Optional[asyncio.Event] = None
+
+    @property
+    def finished(self) -> bool:
+        return len(self.results) == len(self.ids)
+
+    def run(self) -> RunSummary:
+        """
+        Serves workers until every scenario has a result.
+
+        Returns:
+        - RunSummary: the results, in the order of ids
+        """
+        return asyncio.run(self.run_async())
+
+    async def run_async(self) -> RunSummary:
+        """
+        Serves workers on the running event loop until every scenario has a result.
+
+        Returns:
+        - RunSummary: the results, in the order of ids
+        """
+        self._changed = asyncio.Condition()
+        self._done = asyncio.Event()
+        self._no_workers = asyncio.Event()
+        if self.finished:
+            self._done.set()
+
+        started = time.perf_counter()
+        server = await asyncio.start_server(self._serve, self.host, self.port, family=socket.AF_UNSPEC)
+        self.port = server.sockets[0].getsockname()[1]
+        print(f"Waiting for workers on {self.host}:{self.port}")
+        try:
+            await self._done.wait()
+            # Give connected workers the chance to report their connection counters
+            if self.workers:
+                try:
+                    await asyncio.wait_for(self._no_workers.wait(), 5.0)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            server.close()
+            await server.wait_closed()
+        results = [self.results[scenario_id] for scenario_id in self.ids]
+        return RunSummary(results, time.perf_counter() - started, self.connections)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        assert self._changed is not None and self._done is not None and self._no_workers is not None
+        peer = writer.get_extra_info("peername")
+        name = f"{peer[0]}:{peer[1]}" if peer else "worker"
+        outstanding: List[int] = []
+        try:
+            await send(writer, {"type": "hello", "environment": self.environment, "fingerprint": self.fingerprint})
+            # Loading the project may take a while, so the first reply is not timed
+            message = await receive(reader)
+            if message.get("type") != "ready":
+                print(f"Worker {name} refused to run: {message.get('message', message)}")
+                return
+            name = message.get("worker") or name
+            self.workers.add(name)
+            self._no_workers.clear()
+            print(f"Worker {name} connected")
+
+            while True:
+                while len(outstanding) < 2 * self.batch_size and self.pending:
+                    batch = [self.pending.popleft() for _ in range(min(self.batch_size, len(self.pending)))]
+                    outstanding.extend(batch)
+                    await send(writer, {"type": "batch", "ids": batch})
+
+                if not outstanding:
+                    if self.finished:
+                        await send(writer, {"type": "finish"})
+                        message = await asyncio.wait_for(receive(reader), self.worker_timeout)
+                        for key, value in (message.get("connections") or {}).items():
+                            if key in self.connections:
+                                self.connections[key] += value
+                        break
+                    # Wait for ids given back by a failed worker, or for the run to finish
+                    async with self._changed:
+                        await self._changed.wait_for(lambda: bool(self.pending) or self.finished)
+                    continue
+
+                message = await asyncio.wait_for(receive(reader), self.worker_timeout)
+                if message.get("type") == "result":
+                    scenario_id = message["id"]
+                    if scenario_id in outstanding:
+                        outstanding.remove(scenario_id)
+                        result = self.results[scenario_id] = decode_result(message["result"])
+                        if self.metrics is not None:
+                            self.metrics.observe(result)
+                        if self.on_result is not None:
+                            await report_result(self.on_result, result)
+                        if self.finished:
+                            self._done.set()
+                            async with self._changed:
+                                self._changed.notify_all()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError, KeyError) as e:
+            print(f"Worker {name} failed: {type(e).__name__}: {e}")
+        finally:
+            if outstanding:
+                print(f"Reassigning {len(outstanding)} scenarios of worker {name}")
+                self.pending.extendleft(reversed(outstanding))
+                async with self._changed:
+                    self._changed.notify_all()
+            self.workers.discard(name)
+            writer.close()
+            if not self.workers:
+                self._no_workers.set()
+
+
+class Worker:
+    """
+    Worker class connects to a coordinator, loads the project and runs the scenarios of the
+    batches it receives, keeping parallel_count requests in flight.
+    """
+
+    def __init__(
+        self,
+        address: str,
+        project_path: Path,
+        parallel_count: int,
+        timeout: float = 30.0,
+        name: Optional[str] = None,
+    ) -> None:
+        """
+        Initializes Worker instance.
+
+        Args:
+        - address (str): the coordinator "host:port"
+        - project_path (Path): path to the project, the same project as the coordinator's
+        - parallel_count (int): the number of requests in flight
+        - timeout (float): seconds allowed for each request
+        - name (Optional[str]): the name reported to the coordinator, hostname and pid by default
+
+        Returns: None
+        """
+        if parallel_count < 1:
+            raise ValueError(f"parallel_count must be at least 1, got {parallel_count}")
+        self.host, self.port = parse_address(address)
+        self.project_path = Path(project_path)
+        self.parallel_count = parallel_count
+        self.timeout = timeout
+        self.name = name or f"{socket.gethostname()}-{os.getpid()}"
+
+    def run(self) -> int:
+        """
+        Runs batches until the coordinator says the run is finished.
+
+        Returns:
+        - int: the number of scenarios run
+        """
+        return asyncio.run(self.run_async())
+
+    async def run_async(self) -> int:
+        """
+        Runs batches on the running event loop until the coordinator says the run is finished.
+
+        Returns:
+        - int: the number of scenarios run
+
+        Raises:
+        - ValueError: if the project differs from the coordinator's
+        - ConnectionError: if the coordinator closes the connection before the run is finished
+        - Exception: whatever fails while running a scenario or sending its result, after which the
+          coordinator gives the outstanding ids to the other workers
+        """
+        from routestpy.core.application import Application
+
+        from .scenario_request import base_url
+
+        reader, writer = await asyncio.open_connection(self.host, self.port, limit=MESSAGE_LIMIT)
+        try:
+            hello = await receive(reader)
+            app = Application(self.project_path, environment=hello["environment"])
+            app.collect_scenarios()
+            scenarios = app.scenario_collection
+            if project_fingerprint(self.project_path, scenarios) != hello["fingerprint"]:
+                await send(writer, {"type": "error", "message": "project differs from the coordinator's"})
+                raise ValueError(f"The project in {self.project_path} differs from the coordinator's")
+            await send(writer, {"type": "ready", "worker": self.name})
+
+            runner = AsyncRunner(base_url(app), self.parallel_count, self.timeout)
+            runner.transport = runner.create_transport()
+            queue: "asyncio.Queue[Tuple[int, Any]]" = asyncio.Queue()
+            ran = 0
+
+            async def run_scenarios() -> None:
+                nonlocal ran
+                while True:
+                    scenario_id, scenario = await queue.get()
+                    try:
+                        result = await runner.run_scenario(runner.transport, scenario)
+                        await send(writer, {"type": "result", "id": scenario_id, "result": encode_result(result)})
+                        ran += 1
+                    finally:
+                        queue.task_done()
+
+            async def receive_batches() -> None:
+                while True:
+                    message = await receive(reader)
+                    if message["type"] == "batch":
+                        ids = message["ids"]
+                        for scenario_id, scenario in zip(ids, app.materialize(scenarios[i] for i in ids)):
+                            queue.put_nowait((scenario_id, scenario))
+                    elif message["type"] == "finish":
+                        await queue.join()
+                        return
+
+            tasks = [asyncio.ensure_future(run_scenarios()) for _ in range(self.parallel_count)]
+            tasks.append(asyncio.ensure_future(receive_batches()))
+            try:
+                # Scenario tasks only end by failing, which must not leave queue.join() waiting forever
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    task.result()
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                await runner.transport.close()
+            await send(writer, {"type": "bye", "connections": runner.transport.total_stats()})
+            return ran
+        finally:
+            writer.close()
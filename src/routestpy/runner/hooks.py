@@ -0,0 +1,343 @@
+import asyncio
+import importlib
+import inspect
+import time
+from functools import partial
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from routestpy.core.scenario_spec import ScenarioSpec
+
+from .metrics import LatencyHistogram
+from .scenario_request import route_path
+
+HOOK_TYPES = ("before_app", "after_app", "before_route", "after_route", "before_scenario", "after_scenario")
+
+
+class HookError(RuntimeError):
+    """Raised for a hook which cannot be resolved or which failed."""
+
+
+class ResolvedHook:
+    """
+    ResolvedHook class represents the callable a hook `func` resolves to, with how to call it.
+
+    Attributes:
+    - func (str): the dotted path of the callable, e.g. "package.module.function" or "package.module:Class.method"
+    - function (Callable[..., Any]): the callable
+    - is_async (bool): whether it is an `async def` function, awaited on the event loop
+    - takes_target (bool): whether it accepts the app, route or scenario the hook runs for
+    """
+
+    __slots__ = ("func", "function", "is_async", "takes_target")
+
+    def __init__(self, func: str, function: Callable[..., Any]) -> None:
+        self.func = func
+        self.function = function
+        self.is_async = inspect.iscoroutinefunction(function)
+        self.takes_target = _takes_argument(function)
+
+
+def _takes_argument(function: Callable[..., Any]) -> bool:
+    # Builtins such as os.getcwd may have no signature, they are called without argument
+    try:
+        parameters = inspect.signature(function).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    positional = (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD)
+    return any(p.kind in positional or p.kind == inspect.Parameter.VAR_POSITIONAL for p in parameters)
+
+
+def import_callable(func: str) -> Callable[..., Any]:
+    """
+    Imports the callable a hook `func` names.
+
+    Args:
+    - func (str): "module:attribute.path", or a dotted path whose longest importable prefix is the module
+
+    Returns:
+    - Callable[..., Any]: the callable
+
+    Raises:
+    - HookError: if no module or attribute matches, or the attribute is not callable
+    """
+    if ":" in func:
+        module_name, _, attributes = func.partition(":")
+        candidates = [(module_name, attributes.split("."))]
+    else:
+        parts = func.split(".")
+        candidates = [(".".join(parts[:size]), parts[size:]) for size in range(len(parts) - 1, 0, -1)]
+
+    for module_name, attributes in candidates:
+        try:
+            target = importlib.import_module(module_name)
+        except ImportError:
+            continue
+        try:
+            for attribute in attributes:
+                target = getattr(target, attribute)
+        except AttributeError:
+            continue
+        if not callable(target):
+            raise HookError(f"Hook {func!r} is not callable")
+        return target
+    raise HookError(f"Cannot resolve hook {func!r}")
+
+
+class HookEngine:
+    """
+    HookEngine class runs the hooks of an app, its routes and its scenarios. Each `func` is
+    imported once into a cache shared by every run; `async def` hooks are awaited on the event
+    loop, other hooks run in the default executor so they never block it. The duration of every
+    call is recorded per hook type and func.
+
+    Attributes:
+    - timings (Dict[Tuple[str, str], LatencyHistogram]): the durations, by hook type and func
+    - failures (Dict[Tuple[str, str], int]): the number of failed calls, by hook type and func
+    """
+
+    def __init__(self) -> None:
+        self._cache: Dict[str, ResolvedHook] = {}
+        self.timings: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self.failures: Dict[Tuple[str, str], int] = {}
+
+    def resolve(self, func: str) -> ResolvedHook:
+        """
+        Returns the resolved callable of a hook func, importing it on first use.
+
+        Args:
+        - func (str): the hook func
+
+        Returns:
+        - ResolvedHook: the cached resolution
+
+        Raises:
+        - HookError: if func cannot be resolved
+        """
+        resolved = self._cache.get(func)
+        if resolved is None:
+            resolved = self._cache[func] = ResolvedHook(func, import_callable(func))
+        return resolved
+
+    def resolve_all(self, hooks: Iterable[dict]) -> None:
+        """
+        Resolves hooks up front, so that a misspelled func fails before anything runs.
+
+        Args:
+        - hooks (Iterable[dict]): the hooks
+
+        Returns: None
+
+        Raises:
+        - HookError: if a hook type is unknown or a func cannot be resolved
+        """
+        for hook in hooks:
+            if hook["hook_type"] not in HOOK_TYPES:
+                raise HookError(f"Unknown hook_type {hook['hook_type']!r} of hook {hook['func']!r}")
+            self.resolve(hook["func"])
+
+    async def call(self, hook: dict, target: Any) -> None:
+        """
+        Calls a hook and records its duration.
+
+        Args:
+        - hook (dict): the hook, with its hook_type and func
+        - target (Any): the app, route or scenario the hook runs for, passed if the hook accepts an argument
+
+        Returns: None
+
+        Raises:
+        - HookError: if the hook cannot be resolved or raises
+        """
+        resolved = self.resolve(hook["func"])
+        arguments = (target,) if resolved.takes_target else ()
+        key = (hook["hook_type"], resolved.func)
+        started = time.perf_counter()
+        try:
+            if resolved.is_async:
+                await resolved.function(*arguments)
+            else:
+                await asyncio.get_running_loop().run_in_executor(None, partial(resolved.function, *arguments))
+        except Exception as e:
+            self.failures[key] = self.failures.get(key, 0) + 1
+            raise HookError(f"{hook['hook_type']} hook {resolved.func} failed: {type(e).__name__}: {e}") from e
+        finally:
+            histogram = self.timings.get(key)
+            if histogram is None:
+                histogram = self.timings[key] = LatencyHistogram()
+            histogram.record(time.perf_counter() - started)
+
+    async def run(self, hook_type: str, hooks: Iterable[dict], target: Any) -> None:
+        """
+        Calls the hooks of a type, in order.
+
+        Args:
+        - hook_type (str): one of HOOK_TYPES
+        - hooks (Iterable[dict]): the merged hooks of the app, route or scenario
+        - target (Any): the app, route or scenario the hooks run for
+
+        Returns: None
+
+        Raises:
+        - HookError: for the first hook which fails, the next ones are not called
+        """
+        for hook in hooks:
+            if hook["hook_type"] == hook_type:
+                await self.call(hook, target)
+
+    def report(self) -> List[Dict[str, Any]]:
+        """
+        Returns the timing of every hook, slowest in total first.
+
+        Returns:
+        - List[Dict[str, Any]]: the hook type, func, failures and summary statistics in seconds
+        """
+        rows = [
+            {"hook_type": hook_type, "func": func, "failures": self.failures.get((hook_type, func), 0), **h.to_dict()}
+            for (hook_type, func), h in self.timings.items()
+        ]
+        return sorted(rows, key=lambda row: row["sum"], reverse=True)
+
+
+class HookRun:
+    """
+    HookRun class schedules the hooks of one run of scenarios: the app hooks once around the
+    whole run, the route hooks once around the scenarios of each route, which may run in
+    parallel, and the scenario hooks around each scenario.
+
+    App and route hooks are taken from the merged hooks of the scenarios, which inherit them, in
+    the order they first appear. Routes are told apart by their route file, see route_path.
+    """
+
+    def __init__(self, engine: HookEngine, scenarios: List[Any]) -> None:
+        """
+        Initializes HookRun instance and resolves every hook of the scenarios.
+
+        Args:
+        - engine (HookEngine): calls the hooks
+        - scenarios (List[Any]): the Scenario instances or ScenarioSpecs of the run
+
+        Returns: None
+
+        Raises:
+        - HookError: if a hook cannot be resolved
+        """
+        self.engine = engine
+        self.app_hooks: List[dict] = []
+        # By route path
+        self.route_hooks: Dict[str, List[dict]] = {}
+        self.remaining: Dict[str, int] = {}
+        self._routes: Dict[str, Any] = {}
+        self._app: Any = None
+        self._started: Dict[str, "asyncio.Future[None]"] = {}
+
+        seen_app_hooks = set()
+        seen_route_hooks = set()
+        for scenario in scenarios:
+            route = route_path(scenario)
+            self.remaining[route] = self.remaining.get(route, 0) + 1
+            if route not in self.route_hooks:
+                self.route_hooks[route] = []
+                self._routes[route] = getattr(scenario, "parent", route)
+                if self._app is None and not isinstance(scenario, ScenarioSpec):
+                    self._app = scenario.parent.parent
+            hooks = scenario_hooks(scenario)
+            # A scenario may add hooks of its own of any type, so every scenario is looked at
+            for hook in hooks:
+                hook_type = hook["hook_type"]
+                if hook_type.endswith("_route") and (route, hook_type, hook["func"]) not in seen_route_hooks:
+                    seen_route_hooks.add((route, hook_type, hook["func"]))
+                    self.route_hooks[route].append(hook)
+                elif hook_type.endswith("_app") and (hook_type, hook["func"]) not in seen_app_hooks:
+                    seen_app_hooks.add((hook_type, hook["func"]))
+                    self.app_hooks.append(hook)
+            engine.resolve_all(hooks)
+
+    async def before_app(self) -> None:
+        await self.engine.run("before_app", self.app_hooks, self._app)
+
+    async def after_app(self) -> None:
+        await self.engine.run("after_app", self.app_hooks, self._app)
+
+    async def before_scenario(self, scenario: Any) -> None:
+        """
+        Runs the before_route hooks of the route of a scenario on its first scenario, then the
+        before_scenario hooks of the scenario.
+
+        Args:
+        - scenario (Any): the scenario about to run
+
+        Returns: None
+
+        Raises:
+        - HookError: if a hook fails, including a before_route hook run for another scenario
+        """
+        route = route_path(scenario)
+        started = self._started.get(route)
+        if started is None:
+            started = self._started[route] = asyncio.ensure_future(
+                self.engine.run("before_route", self.route_hooks[route], self._routes[route])
+            )
+        await asyncio.shield(started)
+        await self.engine.run("before_scenario", scenario_hooks(scenario), scenario)
+
+    async def after_scenario(self, scenario: Any) -> None:
+        """
+        Runs the after_scenario hooks of a scenario, then the after_route hooks of its route once
+        its last scenario has finished.
+
+        Args:
+        - scenario (Any): the scenario which finished
+
+        Returns: None
+
+        Raises:
+        - HookError: if a hook fails
+        """
+        route = route_path(scenario)
+        self.remaining[route] -= 1
+        try:
+            await self.engine.run("after_scenario", scenario_hooks(scenario), scenario)
+        finally:
+            if self.remaining[route] == 0:
+                await self.engine.run("after_route", self.route_hooks[route], self._routes[route])
+
+
+def scenario_hooks(scenario: Any) -> Iterable[dict]:
+    """
+    Returns the merged hooks of a scenario.
+
+    Args:
+    - scenario (Any): a Scenario instance or a ScenarioSpec
+
+    Returns:
+    - Iterable[dict]: the hooks of the scenario, its route and the app
+    """
+    if isinstance(scenario, ScenarioSpec):
+        return scenario.hooks
+    return scenario.scenario.get("hooks") or ()
+
+
+def describe_hooks(engine: Optional[HookEngine], limit: int = 5) -> List[str]:
+    """
+    Returns one line per slowest hook, for the run summary.
+
+    Args:
+    - engine (Optional[HookEngine]): the engine which ran the hooks
+    - limit (int): the number of hooks described
+
+    Returns:
+    - List[str]: the lines, empty without hooks
+    """
+    if engine is None:
+        return []
+    return [
+        f"{row['hook_type']} {row['func']}: {row['count']} calls, {row['sum'] * 1000:.1f}ms total, "
+        f"max {row['max'] * 1000:.1f}ms, {row['failures']} failed"
+        for row in engine.report()[:limit]
+    ]
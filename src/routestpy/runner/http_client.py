@@ -0,0 +1,554 @@
+import asyncio
+import os
+import ssl
+import time
+from collections import deque
+from typing import Any
+from typing import AsyncIterator
+from typing import Callable
+from typing import Deque
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+from urllib.parse import urlsplit
+
+POOL_SIZE_ENV = "ROUTESTPY_POOL_SIZE"
+POOL_IDLE_TIMEOUT_ENV = "ROUTESTPY_POOL_IDLE_TIMEOUT"
+DEFAULT_POOL_SIZE = 10
+DEFAULT_IDLE_TIMEOUT = 30.0
+
+POOL_STATS = ("opened", "reused", "closed", "retried", "waited", "requests")
+
+# Methods sent again on another connection when a reused connection fails before any response
+# bytes arrive; the server may have processed the request already, so other methods are not
+IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "PUT", "DELETE", "OPTIONS", "TRACE"))
+
+# Connections a request is sent on at most
+MAX_ATTEMPTS = 3
+
+# Status codes whose responses never have a body
+NO_BODY_STATUSES = {204, 304}
+
+# Bytes read from the socket at once when a body is streamed
+READ_SIZE = 65536
+
+
+class BodyConsumer:
+    """Receives a response body as it arrives, e.g. an ArrayStreamValidator."""
+
+    def feed(self, chunk: bytes) -> None:
+        raise NotImplementedError
+
+    def close(self) -> Any:
+        raise NotImplementedError
+
+
+ConsumerFactory = Callable[[int, List[Tuple[str, str]]], Optional[BodyConsumer]]
+
+
+class HttpError(Exception):
+    """Raised when a connection fails or the server sends an invalid response."""
+
+
+class HttpRequest:
+    """
+    HttpRequest class represents an HTTP/1.1 request.
+    """
+
+    def __init__(
+        self,
+        method: str,
+        url: str,
+        headers: Optional[List[Tuple[str, str]]] = None,
+        body: bytes = b"",
+    ) -> None:
+        """
+        Initializes HttpRequest instance.
+
+        Args:
+        - method (str): the HTTP method
+        - url (str): the absolute http:// or https:// URL
+        - headers (Optional[List[Tuple[str, str]]]): the request headers
+        - body (bytes): the request body
+
+        Returns: None
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Invalid request URL: {url}")
+
+        self.method = method.upper()
+        self.url = url
+        self.headers = headers or []
+        self.body = body
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+
+    @property
+    def origin(self) -> Tuple[str, str, int]:
+        return self.scheme, self.host, self.port
+
+    def encode(self, keep_alive: bool) -> bytes:
+        """
+        Serializes the request.
+
+        Args:
+        - keep_alive (bool): whether the connection should stay open after the response
+
+        Returns:
+        - bytes: the request line, headers and body
+        """
+        default_port = 443 if self.scheme == "https" else 80
+        lines = [f"{self.method} {self.target} HTTP/1.1"]
+        names = {name.lower() for name, _ in self.headers}
+        if "host" not in names:
+            lines.append(f"Host: {self.host}" if self.port == default_port else f"Host: {self.host}:{self.port}")
+        lines.extend(f"{name}: {value}" for name, value in self.headers)
+        if self.body or self.method in ("POST", "PUT", "PATCH"):
+            lines.append(f"Content-Length: {len(self.body)}")
+        if "connection" not in names:
+            lines.append("Connection: keep-alive" if keep_alive else "Connection: close")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + self.body
+
+
+class HttpResponse:
+    """
+    HttpResponse class represents an HTTP/1.1 response.
+    """
+
+    def __init__(self, status: int, reason: str, headers: List[Tuple[str, str]], body: bytes) -> None:
+        """
+        Initializes HttpResponse instance.
+
+        Args:
+        - status (int): the status code
+        - reason (str): the reason phrase
+        - headers (List[Tuple[str, str]]): the response headers
+        - body (bytes): the response body
+
+        Returns: None
+        """
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+
+    def header(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        """
+        Returns the first value of a header, matching its name case-insensitively.
+
+        Args:
+        - name (str): the header name
+        - default (Optional[str]): the value returned if the header is missing
+
+        Returns:
+        - Optional[str]: the header value
+        """
+        name = name.lower()
+        for key, value in self.headers:
+            if key.lower() == name:
+                return value
+        return default
+
+    def __repr__(self) -> str:
+        return f"<HttpResponse [{self.status}]>"
+
+
+class HttpConnection:
+    """
+    HttpConnection class represents one HTTP/1.1 client connection over asyncio streams.
+
+    Attributes:
+        reusable (bool): Whether another request can be sent on the connection.
+        received (bool): Whether any response bytes arrived for the last request.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Initializes HttpConnection instance with open streams, see open().
+
+        Returns: None
+        """
+        self.reader = reader
+        self.writer = writer
+        self.reusable = True
+        self.received = False
+
+    @classmethod
+    async def open(
+        cls, scheme: str, host: str, port: int, ssl_context: Optional[ssl.SSLContext] = None
+    ) -> "HttpConnection":
+        """
+        Opens a connection to the origin.
+
+        Args:
+        - scheme (str): "http" or "https"
+        - host (str): the host name
+        - port (int): the port
+        - ssl_context (Optional[ssl.SSLContext]): the TLS context for https, the default context if None
+
+        Returns:
+        - HttpConnection: the open connection
+        """
+        if scheme == "https":
+            reader, writer = await asyncio.open_connection(host, port, ssl=ssl_context or ssl.create_default_context())
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def request(
+        self, request: HttpRequest, keep_alive: bool = True, body_consumer: Optional[ConsumerFactory] = None
+    ) -> HttpResponse:
+        """
+        Sends a request and reads its response.
+
+        Args:
+        - request (HttpRequest): the request
+        - keep_alive (bool): whether to ask the server to keep the connection open
+        - body_consumer (Optional[ConsumerFactory]): called with the status and headers, may return
+          a BodyConsumer which then receives the body as it arrives instead of the response
+
+        Returns:
+        - HttpResponse: the response
+
+        Raises:
+        - HttpError: if the server closes the connection or sends an invalid response
+        - Exception: whatever the body consumer raises, after which the connection is not reused
+        """
+        self.received = False
+        self.writer.write(request.encode(keep_alive))
+        await self.writer.drain()
+
+        try:
+            head = await self.reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError as e:
+            self.reusable = False
+            self.received = bool(e.partial)
+            raise HttpError("Connection closed before a response was received") from e
+        self.received = True
+
+        status, reason, headers = self._parse_head(head)
+        response_headers = {name.lower(): value for name, value in headers}
+        # The connection is only reusable once the whole body has been read
+        self.reusable = False
+        reusable = keep_alive and response_headers.get("connection", "").lower() != "close"
+
+        consumer = body_consumer(status, headers) if body_consumer is not None else None
+        if request.method == "HEAD" or status in NO_BODY_STATUSES or 100 <= status < 200:
+            body = b""
+            response_headers.pop("transfer-encoding", None)
+            response_headers["content-length"] = "0"
+        elif consumer is not None:
+            async for chunk in self._iter_body(response_headers):
+                consumer.feed(chunk)
+            body = b""
+        elif "content-length" in response_headers and "chunked" not in response_headers.get("transfer-encoding", ""):
+            body = await self.reader.readexactly(int(response_headers["content-length"]))
+        else:
+            body = b"".join([chunk async for chunk in self._iter_body(response_headers)])
+        if consumer is not None:
+            consumer.close()
+
+        # A body without a length ends when the server closes the connection
+        self.reusable = reusable and ("content-length" in response_headers or "transfer-encoding" in response_headers)
+        return HttpResponse(status, reason, headers, body)
+
+    @staticmethod
+    def _parse_head(head: bytes) -> Tuple[int, str, List[Tuple[str, str]]]:
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            _, status, *reason = lines[0].split(" ", 2)
+            headers = []
+            for line in lines[1:]:
+                if line:
+                    name, _, value = line.partition(":")
+                    headers.append((name.strip(), value.strip()))
+            return int(status), reason[0] if reason else "", headers
+        except ValueError as e:
+            raise HttpError(f"Invalid response status line: {lines[0]!r}") from e
+
+    async def _iter_body(self, response_headers: Dict[str, str]) -> AsyncIterator[bytes]:
+        # Yields the body in pieces of at most READ_SIZE bytes as they arrive
+        if "chunked" in response_headers.get("transfer-encoding", "").lower():
+            while True:
+                size_line = await self.reader.readuntil(b"\r\n")
+                size = int(size_line.split(b";", 1)[0].strip(), 16)
+                if size == 0:
+                    # Skip trailers up to the final empty line
+                    while await self.reader.readuntil(b"\r\n") != b"\r\n":
+                        pass
+                    return
+                while size:
+                    chunk = await self.reader.read(min(size, READ_SIZE))
+                    if not chunk:
+                        raise asyncio.IncompleteReadError(b"", size)
+                    size -= len(chunk)
+                    yield chunk
+                await self.reader.readexactly(2)
+        elif "content-length" in response_headers:
+            remaining = int(response_headers["content-length"])
+            while remaining:
+                chunk = await self.reader.read(min(remaining, READ_SIZE))
+                if not chunk:
+                    raise asyncio.IncompleteReadError(b"", remaining)
+                remaining -= len(chunk)
+                yield chunk
+        else:
+            chunk = await self.reader.read(READ_SIZE)
+            while chunk:
+                yield chunk
+                chunk = await self.reader.read(READ_SIZE)
+
+    def close(self) -> None:
+        """
+        Closes the connection.
+
+        Returns: None
+        """
+        self.reusable = False
+        self.writer.close()
+
+
+class ConnectionPool:
+    """
+    ConnectionPool class represents the keep-alive connections to one origin. At most
+    max_connections are open at once, further requests wait for a connection to be released.
+    """
+
+    def __init__(
+        self,
+        scheme: str,
+        host: str,
+        port: int,
+        max_connections: int,
+        max_idle: Optional[int] = None,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        ssl_context: Optional[ssl.SSLContext] = None,
+    ) -> None:
+        """
+        Initializes an empty ConnectionPool instance.
+
+        Args:
+        - scheme (str): "http" or "https"
+        - host (str): the host name
+        - port (int): the port
+        - max_connections (int): the maximum number of open connections
+        - max_idle (Optional[int]): the maximum number of idle connections kept, max_connections if None
+        - idle_timeout (float): seconds after which an idle connection is closed instead of reused
+        - ssl_context (Optional[ssl.SSLContext]): the TLS context for https
+
+        Returns: None
+        """
+        if max_connections < 1:
+            raise ValueError(f"max_connections must be at least 1, got {max_connections}")
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.max_connections = max_connections
+        self.max_idle = max_connections if max_idle is None else max_idle
+        self.idle_timeout = idle_timeout
+        self.ssl_context = ssl_context
+        self._idle: Deque[Tuple[float, HttpConnection]] = deque()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.stats: Dict[str, int] = dict.fromkeys(POOL_STATS, 0)
+
+    async def acquire(self) -> Tuple[HttpConnection, bool]:
+        """
+        Returns an idle connection, or a new one if none can be reused.
+
+        Returns:
+        - Tuple[HttpConnection, bool]: the connection and whether it was reused
+        """
+        if self._slots is None:
+            # Created lazily so that the semaphore binds to the running event loop
+            self._slots = asyncio.Semaphore(self.max_connections)
+        if self._slots.locked():
+            self.stats["waited"] += 1
+        await self._slots.acquire()
+
+        now = time.monotonic()
+        while self._idle:
+            released_at, connection = self._idle.pop()
+            if now - released_at < self.idle_timeout and not connection.reader.at_eof():
+                self.stats["reused"] += 1
+                return connection, True
+            self._discard(connection)
+
+        try:
+            connection = await HttpConnection.open(self.scheme, self.host, self.port, self.ssl_context)
+        except BaseException:
+            self._slots.release()
+            raise
+        self.stats["opened"] += 1
+        return connection, False
+
+    def release(self, connection: HttpConnection) -> None:
+        """
+        Returns a connection to the pool, closing it if it cannot be reused.
+
+        Args:
+        - connection (HttpConnection): a connection returned by acquire()
+
+        Returns: None
+        """
+        if connection.reusable and len(self._idle) < self.max_idle:
+            self._idle.append((time.monotonic(), connection))
+        else:
+            self._discard(connection)
+        if self._slots is not None:
+            self._slots.release()
+
+    def _discard(self, connection: HttpConnection) -> None:
+        connection.close()
+        self.stats["closed"] += 1
+
+    def close(self) -> None:
+        """
+        Closes every idle connection.
+
+        Returns: None
+        """
+        while self._idle:
+            self._discard(self._idle.pop()[1])
+
+
+class Transport:
+    """
+    Transport class sends HttpRequest objects over keep-alive connections, with one
+    ConnectionPool per origin.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 30.0,
+        ssl_context: Optional[ssl.SSLContext] = None,
+        max_connections_per_host: Optional[int] = None,
+        max_idle_per_host: Optional[int] = None,
+        idle_timeout: Optional[float] = None,
+    ) -> None:
+        """
+        Initializes Transport instance. Limits not given are read from the environment.
+
+        Args:
+        - timeout (float): seconds allowed for connecting, sending and receiving a response
+        - ssl_context (Optional[ssl.SSLContext]): the TLS context for https origins
+        - max_connections_per_host (Optional[int]): the pool size, defaults to ROUTESTPY_POOL_SIZE or 10
+        - max_idle_per_host (Optional[int]): the idle connections kept, defaults to the pool size
+        - idle_timeout (Optional[float]): seconds an idle connection is kept, defaults to
+          ROUTESTPY_POOL_IDLE_TIMEOUT or 30
+
+        Returns: None
+        """
+        if max_connections_per_host is None:
+            max_connections_per_host = int(os.getenv(POOL_SIZE_ENV, default=str(DEFAULT_POOL_SIZE)))
+        if idle_timeout is None:
+            idle_timeout = float(os.getenv(POOL_IDLE_TIMEOUT_ENV, default=str(DEFAULT_IDLE_TIMEOUT)))
+        self.timeout = timeout
+        self.ssl_context = ssl_context
+        self.max_connections_per_host = max_connections_per_host
+        self.max_idle_per_host = max_idle_per_host
+        self.idle_timeout = idle_timeout
+        self.pools: Dict[Tuple[str, str, int], ConnectionPool] = {}
+
+    def pool(self, origin: Tuple[str, str, int]) -> ConnectionPool:
+        """
+        Returns the pool of an origin, creating it on first use.
+
+        Args:
+        - origin (Tuple[str, str, int]): the scheme, host and port
+
+        Returns:
+        - ConnectionPool: the pool
+        """
+        pool = self.pools.get(origin)
+        if pool is None:
+            pool = self.pools[origin] = ConnectionPool(
+                *origin,
+                max_connections=self.max_connections_per_host,
+                max_idle=self.max_idle_per_host,
+                idle_timeout=self.idle_timeout,
+                ssl_context=self.ssl_context,
+            )
+        return pool
+
+    async def request(self, request: HttpRequest, body_consumer: Optional[ConsumerFactory] = None) -> HttpResponse:
+        """
+        Sends a request, reusing an idle connection to its origin when there is one.
+
+        Args:
+        - request (HttpRequest): the request
+        - body_consumer (Optional[ConsumerFactory]): streams the body, see HttpConnection.request()
+
+        Returns:
+        - HttpResponse: the response
+
+        Raises:
+        - HttpError: if the connection fails or the response is invalid
+        - asyncio.TimeoutError: if the request takes longer than the timeout
+        """
+        return await asyncio.wait_for(self._request(self.pool(request.origin), request, body_consumer), self.timeout)
+
+    async def _request(
+        self, pool: ConnectionPool, request: HttpRequest, body_consumer: Optional[ConsumerFactory]
+    ) -> HttpResponse:
+        attempts = 0
+        while True:
+            attempts += 1
+            try:
+                connection, reused = await pool.acquire()
+            except OSError as e:
+                raise HttpError(f"Cannot connect to {request.host}:{request.port}: {e}") from e
+            try:
+                response = await connection.request(request, body_consumer=body_consumer)
+            except (HttpError, ConnectionError) as e:
+                connection.reusable = False
+                # The server may close an idle connection just as it is reused, retry on another one
+                retry = reused and not connection.received and request.method in IDEMPOTENT_METHODS
+                if retry and attempts < MAX_ATTEMPTS:
+                    pool.stats["retried"] += 1
+                    continue
+                if isinstance(e, HttpError):
+                    raise
+                raise HttpError(f"Connection to {request.host}:{request.port} failed: {e}") from e
+            except BaseException:
+                connection.reusable = False
+                raise
+            finally:
+                pool.release(connection)
+            pool.stats["requests"] += 1
+            return response
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Returns the connection counters of every origin.
+
+        Returns:
+        - Dict[str, Dict[str, int]]: counters of opened, reused, closed and retried connections,
+          of requests waiting for a free connection and of completed requests, by "scheme://host:port"
+        """
+        return {f"{scheme}://{host}:{port}": dict(pool.stats) for (scheme, host, port), pool in self.pools.items()}
+
+    def total_stats(self) -> Dict[str, int]:
+        """
+        Returns the connection counters summed over every origin.
+
+        Returns:
+        - Dict[str, int]: the counters, see stats()
+        """
+        totals = dict.fromkeys(POOL_STATS, 0)
+        for pool in self.pools.values():
+            for name, value in pool.stats.items():
+                totals[name] += value
+        return totals
+
+    async def close(self) -> None:
+        """
+        Closes every idle connection.
+
+        Returns: None
+        """
+        for pool in self.pools.values():
+            pool.close()
@@ -0,0 +1,319 @@
+import asyncio
+import bisect
+import itertools
+import math
+import random
+from collections import Counter
+from typing import Any
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+from .http_client import HttpError
+from .http_client import HttpRequest
+from .http_client import Transport
+from .metrics import Labels
+from .metrics import LatencyHistogram
+from .metrics import MetricsRegistry
+from .metrics import result_labels
+from .scenario_request import build_request
+from .scenario_request import route_name
+
+# Weight of scenarios whose meta has no load_weight
+DEFAULT_WEIGHT = 1.0
+
+
+class LoadProfile:
+    """
+    LoadProfile class represents the offered load: the rate rises linearly from zero to rate over
+    ramp_up seconds, then stays at rate until duration seconds have passed since the start.
+    """
+
+    def __init__(self, rate: float, duration: float, ramp_up: float = 0.0) -> None:
+        """
+        Initializes LoadProfile instance.
+
+        Args:
+        - rate (float): the target rate in requests per second
+        - duration (float): seconds from the start to the last scheduled request, ramp-up included
+        - ramp_up (float): seconds taken to reach the target rate
+
+        Returns: None
+        """
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        if duration <= 0 or ramp_up < 0 or ramp_up > duration:
+            raise ValueError(f"Invalid duration {duration} and ramp-up {ramp_up}")
+        self.rate = rate
+        self.duration = duration
+        self.ramp_up = ramp_up
+
+    def send_times(self) -> Iterator[float]:
+        """
+        Yields the scheduled send time of every request, in seconds from the start. Times are
+        derived from the request count rather than accumulated, so they do not drift.
+
+        Returns:
+        - Iterator[float]: increasing send times below duration
+        """
+        rate, ramp_up = self.rate, self.ramp_up
+        # During the ramp the k-th request is due when rate * t^2 / (2 * ramp_up) reaches k
+        ramp_requests = rate * ramp_up / 2
+        for k in itertools.count():
+            if k < ramp_requests:
+                at = math.sqrt(2 * ramp_up * k / rate)
+            else:
+                at = ramp_up + (k - ramp_requests) / rate
+            if at >= self.duration:
+                return
+            yield at
+
+    @property
+    def expected_requests(self) -> int:
+        return math.ceil(self.rate * (self.duration - self.ramp_up / 2))
+
+
+class WeightedMix:
+    """
+    WeightedMix class picks scenarios at random in proportion to their weight, the `load_weight`
+    meta field of each scenario.
+    """
+
+    def __init__(self, scenarios: Sequence[Any], seed: Optional[int] = None) -> None:
+        """
+        Initializes WeightedMix instance.
+
+        Args:
+        - scenarios (Sequence[Any]): Scenario instances
+        - seed (Optional[int]): seed making the sequence of picks reproducible
+
+        Returns: None
+
+        Raises:
+        - ValueError: if there are no scenarios or every weight is zero
+        """
+        self.scenarios = list(scenarios)
+        weights = [float(s.get_meta().get("load_weight", DEFAULT_WEIGHT)) for s in self.scenarios]
+        self.cumulative = list(itertools.accumulate(weights))
+        if not self.cumulative or self.cumulative[-1] <= 0:
+            raise ValueError("No scenario with a positive load_weight to run")
+        self.random = random.Random(seed)
+
+    def pick(self) -> int:
+        """
+        Returns the position of a randomly picked scenario.
+
+        Returns:
+        - int: the position in scenarios
+        """
+        return bisect.bisect_right(self.cumulative, self.random.random() * self.cumulative[-1])
+
+
+class LoadSummary:
+    """
+    LoadSummary class represents the outcome of a load run. Requests are counted as they complete
+    rather than kept, so memory does not grow with the rate or the duration.
+
+    Attributes:
+        count (int): Requests sent.
+        latency (LatencyHistogram): Seconds from the due time to the end of each response, so time
+            spent waiting behind a slow server or for a free connection counts against the server.
+        send_delay (LatencyHistogram): Seconds between the due time and the actual send.
+        statuses (Counter): Requests by response status code, None for failed requests.
+        failures (Counter): Failed requests by failure description.
+        duration (float): Seconds from the start to the last response.
+        dropped (int): Requests not sent because max_in_flight requests were outstanding.
+        connections (Dict[str, int]): Connection counters of the transport.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.latency = LatencyHistogram()
+        self.send_delay = LatencyHistogram()
+        self.statuses: "Counter[Optional[int]]" = Counter()
+        self.failures: "Counter[str]" = Counter()
+        self.duration = 0.0
+        self.dropped = 0
+        self.connections: Dict[str, int] = {}
+
+    def record(self, latency: float, send_delay: float, status: Optional[int], error: Optional[str]) -> None:
+        """
+        Counts one request.
+
+        Args:
+        - latency (float): seconds from the due time to the end of the response
+        - send_delay (float): seconds between the due time and the actual send
+        - status (Optional[int]): the response status code, None if the request failed
+        - error (Optional[str]): the failure description
+
+        Returns: None
+        """
+        self.count += 1
+        self.latency.record(latency)
+        self.send_delay.record(send_delay)
+        self.statuses[status] += 1
+        if error is not None:
+            self.failures[error] += 1
+
+    @property
+    def errors(self) -> int:
+        return sum(self.failures.values())
+
+    def status_counts(self) -> Dict[Optional[int], int]:
+        return dict(self.statuses)
+
+    def percentile(self, percent: float) -> float:
+        """
+        Returns a latency percentile.
+
+        Args:
+        - percent (float): the percentile, between 0 and 100
+
+        Returns:
+        - float: the latency in seconds, 0.0 without requests
+        """
+        return self.latency.percentile(percent)
+
+
+class LoadRunner:
+    """
+    LoadRunner class replays scenarios at a scheduled rate. It is open-loop: requests are sent at
+    their scheduled time whether or not earlier ones have completed, and latency is measured
+    from the scheduled time, so a slow server shows up as latency instead of a lower rate.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        profile: LoadProfile,
+        connections: int = 100,
+        timeout: float = 30.0,
+        max_in_flight: int = 10000,
+        seed: Optional[int] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ) -> None:
+        """
+        Initializes LoadRunner instance.
+
+        Args:
+        - base_url (str): the scheme, host and optional path prefix of the environment
+        - profile (LoadProfile): the rate, ramp-up and duration
+        - connections (int): the maximum number of connections per host
+        - timeout (float): seconds allowed for each request
+        - max_in_flight (int): outstanding requests above which due requests are dropped and counted
+        - seed (Optional[int]): seed of the scenario mix
+        - metrics (Optional[MetricsRegistry]): records the latency from the scheduled time, status
+          and in-flight requests
+
+        Returns: None
+        """
+        self.base_url = base_url
+        self.profile = profile
+        self.connections = connections
+        self.timeout = timeout
+        self.max_in_flight = max_in_flight
+        self.seed = seed
+        self.metrics = metrics
+
+    def run(self, scenarios: Sequence[Any]) -> LoadSummary:
+        """
+        Runs the load on a new event loop.
+
+        Args:
+        - scenarios (Sequence[Any]): Scenario instances making up the mix
+
+        Returns:
+        - LoadSummary: the outcome of the requests
+        """
+        return asyncio.run(self.run_async(scenarios))
+
+    async def run_async(self, scenarios: Sequence[Any]) -> LoadSummary:
+        """
+        Runs the load on the running event loop.
+
+        Args:
+        - scenarios (Sequence[Any]): Scenario instances making up the mix
+
+        Returns:
+        - LoadSummary: the outcome of the requests
+        """
+        mix = WeightedMix(scenarios, self.seed)
+        # Requests are built once, only the scenario picked varies between sends
+        requests: List[HttpRequest] = [build_request(scenario, self.base_url) for scenario in mix.scenarios]
+        labels = [
+            result_labels(route_name(scenario), scenario.get_name(), request.method, request.url)
+            for scenario, request in zip(mix.scenarios, requests)
+        ]
+        transport = Transport(self.timeout, max_connections_per_host=self.connections)
+        summary = LoadSummary()
+        in_flight = set()
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        try:
+            for at in self.profile.send_times():
+                delay = start + at - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                if len(in_flight) >= self.max_in_flight:
+                    summary.dropped += 1
+                    continue
+                task = asyncio.ensure_future(self._send(transport, requests, labels, mix.pick(), start, at, summary))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            if in_flight:
+                await asyncio.wait(in_flight)
+            summary.duration = loop.time() - start
+        finally:
+            for task in in_flight:
+                task.cancel()
+            await transport.close()
+
+        summary.connections = transport.total_stats()
+        return summary
+
+    async def _send(
+        self,
+        transport: Transport,
+        requests: List[HttpRequest],
+        labels: List[Labels],
+        scenario: int,
+        start: float,
+        at: float,
+        summary: LoadSummary,
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        scheduled = start + at
+        send_delay = loop.time() - scheduled
+        status, error = None, None
+        if self.metrics is not None:
+            self.metrics.started(labels[scenario])
+        try:
+            status = (await transport.request(requests[scenario])).status
+        except asyncio.TimeoutError:
+            error = f"Timed out after {self.timeout}s"
+        except (HttpError, OSError, ValueError, asyncio.IncompleteReadError, asyncio.LimitOverrunError) as e:
+            error = f"{type(e).__name__}: {e}"
+        latency = loop.time() - scheduled
+        if self.metrics is not None:
+            self.metrics.finished(labels[scenario], latency, status)
+        summary.record(latency, send_delay, status, error)
+
+
+def describe_latency(summary: LoadSummary, percentiles: Tuple[float, ...] = (50, 90, 99, 99.9)) -> str:
+    """
+    Returns the latency percentiles of a load run as text, in milliseconds.
+
+    Args:
+    - summary (LoadSummary): the load run
+    - percentiles (Tuple[float, ...]): the percentiles to describe
+
+    Returns:
+    - str: e.g. "p50 1.2ms, p90 3.4ms, ..."
+    """
+    described = [f"p{p:g} {summary.percentile(p) * 1000:.1f}ms" for p in percentiles]
+    described.append(f"max {summary.percentile(100) * 1000:.1f}ms")
+    return ", ".join(described)
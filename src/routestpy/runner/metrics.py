@@ -0,0 +1,424 @@
+import json
+import math
+import os
+import tempfile
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+from urllib.parse import urlsplit
+
+# Labels every metric is broken down by
+LABELS = ("route", "scenario", "method", "host")
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+Labels = Tuple[str, str, str, str]
+
+
+class LatencyHistogram:
+    """
+    LatencyHistogram class represents a bounded-memory histogram of latencies in the style of
+    HdrHistogram: values are counted in log-linear buckets, so that any percentile is reported
+    within a relative error set by significant_figures, without storing the samples.
+
+    Values are recorded in whole microseconds; values above highest are counted in the last
+    bucket, while min and max stay exact. Only the buckets actually hit are stored, which for
+    the latencies of one endpoint is a few dozen rather than the thousands of the full range.
+    """
+
+    def __init__(self, highest: float = 3600.0, significant_figures: int = 2) -> None:
+        """
+        Initializes an empty LatencyHistogram instance.
+
+        Args:
+        - highest (float): the highest latency in seconds tracked with full precision
+        - significant_figures (int): the number of significant decimal figures kept, 1 to 4
+
+        Returns: None
+        """
+        if not 1 <= significant_figures <= 4:
+            raise ValueError(f"significant_figures must be between 1 and 4, got {significant_figures}")
+        self.highest = highest
+        self.significant_figures = significant_figures
+        # Each power of two is split into half_count linear sub-buckets
+        self.sub_bits = math.ceil(math.log2(2 * 10**significant_figures))
+        self.sub_count = 1 << self.sub_bits
+        self.half_count = self.sub_count >> 1
+        self.max_shift = max(0, int(highest * 1e6).bit_length() - self.sub_bits)
+        # Counts by bucket index, see _index()
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def _index(self, value: int) -> int:
+        if value < self.sub_count:
+            return value
+        shift = min(value.bit_length() - self.sub_bits, self.max_shift)
+        sub = min(value >> shift, self.sub_count - 1)
+        return self.sub_count + (shift - 1) * self.half_count + sub - self.half_count
+
+    def _value(self, index: int) -> float:
+        # Returns the midpoint, in microseconds, of the values counted at index
+        if index < self.sub_count:
+            return float(index)
+        shift, sub = divmod(index - self.sub_count, self.half_count)
+        shift += 1
+        return ((sub + self.half_count) << shift) + ((1 << shift) - 1) / 2
+
+    def record(self, seconds: float) -> None:
+        """
+        Counts one latency.
+
+        Args:
+        - seconds (float): the latency
+
+        Returns: None
+        """
+        value = max(0, int(seconds * 1e6))
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        if self.count == 0 or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.count += 1
+        self.total += value
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """
+        Adds the counts of a histogram with the same configuration.
+
+        Args:
+        - other (LatencyHistogram): the histogram to add
+
+        Returns: None
+        """
+        if (other.sub_bits, other.max_shift) != (self.sub_bits, self.max_shift):
+            raise ValueError("Cannot merge histograms with different configurations")
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        if other.count:
+            self.min = other.min if self.count == 0 else min(self.min, other.min)
+            self.max = max(self.max, other.max)
+        self.count += other.count
+        self.total += other.total
+
+    def percentile(self, percent: float) -> float:
+        """
+        Returns a latency percentile.
+
+        Args:
+        - percent (float): the percentile, between 0 and 100
+
+        Returns:
+        - float: the latency in seconds, 0.0 if nothing was recorded
+        """
+        if self.count == 0:
+            return 0.0
+        rank = max(1, math.ceil(percent / 100 * self.count))
+        if rank >= self.count:
+            return self.max / 1e6
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(max(self._value(index), self.min), self.max) / 1e6
+        return self.max / 1e6
+
+    def copy(self) -> "LatencyHistogram":
+        """
+        Returns an independent copy, e.g. to compute percentiles outside a lock.
+
+        Returns:
+        - LatencyHistogram: the copy
+        """
+        histogram = LatencyHistogram(self.highest, self.significant_figures)
+        histogram.counts = dict(self.counts)
+        histogram.count = self.count
+        histogram.total = self.total
+        histogram.min = self.min
+        histogram.max = self.max
+        return histogram
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count / 1e6 if self.count else 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        """
+        Returns the summary statistics in seconds.
+
+        Returns:
+        - Dict[str, float]: count, sum, min, max, mean, p50, p95 and p99
+        """
+        summary = {
+            "count": self.count,
+            "sum": self.total / 1e6,
+            "min": self.min / 1e6,
+            "max": self.max / 1e6,
+            "mean": self.mean,
+        }
+        for quantile in QUANTILES:
+            summary[f"p{quantile * 100:g}"] = self.percentile(quantile * 100)
+        return summary
+
+
+def result_labels(route: str, scenario: str, method: str, url: str) -> Labels:
+    """
+    Returns the metric labels of a request.
+
+    Args:
+    - route (str): the route name
+    - scenario (str): the scenario name
+    - method (str): the HTTP method
+    - url (str): the request URL, reduced to its host and port
+
+    Returns:
+    - Labels: the label values, in the order of LABELS
+    """
+    return (route, scenario, method, urlsplit(url).netloc)
+
+
+class MetricsRegistry:
+    """
+    MetricsRegistry class keeps latency histograms, response status counters and in-flight
+    gauges per route, scenario, method and host. It is safe to update from the event loop while
+    an exporter thread reads it: readers copy the metrics under the lock and summarize the copy
+    outside it, so that exports of large suites do not stall the requests being recorded.
+    """
+
+    def __init__(self, highest: float = 3600.0, significant_figures: int = 2) -> None:
+        """
+        Initializes an empty MetricsRegistry instance.
+
+        Args:
+        - highest (float): see LatencyHistogram
+        - significant_figures (int): see LatencyHistogram
+
+        Returns: None
+        """
+        self.highest = highest
+        self.significant_figures = significant_figures
+        self.latency: Dict[Labels, LatencyHistogram] = {}
+        self.statuses: Dict[Labels, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.in_flight: Dict[Labels, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def started(self, labels: Labels) -> None:
+        """
+        Counts a request as in flight.
+
+        Args:
+        - labels (Labels): see result_labels()
+
+        Returns: None
+        """
+        with self._lock:
+            self.in_flight[labels] += 1
+
+    def finished(self, labels: Labels, elapsed: float, status: Optional[int], in_flight: bool = True) -> None:
+        """
+        Records the outcome of a request.
+
+        Args:
+        - labels (Labels): see result_labels()
+        - elapsed (float): the latency in seconds
+        - status (Optional[int]): the response status code, None if the request failed
+        - in_flight (bool): whether started() was called for the request
+
+        Returns: None
+        """
+        with self._lock:
+            if in_flight:
+                self.in_flight[labels] -= 1
+            histogram = self.latency.get(labels)
+            if histogram is None:
+                histogram = self.latency[labels] = LatencyHistogram(self.highest, self.significant_figures)
+            histogram.record(elapsed)
+            self.statuses[labels]["error" if status is None else str(status)] += 1
+
+    def observe(self, result: Any) -> None:
+        """
+        Records a ScenarioResult produced elsewhere, e.g. by a worker process.
+
+        Args:
+        - result (Any): a ScenarioResult
+
+        Returns: None
+        """
+        labels = result_labels(result.route, result.name, result.method, result.url)
+        self.finished(labels, result.elapsed, result.status, in_flight=False)
+
+    def total_latency(self) -> LatencyHistogram:
+        """
+        Returns the latency histogram of every request.
+
+        Returns:
+        - LatencyHistogram: the merged histogram
+        """
+        total = LatencyHistogram(self.highest, self.significant_figures)
+        with self._lock:
+            for histogram in self.latency.values():
+                total.merge(histogram)
+        return total
+
+    def copy(self) -> "MetricsRegistry":
+        """
+        Returns an independent copy of the metrics, taken under the lock.
+
+        Returns:
+        - MetricsRegistry: the copy
+        """
+        registry = MetricsRegistry(self.highest, self.significant_figures)
+        with self._lock:
+            registry.latency = {labels: histogram.copy() for labels, histogram in self.latency.items()}
+            for labels, counts in self.statuses.items():
+                registry.statuses[labels].update(counts)
+            registry.in_flight.update(self.in_flight)
+        return registry
+
+    def to_dict(self) -> Dict[str, List[dict]]:
+        """
+        Returns every metric as JSON-serializable data.
+
+        Returns:
+        - Dict[str, List[dict]]: the series of "latency", "responses" and "in_flight"
+        """
+        metrics = self.copy()
+        return {
+            "latency": [
+                dict(zip(LABELS, labels), **histogram.to_dict()) for labels, histogram in metrics.latency.items()
+            ],
+            "responses": [
+                dict(zip(LABELS, labels), status=status, count=count)
+                for labels, counts in metrics.statuses.items()
+                for status, count in counts.items()
+            ],
+            "in_flight": [dict(zip(LABELS, labels), value=value) for labels, value in metrics.in_flight.items()],
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """
+        Returns every metric in the Prometheus text exposition format. Latencies are exported as
+        summaries, as histogram buckets are not kept.
+
+        Returns:
+        - str: the exposition text
+        """
+        metrics = self.copy()
+        lines = [
+            "# HELP routestpy_request_duration_seconds Request latency.",
+            "# TYPE routestpy_request_duration_seconds summary",
+        ]
+        for labels, histogram in metrics.latency.items():
+            for quantile in QUANTILES:
+                value = histogram.percentile(quantile * 100)
+                lines.append(f"routestpy_request_duration_seconds{_labels(labels, quantile=quantile)} {value:g}")
+            lines.append(f"routestpy_request_duration_seconds_sum{_labels(labels)} {histogram.total / 1e6:g}")
+            lines.append(f"routestpy_request_duration_seconds_count{_labels(labels)} {histogram.count}")
+
+        lines.append("# HELP routestpy_responses_total Responses by status code, \"error\" for failed requests.")
+        lines.append("# TYPE routestpy_responses_total counter")
+        for labels, counts in metrics.statuses.items():
+            for status, count in counts.items():
+                lines.append(f"routestpy_responses_total{_labels(labels, status=status)} {count}")
+
+        lines.append("# HELP routestpy_requests_in_flight Requests sent and not yet completed.")
+        lines.append("# TYPE routestpy_requests_in_flight gauge")
+        for labels, value in metrics.in_flight.items():
+            lines.append(f"routestpy_requests_in_flight{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels: Labels, **extra: Any) -> str:
+    pairs = list(zip(LABELS, labels)) + [(name, str(value)) for name, value in extra.items()]
+    escaped = (value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class MetricsExporter:
+    """
+    MetricsExporter class writes the metrics of a registry to metrics.prom and metrics.json in a
+    directory, every interval seconds from a background thread and once more when stopped.
+    Files are replaced atomically, so readers such as the node exporter textfile collector
+    never see a partial file.
+    """
+
+    def __init__(self, registry: MetricsRegistry, directory: Path, interval: float = 10.0) -> None:
+        """
+        Initializes MetricsExporter instance.
+
+        Args:
+        - registry (MetricsRegistry): the metrics to export
+        - directory (Path): the directory the files are written to, created if missing
+        - interval (float): seconds between exports while running, 0 to only export when stopped
+
+        Returns: None
+        """
+        self.registry = registry
+        self.directory = Path(directory)
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def export(self) -> None:
+        """
+        Writes both files now.
+
+        Returns: None
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        _write_atomic(self.directory / "metrics.prom", self.registry.to_prometheus())
+        _write_atomic(self.directory / "metrics.json", self.registry.to_json())
+
+    def start(self) -> "MetricsExporter":
+        if self.interval > 0:
+            self._thread = threading.Thread(target=self._run, name="routestpy-metrics", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.export()
+            except OSError as e:
+                print("Could not export metrics:", e)
+
+    def stop(self) -> None:
+        """
+        Stops the background exports and writes the final metrics.
+
+        Returns: None
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.export()
+
+    def __enter__(self) -> "MetricsExporter":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=path.name)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
@@ -0,0 +1,265 @@
+import asyncio
+import gc
+import multiprocessing
+import queue
+import time
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+from .async_runner import AsyncRunner
+from .async_runner import RunSummary
+from .async_runner import ScenarioResult
+from .http_client import POOL_STATS
+from .metrics import MetricsRegistry
+
+# Seconds between checks that the workers are still alive while waiting for results
+POLL_INTERVAL = 0.5
+
+
+class ShardQueue:
+    """
+    ShardQueue class hands out shards of scenarios to workers, with work stealing. Every worker
+    owns a contiguous run of shards which it takes from the front; a worker which has finished
+    its own shards steals from the back of the worker with the most shards left. The queue
+    lives in shared memory, so it is created before the workers are forked.
+    """
+
+    def __init__(self, context: Any, shard_count: int, workers: int) -> None:
+        """
+        Initializes ShardQueue instance, splitting shard_count shards evenly between workers.
+
+        Args:
+        - context (Any): the multiprocessing context used to fork the workers
+        - shard_count (int): the number of shards
+        - workers (int): the number of workers
+
+        Returns: None
+        """
+        self.workers = workers
+        # bounds[2 * w] is the next shard of worker w, bounds[2 * w + 1] is the end of its run
+        self.bounds = context.Array("l", 2 * workers, lock=False)
+        self.lock = context.Lock()
+        for worker in range(workers):
+            self.bounds[2 * worker] = shard_count * worker // workers
+            self.bounds[2 * worker + 1] = shard_count * (worker + 1) // workers
+
+    def claim(self, worker: int) -> Optional[int]:
+        """
+        Returns the next shard for a worker, stolen from another worker once its own are done.
+
+        Args:
+        - worker (int): the worker id
+
+        Returns:
+        - Optional[int]: the shard index, or None when every shard has been claimed
+        """
+        bounds = self.bounds
+        with self.lock:
+            if bounds[2 * worker] < bounds[2 * worker + 1]:
+                bounds[2 * worker] += 1
+                return bounds[2 * worker] - 1
+
+            victim = max(range(self.workers), key=lambda w: bounds[2 * w + 1] - bounds[2 * w])
+            if bounds[2 * victim] < bounds[2 * victim + 1]:
+                bounds[2 * victim + 1] -= 1
+                return bounds[2 * victim + 1]
+            return None
+
+
+def make_shards(count: int, shard_size: int) -> List[Tuple[int, int]]:
+    """
+    Splits the positions of count scenarios into contiguous shards.
+
+    Args:
+    - count (int): the number of scenarios
+    - shard_size (int): the number of scenarios per shard
+
+    Returns:
+    - List[Tuple[int, int]]: the start and stop position of every shard
+    """
+    return [(start, min(start + shard_size, count)) for start in range(0, count, shard_size)]
+
+
+class PreforkRunner:
+    """
+    PreforkRunner class runs scenarios in forked worker processes, each with its own event loop
+    and AsyncRunner. The scenarios are loaded once in the parent and inherited by the workers
+    copy-on-write, so only results travel between processes. Results are merged in the order of
+    the scenarios, whichever worker ran them.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        parallel_count: int,
+        workers: int,
+        timeout: float = 30.0,
+        shard_size: Optional[int] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        on_result: Optional[Callable[[ScenarioResult], None]] = None,
+    ) -> None:
+        """
+        Initializes PreforkRunner instance.
+
+        Args:
+        - base_url (str): the scheme, host and optional path prefix of the environment
+        - parallel_count (int): the number of requests in flight over all workers
+        - workers (int): the number of worker processes
+        - timeout (float): seconds allowed for each request
+        - shard_size (Optional[int]): scenarios per shard, by default about eight shards per worker
+        - metrics (Optional[MetricsRegistry]): records the results as the workers send them back
+        - on_result (Optional[Callable[[ScenarioResult], None]]): called with each result as the
+          workers send it back, in completion order
+
+        Returns: None
+        """
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, got {workers}")
+        if parallel_count < 1:
+            raise ValueError(f"parallel_count must be at least 1, got {parallel_count}")
+        self.base_url = base_url
+        self.parallel_count = parallel_count
+        self.workers = workers
+        self.timeout = timeout
+        self.shard_size = shard_size
+        self.metrics = metrics
+        self.on_result = on_result
+
+    def worker_runner(self) -> AsyncRunner:
+        """
+        Returns the AsyncRunner of one worker, which gets an equal share of parallel_count.
+
+        Returns:
+        - AsyncRunner: the runner
+        """
+        return AsyncRunner(self.base_url, max(1, self.parallel_count // self.workers), self.timeout)
+
+    def run(self, scenarios: Iterable[Any]) -> RunSummary:
+        """
+        Runs the scenarios in forked workers. Falls back to a single AsyncRunner in this process
+        for a single worker or where fork is not available.
+
+        Args:
+        - scenarios (Iterable[Any]): Scenario instances, materialized before they are passed so
+          that the workers share the parsed data
+
+        Returns:
+        - RunSummary: the results, in the order of the scenarios
+        """
+        scenarios = list(scenarios)
+        workers = min(self.workers, len(scenarios))
+        try:
+            context = multiprocessing.get_context("fork")
+        except ValueError:
+            workers = 1
+        if workers <= 1:
+            return AsyncRunner(
+                self.base_url, self.parallel_count, self.timeout, metrics=self.metrics, on_result=self.on_result
+            ).run(scenarios)
+
+        shard_size = self.shard_size or max(1, -(-len(scenarios) // (workers * 8)))
+        shards = make_shards(len(scenarios), shard_size)
+        shard_queue = ShardQueue(context, len(shards), workers)
+        results_queue = context.Queue()
+
+        started = time.perf_counter()
+        # Moving the loaded project out of the collector's generations keeps the workers from
+        # copying the pages it lives on when they collect garbage
+        if hasattr(gc, "freeze"):
+            gc.freeze()
+        processes = [
+            context.Process(
+                target=self._work,
+                args=(worker, scenarios, shards, shard_queue, results_queue),
+                name=f"routestpy-worker-{worker}",
+                daemon=True,
+            )
+            for worker in range(workers)
+        ]
+        try:
+            for process in processes:
+                process.start()
+            results, connections = self._collect(processes, results_queue)
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+                process.join()
+            if hasattr(gc, "unfreeze"):
+                gc.unfreeze()
+
+        merged: List[ScenarioResult] = []
+        for position, scenario in enumerate(scenarios):
+            result = results.get(position)
+            if result is None:
+                result = ScenarioResult(scenario.get_name(), "", "", None, 0.0, "Worker exited", started)
+                if self.on_result is not None:
+                    self.on_result(result)
+            merged.append(result)
+        return RunSummary(merged, time.perf_counter() - started, connections)
+
+    def _work(
+        self,
+        worker: int,
+        scenarios: Sequence[Any],
+        shards: Sequence[Tuple[int, int]],
+        shard_queue: ShardQueue,
+        results_queue: Any,
+    ) -> None:
+        # Runs in the forked worker: one event loop and one connection pool for every shard
+        runner = self.worker_runner()
+        runner.transport = runner.create_transport()
+
+        async def work() -> None:
+            try:
+                shard = shard_queue.claim(worker)
+                while shard is not None:
+                    start, stop = shards[shard]
+                    summary = await runner.run_async(scenarios[start:stop])
+                    for result in summary.results:
+                        # Responses stay in the worker, only the outcome is sent back
+                        result.response = None
+                    results_queue.put((worker, start, summary.results))
+                    shard = shard_queue.claim(worker)
+            finally:
+                await runner.transport.close()
+            results_queue.put((worker, None, runner.transport.total_stats()))
+
+        asyncio.run(work())
+
+    def _collect(
+        self, processes: List[Any], results_queue: Any
+    ) -> Tuple[Dict[int, ScenarioResult], Dict[str, int]]:
+        results: Dict[int, ScenarioResult] = {}
+        connections = dict.fromkeys(POOL_STATS, 0)
+        running = set(range(len(processes)))
+        while running:
+            try:
+                worker, start, payload = results_queue.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                # A worker which died without reporting leaves its scenarios without results
+                for worker in list(running):
+                    exitcode = processes[worker].exitcode
+                    if exitcode is not None and exitcode != 0:
+                        print(f"Worker {worker} exited with code {exitcode}")
+                        running.discard(worker)
+                continue
+
+            if start is None:
+                running.discard(worker)
+                for name, value in payload.items():
+                    connections[name] += value
+            else:
+                for offset, result in enumerate(payload):
+                    results[start + offset] = result
+                    if self.metrics is not None:
+                        self.metrics.observe(result)
+                    if self.on_result is not None:
+                        self.on_result(result)
+        return results, connections
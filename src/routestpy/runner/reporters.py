@@ -0,0 +1,235 @@
+import asyncio
+import json
+import queue
+import threading
+from pathlib import Path
+from typing import IO
+from typing import Any
+from typing import List
+from typing import Optional
+from xml.sax.saxutils import escape
+from xml.sax.saxutils import quoteattr
+
+# Sentinel telling the writer thread to stop
+_CLOSE = object()
+
+
+def result_record(result: Any, retain_bodies: bool = False) -> dict:
+    """
+    Returns the JSON-serializable record of a ScenarioResult.
+
+    Args:
+    - result (Any): a ScenarioResult
+    - retain_bodies (bool): whether to include the response body, decoded as UTF-8
+
+    Returns:
+    - dict: the record
+    """
+    record = {
+        "route": result.route,
+        "scenario": result.name,
+        "method": result.method,
+        "url": result.url,
+        "status": result.status,
+        "elapsed": result.elapsed,
+        "error": result.error,
+    }
+    if retain_bodies and result.response is not None:
+        record["body"] = result.response.body.decode("utf-8", errors="replace")
+    return record
+
+
+class ResultWriter:
+    """
+    ResultWriter class is the base class of the writers a ResultSink streams records to.
+    """
+
+    def write(self, record: dict) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        raise NotImplementedError
+
+
+class JsonlWriter(ResultWriter):
+    """
+    JsonlWriter class writes one JSON object per line and flushes after each, so the file can
+    be followed while the run is in progress.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.file: IO[str] = open(self.path, "w", encoding="utf-8")
+
+    def write(self, record: dict) -> None:
+        self.file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class JUnitWriter(ResultWriter):
+    """
+    JUnitWriter class writes a JUnit XML report one testcase at a time. The totals of the
+    testsuite element are only known at the end, so its start tag is written padded with
+    spaces and rewritten in place when the writer is closed. Until then the file is a valid
+    report missing its closing tags.
+    """
+
+    # Characters reserved for each total, enough for any count and duration
+    FIELD_WIDTH = 14
+
+    def __init__(self, path: Path, suite_name: str = "routestpy") -> None:
+        self.path = Path(path)
+        self.suite_name = suite_name
+        self.file: IO[bytes] = open(self.path, "wb")
+        self.tests = 0
+        self.errors = 0
+        self.failures = 0
+        self.time = 0.0
+
+        self.file.write(b'<?xml version="1.0" encoding="UTF-8"?>\n<testsuites>\n')
+        self.suite_offset = self.file.tell()
+        self.suite_size = 0
+        self.suite_size = len(self._suite_tag()) + 4 * self.FIELD_WIDTH
+        self.file.write(self._suite_tag())
+
+    def _suite_tag(self) -> bytes:
+        tag = (
+            f"<testsuite name={quoteattr(self.suite_name)} tests=\"{self.tests}\" errors=\"{self.errors}\" "
+            f"failures=\"{self.failures}\" time=\"{self.time:.3f}\""
+        ).encode("utf-8")
+        return tag.ljust(self.suite_size - 2) + b">\n"
+
+    def write(self, record: dict) -> None:
+        self.tests += 1
+        self.time += record["elapsed"]
+        testcase = (
+            f"<testcase classname={quoteattr(record['route'] or '')} name={quoteattr(record['scenario'] or '')} "
+            f"time=\"{record['elapsed']:.6f}\""
+        )
+        if record["error"] is not None:
+            self.errors += 1
+            message = f"{record['method']} {record['url']}: {record['error']}"
+            testcase += f"><error message={quoteattr(message)}/></testcase>\n"
+        elif record.get("body") is not None:
+            testcase += f"><system-out>{escape(record['body'])}</system-out></testcase>\n"
+        else:
+            testcase += "/>\n"
+        self.file.write(testcase.encode("utf-8"))
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.write(b"</testsuite>\n</testsuites>\n")
+        self.file.seek(self.suite_offset)
+        self.file.write(self._suite_tag())
+        self.file.close()
+
+
+class ResultSink:
+    """
+    ResultSink class streams results to writers from a background thread, through a bounded
+    queue. Results are turned into small records when they are put, so the responses they
+    reference can be released right away. Every result ends up in the reports: when the writers
+    fall behind and the queue is full, put() blocks and put_async() waits in an executor thread,
+    so the runners slow down instead of losing records or letting them pile up in memory.
+    """
+
+    def __init__(self, writers: List[ResultWriter], maxsize: int = 1000, retain_bodies: bool = False) -> None:
+        """
+        Initializes ResultSink instance and starts its writer thread.
+
+        Args:
+        - writers (List[ResultWriter]): the writers every record goes to
+        - maxsize (int): the number of records queued before put() and put_async() wait
+        - retain_bodies (bool): whether records include the response body
+
+        Returns: None
+        """
+        self.writers = writers
+        self.retain_bodies = retain_bodies
+        self.queue: "queue.Queue[Any]" = queue.Queue(maxsize)
+        self.error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="routestpy-results", daemon=True)
+        self._thread.start()
+
+    def put(self, result: Any) -> None:
+        """
+        Queues a ScenarioResult for the writers, blocking while the queue is full. Use put_async()
+        on an event loop.
+
+        Args:
+        - result (Any): the ScenarioResult
+
+        Returns: None
+
+        Raises:
+        - OSError: if a writer failed
+        - ValueError: if a writer failed
+        """
+        if self.error is not None:
+            raise self.error
+        self.queue.put(result_record(result, self.retain_bodies))
+
+    async def put_async(self, result: Any) -> None:
+        """
+        Queues a ScenarioResult for the writers, waiting in an executor thread while the queue is
+        full so that the event loop keeps running.
+
+        Args:
+        - result (Any): the ScenarioResult
+
+        Returns: None
+
+        Raises:
+        - OSError: if a writer failed
+        - ValueError: if a writer failed
+        """
+        if self.error is not None:
+            raise self.error
+        record = result_record(result, self.retain_bodies)
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            await asyncio.get_running_loop().run_in_executor(None, self.queue.put, record)
+
+    def _run(self) -> None:
+        while True:
+            record = self.queue.get()
+            if record is _CLOSE:
+                return
+            if self.error is not None:
+                continue
+            try:
+                for writer in self.writers:
+                    writer.write(record)
+            except (OSError, ValueError) as e:
+                self.error = e
+
+    def close(self) -> None:
+        """
+        Writes the queued records and closes the writers.
+
+        Returns: None
+
+        Raises:
+        - OSError: the first failure of a writer, once every writer is closed
+        - ValueError: the first failure of a writer, once every writer is closed
+        """
+        self.queue.put(_CLOSE)
+        self._thread.join()
+        for writer in self.writers:
+            try:
+                writer.close()
+            except (OSError, ValueError) as e:
+                if self.error is None:
+                    self.error = e
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self) -> "ResultSink":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -0,0 +1,83 @@
+import json
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from jsonschema.exceptions import ValidationError
+
+from routestpy.core.stream_validator import ArrayStreamValidator
+from routestpy.core.stream_validator import is_streamable
+from routestpy.core.validators import get_validator_engine
+
+from .http_client import ConsumerFactory
+from .http_client import HttpResponse
+
+
+class ResponseValidationError(ValueError):
+    """Raised for a buffered response body which does not match the response_body_schema."""
+
+
+class ResponseCheck:
+    """
+    ResponseCheck class validates the body of a successful response against the
+    `response_body_schema` of a scenario. Array bodies are validated item by item while they
+    are received, so large exports are never held in memory and the transfer stops at the first
+    invalid item; other bodies are validated once received. A streamed body is not kept, so the
+    response body stays empty: streaming is turned off when the body is needed afterwards.
+
+    Attributes:
+        status (Optional[int]): The response status, known as soon as the head is received.
+    """
+
+    def __init__(self, schema: Optional[dict], stream: bool = True) -> None:
+        """
+        Initializes ResponseCheck instance.
+
+        Args:
+        - schema (Optional[dict]): the resolved response_body_schema, None to skip validation
+        - stream (bool): whether array bodies may be validated while received instead of buffered
+
+        Returns: None
+        """
+        self.schema = schema
+        self.stream = stream
+        self.status: Optional[int] = None
+        self.streamed = False
+
+    @property
+    def body_consumer(self) -> Optional[ConsumerFactory]:
+        """
+        Returns the consumer factory to pass to Transport.request, None without a schema.
+        """
+        return self._consumer if self.schema is not None and self.stream else None
+
+    def _consumer(self, status: int, headers: List[Tuple[str, str]]) -> Optional[ArrayStreamValidator]:
+        self.status = status
+        if self.schema is not None and 200 <= status < 300 and is_streamable(self.schema):
+            self.streamed = True
+            return ArrayStreamValidator(self.schema)
+        return None
+
+    def check(self, response: HttpResponse) -> None:
+        """
+        Validates a buffered response body, unless it was already validated while streamed.
+
+        Args:
+        - response (HttpResponse): the response
+
+        Returns: None
+
+        Raises:
+        - ResponseValidationError: if the body is not JSON or does not match the schema
+        """
+        if self.schema is None or self.streamed or not 200 <= response.status < 300:
+            return
+        try:
+            data = json.loads(response.body)
+        except ValueError as e:
+            raise ResponseValidationError(f"Invalid JSON: {e}") from e
+        try:
+            get_validator_engine().validate(data, self.schema)
+        except ValidationError as e:
+            path = "".join(f"[{part!r}]" for part in e.absolute_path)
+            raise ResponseValidationError(f"{path}: {e.message}" if path else e.message) from e
@@ -0,0 +1,165 @@
+import json
+from pathlib import Path
+from typing import Any
+from typing import List
+from typing import Mapping
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+from urllib.parse import quote
+from urllib.parse import urlencode
+
+from routestpy.core.dependency_graph import substitute
+from routestpy.core.scenario_spec import ScenarioSpec
+
+from .http_client import HttpRequest
+
+
+def scenario_info(scenario: Any) -> dict:
+    """
+    Returns the info of a scenario with the properties it is missing copied from its route.
+
+    Args:
+    - scenario (Any): a Scenario instance
+
+    Returns:
+    - dict: the merged info, with "method" defaulting to GET
+    """
+    info = dict(scenario.parent.route.get("info") or {})
+    info.update({key: value for key, value in (scenario.scenario.get("info") or {}).items() if value is not None})
+    info.setdefault("method", "GET")
+    return info
+
+
+def route_name(scenario: Any) -> str:
+    """
+    Returns the name of the route of a scenario, or the name of its directory if it has none.
+
+    Args:
+    - scenario (Any): a Scenario, LazyScenario or ScenarioSpec instance
+
+    Returns:
+    - str: the route name
+    """
+    if isinstance(scenario, ScenarioSpec):
+        return scenario.route
+    route = scenario.parent
+    return (route.route.get("info") or {}).get("name") or Path(route.data_path).parent.name
+
+
+def route_path(scenario: Any) -> str:
+    """
+    Returns the path of the route file of a scenario, which identifies its route even when
+    several routes share a name.
+
+    Args:
+    - scenario (Any): a Scenario, LazyScenario or ScenarioSpec instance
+
+    Returns:
+    - str: the route file path, the route name for a spec built without it
+    """
+    if isinstance(scenario, ScenarioSpec):
+        return scenario.route_path or scenario.route
+    return str(scenario.parent.data_path)
+
+
+def response_schema(scenario: Any) -> Optional[dict]:
+    """
+    Returns the response body schema of a scenario, if any.
+
+    Args:
+    - scenario (Any): a Scenario or ScenarioSpec instance
+
+    Returns:
+    - Optional[dict]: the resolved schema
+    """
+    if isinstance(scenario, ScenarioSpec):
+        return scenario.response_body_schema
+    return scenario_info(scenario).get("response_body_schema")
+
+
+def build_url(
+    base_url: str, path: str, path_variables: Sequence[Tuple[str, Any]], query_params: Sequence[Tuple[str, Any]]
+) -> str:
+    """
+    Builds the request URL from the base URL, the path template and the parameters.
+
+    Args:
+    - base_url (str): the scheme, host and optional path prefix, e.g. "http://localhost:8080/api"
+    - path (str): the path, with `{name}` placeholders for path variables
+    - path_variables (Sequence[Tuple[str, Any]]): key/value pairs substituted into path
+    - query_params (Sequence[Tuple[str, Any]]): key/value pairs appended as the query string
+
+    Returns:
+    - str: the absolute URL
+    """
+    for key, value in path_variables:
+        path = path.replace("{" + key + "}", quote(str(value), safe=""))
+    url = base_url.rstrip("/") + "/" + path.lstrip("/")
+    if query_params:
+        url += ("&" if "?" in url else "?") + urlencode(query_params)
+    return url
+
+
+def build_request(scenario: Any, base_url: str, values: Optional[Mapping[str, Any]] = None) -> HttpRequest:
+    """
+    Turns a scenario into an HTTP request.
+
+    Args:
+    - scenario (Any): a Scenario instance, already merged with its route, or a ScenarioSpec
+    - base_url (str): the scheme, host and optional path prefix of the environment
+    - values (Optional[Mapping[str, Any]]): values registered by other scenarios, replacing the
+      `{{name}}` placeholders of the parameters and body, see routestpy.core.dependency_graph
+
+    Returns:
+    - HttpRequest: the request for the scenario
+    """
+    if isinstance(scenario, ScenarioSpec):
+        method, path = scenario.method, scenario.path
+        path_variables, query_params, header_pairs = scenario.path_variables, scenario.query_params, scenario.headers
+    else:
+        info = scenario_info(scenario)
+        method, path = info["method"], info.get("path") or "/"
+        parameters = scenario.scenario.get("parameters") or {}
+        path_variables = [(entry["key"], entry["value"]) for entry in parameters.get("path_variables", ())]
+        query_params = [(entry["key"], entry["value"]) for entry in parameters.get("query_params", ())]
+        header_pairs = [(entry["key"], entry["value"]) for entry in parameters.get("headers", ())]
+    data = scenario.body
+    if values:
+        path_variables = [(key, substitute(value, values)) for key, value in path_variables]
+        query_params = [(key, substitute(value, values)) for key, value in query_params]
+        header_pairs = [(key, substitute(value, values)) for key, value in header_pairs]
+        data = substitute(data, values)
+    url = build_url(base_url, path, path_variables, query_params)
+    headers: List[Tuple[str, str]] = [(key, str(value)) for key, value in header_pairs]
+
+    body = b""
+    if data is not None:
+        if isinstance(data, bytes):
+            body = data
+        else:
+            body = json.dumps(data).encode("utf-8")
+            if not any(name.lower() == "content-type" for name, _ in headers):
+                headers.append(("Content-Type", "application/json"))
+
+    return HttpRequest(method, url, headers, body)
+
+
+def base_url(app: Any) -> str:
+    """
+    Returns the base URL of the environment the application was configured for, taken from the
+    `base_url` or `host` key of the environment config file.
+
+    Args:
+    - app (Any): an Application instance
+
+    Returns:
+    - str: the base URL
+
+    Raises:
+    - ValueError: if the config defines neither key
+    """
+    url = getattr(app.config, "base_url", None) or getattr(app.config, "host", None)
+    if not url:
+        raise ValueError(f"The {app.environment} environment config defines neither base_url nor host")
+    return str(url)
@@ -0,0 +1,211 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+
+import pytest
+import yaml
+
+PARAMETERS = {"headers": [], "path_variables": [], "query_params": []}
+
+CHUNKS = [b'{"chunked":', b' true, "parts": ', b"[1, 2, 3]}"]
+
+
+def hook(hook_type: str, func: str) -> dict:
+    return {"hook_type": hook_type, "func": func}
+
+
+def scenario(name: str, path: str = "/", method: str = "GET", hooks: Iterable[dict] = (), **meta) -> dict:
+    """Returns the data of a scenario file, meta keys such as tags or produces given as keywords."""
+    return {
+        "scenario": {
+            "info": {"name": name, "path": path, "method": method},
+            "meta": meta,
+            "parameters": PARAMETERS,
+            "hooks": list(hooks),
+        }
+    }
+
+
+def write_yaml(path: Path, data: dict) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(yaml.safe_dump(data, sort_keys=False))
+    return path
+
+
+def write_project(
+    root: Path,
+    routes: Dict[str, List[dict]],
+    app_hooks: Iterable[dict] = (),
+    route_hooks: Optional[Dict[str, List[dict]]] = None,
+    host: str = "http://127.0.0.1:1",
+) -> Path:
+    """
+    Writes a project with one directory per route, its scenarios named after their info name.
+
+    Args:
+    - root (Path): the project directory
+    - routes (Dict[str, List[dict]]): the scenarios of each route, by route name, see scenario()
+    - app_hooks (Iterable[dict]): the hooks of the app
+    - route_hooks (Optional[Dict[str, List[dict]]]): the hooks of each route, by route name
+    - host (str): the host of the prod environment
+
+    Returns:
+    - Path: root
+    """
+    write_yaml(
+        root / "app" / "app.yaml",
+        {
+            "app": {
+                "name": "tests",
+                "environments": ["prod"],
+                "priorities": ["P0"],
+                "automation_status_list": ["automated"],
+                "tags": ["api"],
+                "requirements": {"REQ_1": {"summary": "Tests", "priority": "P0"}},
+                "parameters": PARAMETERS,
+                "meta": {"tags": ["api"]},
+                "hooks": list(app_hooks),
+            }
+        },
+    )
+    write_yaml(root / "config" / "prod.yaml", {"host": host})
+    for route_name, scenarios in routes.items():
+        route_dir = root / "routes" / f"{route_name}_route"
+        for data in scenarios:
+            write_yaml(route_dir / "scenarios" / f"{data['scenario']['info']['name']}.yaml", data)
+        write_yaml(
+            route_dir / "route.yaml",
+            {
+                "route": {
+                    "info": {"name": route_name, "description": route_name, "path": f"/{route_name}", "method": "GET"},
+                    "meta": {"tags": [route_name]},
+                    "parameters": PARAMETERS,
+                    "hooks": list((route_hooks or {}).get(route_name, [])),
+                    "scenarios": [f"./scenarios/{data['scenario']['info']['name']}.yaml" for data in scenarios],
+                }
+            },
+        )
+    return root
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """Returns write_project writing into a temporary directory, made the working directory for the config."""
+    root = tmp_path / "project"
+    root.mkdir()
+    monkeypatch.chdir(root)
+
+    def make(routes: Dict[str, List[dict]], **kwargs) -> Path:
+        return write_project(root, routes, **kwargs)
+
+    return make
+
+
+class LoopbackHandler(BaseHTTPRequestHandler):
+    """
+    Answers by path:
+    - /chunked: a JSON body in several chunks
+    - /empty: 204 without body
+    - /slow/<ms>: a JSON body after ms milliseconds
+    - /items/<n>: a JSON array of n objects
+    - /close: a JSON body, then the connection is closed
+    - anything else: a JSON echo of the method, path, headers and body, with a Content-Length
+    """
+
+    protocol_version = "HTTP/1.1"
+    # Buffered, so that headers and body leave in one segment instead of waiting for a delayed ACK
+    wbufsize = 65536
+    server: "LoopbackServer"
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        self.respond()
+
+    do_HEAD = do_POST = do_PUT = do_PATCH = do_DELETE = do_GET
+
+    def respond(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        self.server.requests.append((self.command, self.path, dict(self.headers), body))
+        path = self.path.split("?")[0]
+
+        if path == "/empty":
+            self.send_response(204)
+            self.end_headers()
+        elif path == "/chunked":
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            if self.command != "HEAD":
+                for chunk in CHUNKS:
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                self.wfile.write(b"0\r\n\r\n")
+        elif path.startswith("/slow/"):
+            with self.server.lock:
+                self.server.in_flight += 1
+                self.server.max_in_flight = max(self.server.max_in_flight, self.server.in_flight)
+            time.sleep(int(path.split("/")[2]) / 1000)
+            with self.server.lock:
+                self.server.in_flight -= 1
+            self.send_json({"slow": True})
+        elif path.startswith("/items/"):
+            self.send_json([{"id": i, "name": f"item {i}"} for i in range(int(path.split("/")[2]))])
+        elif path == "/close":
+            self.close_connection = True
+            self.send_json({"closed": True}, [("Connection", "close")])
+        else:
+            echo = {"method": self.command, "path": self.path, "body": body.decode() or None}
+            self.send_json({"id": 7, "data": {"access_token": "secret"}, "echo": echo})
+
+    def send_json(self, data, headers=()) -> None:
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+
+class LoopbackServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), LoopbackHandler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests: List[tuple] = []
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+@pytest.fixture
+def http_server():
+    """Returns a LoopbackServer serving on a free loopback port in a background thread."""
+    server = LoopbackServer()
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,109 @@
+import asyncio
+
+from routestpy.core.scenario_spec import ScenarioSpec
+from routestpy.runner.async_runner import AsyncRunner
+from routestpy.runner.async_runner import RunSummary
+from routestpy.runner.http_client import Transport
+from routestpy.runner.metrics import MetricsRegistry
+
+
+def spec(name, path, method="GET", **kwargs):
+    return ScenarioSpec(name=name, route="tests", method=method, path=path, **kwargs)
+
+
+def test_parallel_count_requests_are_in_flight(http_server):
+    scenarios = [spec(f"slow_{i}", "/slow/50") for i in range(12)]
+    summary = AsyncRunner(http_server.url, parallel_count=3).run(scenarios)
+
+    assert http_server.max_in_flight == 3
+    assert (summary.count, summary.errors) == (12, 0)
+    assert summary.status_counts() == {200: 12}
+    # 12 requests of 50ms, 3 at a time
+    assert summary.duration >= 0.2
+    assert summary.connections["opened"] == 3
+    assert summary.connections["reused"] == 9
+
+
+def test_results_keep_the_scenario_order_and_timings(http_server):
+    scenarios = [spec("slow", "/slow/80"), spec("fast", "/"), spec("empty", "/empty"), spec("head", "/", "HEAD")]
+    summary = AsyncRunner(http_server.url, parallel_count=4).run(scenarios)
+
+    assert [r.name for r in summary.results] == ["slow", "fast", "empty", "head"]
+    assert [r.status for r in summary.results] == [200, 200, 204, 200]
+    slow, fast = summary.results[:2]
+    assert slow.elapsed >= 0.08
+    assert fast.elapsed < slow.elapsed
+    assert fast.url == http_server.url + "/"
+    assert all(r.ok for r in summary.results)
+    # Bodies are dropped once seen, unless retain_bodies is set
+    assert all(r.response.body == b"" for r in summary.results)
+
+
+def test_request_parameters_and_body(http_server):
+    scenario = spec(
+        "create",
+        "/users/{user_id}",
+        "POST",
+        headers=[("X-Trace", "1")],
+        path_variables=[("user_id", "a b")],
+        query_params=[("page", 2)],
+        body={"name": "x"},
+    )
+    summary = AsyncRunner(http_server.url, parallel_count=1, retain_bodies=True).run([scenario])
+    method, path, headers, body = http_server.requests[0]
+    assert (method, path, body) == ("POST", "/users/a%20b?page=2", b'{"name": "x"}')
+    assert headers["X-Trace"] == "1"
+    assert headers["Content-Type"] == "application/json"
+    assert summary.results[0].response.body
+
+
+def test_timeouts_and_connection_errors_are_recorded(http_server):
+    summary = AsyncRunner(http_server.url, parallel_count=2, timeout=0.05).run([spec("slow", "/slow/300")])
+    assert summary.errors == 1
+    assert summary.results[0].error == "Timed out after 0.05s"
+    assert summary.results[0].status is None
+
+    summary = AsyncRunner("http://127.0.0.1:1", parallel_count=1).run([spec("refused", "/")])
+    assert summary.results[0].error.startswith("HttpError: Cannot connect")
+
+
+def test_on_result_metrics_and_shared_transport(http_server):
+    seen = []
+    metrics = MetricsRegistry()
+    transport = Transport(max_connections_per_host=1)
+    runner = AsyncRunner(
+        http_server.url,
+        parallel_count=2,
+        transport=transport,
+        metrics=metrics,
+        on_result=seen.append,
+        keep_results=False,
+    )
+
+    async def run_twice():
+        try:
+            return [await runner.run_async([spec(f"s{i}", "/") for i in range(3)]) for _ in range(2)]
+        finally:
+            await transport.close()
+
+    first, second = asyncio.run(run_twice())
+    assert isinstance(first, RunSummary)
+    assert (first.count, second.count, first.results) == (3, 3, [])
+    assert len(seen) == 6
+    # The transport given to the runner is not closed between runs
+    assert http_server.connections == 1
+    assert metrics.total_latency().to_dict()["count"] == 6
+    assert all(series["value"] == 0 for series in metrics.to_dict()["in_flight"])
+
+
+def test_awaitable_on_result_is_awaited(http_server):
+    seen = []
+
+    async def on_result(result):
+        await asyncio.sleep(0.01)
+        seen.append(result.name)
+
+    runner = AsyncRunner(http_server.url, parallel_count=2, on_result=on_result)
+    summary = runner.run([spec(f"s{i}", "/") for i in range(4)])
+    assert summary.count == 4
+    assert sorted(seen) == ["s0", "s1", "s2", "s3"]
@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+from routestpy.core.schema import BaseBodySchema
+from routestpy.runner.http_client import HttpResponse
+
+
+@pytest.fixture
+def user_schema(tmp_path):
+    path = tmp_path / "user.yaml"
+    path.write_text(
+        "type: object\n"
+        "required: [id]\n"
+        "properties:\n"
+        "  id:\n"
+        "    type: integer\n"
+        "  name:\n"
+        "    type: string\n"
+    )
+    return BaseBodySchema(path)
+
+
+def test_validate_many(user_schema):
+    result = user_schema.validate_many([{"id": 1}, {"id": "x"}, {}, {"id": 2, "name": "a"}])
+    assert (result.count, result.valid) == (4, False)
+    assert [position for position, _ in result.errors] == [1, 2]
+    assert result.errors[0][1] == "id: 'x' is not of type 'integer'"
+
+
+def test_validate_jsonl(user_schema, tmp_path):
+    path = tmp_path / "bodies.jsonl"
+    path.write_text('{"id": 1}\n{"id": 2}\nnot json\n')
+    result = user_schema.validate_jsonl(path)
+    assert result.count == 3
+    assert [position for position, _ in result.errors] == [2]
+
+
+def test_validate_responses(user_schema):
+    def response(data):
+        return HttpResponse(200, "OK", [], json.dumps(data).encode())
+
+    result = user_schema.validate_responses([response({"id": 1}), None, response({"name": 1})])
+    assert result.count == 3
+    assert result.errors[0] == (1, "Invalid body: no response")
+    assert result.errors[1][0] == 2
+
+
+def test_instances_share_the_compiled_validator(user_schema):
+    other = BaseBodySchema(user_schema.schema_path)
+    assert other.schema is user_schema.schema
+    assert other.validator is user_schema.validator
@@ -0,0 +1,17 @@
+from click.testing import CliRunner
+
+from routestpy.cli import cli
+
+from .conftest import scenario
+
+
+def test_run_exits_with_an_error_status_when_scenarios_fail(project, http_server):
+    project({"users": [scenario("get", "/empty")]}, host=http_server.url)
+    result = CliRunner().invoke(cli, ["run", "-e", "prod", "-p", "2"])
+    assert result.exit_code == 0, result.output
+    assert "0 errors" in result.output
+
+    project({"users": [scenario("get", "/empty"), scenario("slow", "/slow/1000")]}, host=http_server.url)
+    result = CliRunner().invoke(cli, ["run", "-e", "prod", "-p", "2", "--timeout", "0.1"])
+    assert result.exit_code == 1
+    assert "ERROR slow" in result.output and "1 errors" in result.output
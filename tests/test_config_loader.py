@@ -0,0 +1,86 @@
+import os
+
+import pytest
+
+from routestpy.core.config import Config
+from routestpy.core.config import environment_layer
+from routestpy.core.config import merge_layers
+from routestpy.loaders.config_loader import ConfigLoader
+from routestpy.loaders.config_loader import config_cache
+
+from .conftest import write_yaml
+
+
+@pytest.fixture
+def config_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for name in list(os.environ):
+        if name.startswith("ROUTESTPY_CONFIG_"):
+            monkeypatch.delenv(name)
+    config_cache.clear()
+    yield tmp_path / "config"
+    config_cache.clear()
+
+
+def touch_later(path) -> None:
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_layers_override_each_other(config_dir, monkeypatch):
+    write_yaml(config_dir / "base.yaml", {"host": "http://base", "db": {"host": "db", "port": 5432}, "tags": [1]})
+    write_yaml(config_dir / "prod.yaml", {"host": "http://prod", "db": {"port": 6432}})
+    monkeypatch.setenv("ROUTESTPY_CONFIG_DB__USER", "admin")
+    monkeypatch.setenv("ROUTESTPY_CONFIG_RETRIES", "3")
+
+    config = ConfigLoader("prod").load()
+    assert config.host == "http://prod"
+    assert config.db.to_dict() == {"host": "db", "port": 6432, "user": "admin"}
+    assert config["retries"] == 3
+    assert config.tags == (1,)
+    with pytest.raises(AttributeError):
+        config.host = "x"
+
+    # The base environment is layered over nothing but itself
+    assert ConfigLoader("base").load().host == "http://base"
+
+
+def test_merge_and_environment_layers_do_not_modify_their_input():
+    base = {"db": {"host": "db"}}
+    merged = merge_layers(base, {"db": {"port": 1}})
+    assert merged == {"db": {"host": "db", "port": 1}}
+    assert base == {"db": {"host": "db"}}
+    environ = {"ROUTESTPY_CONFIG_A__B": "true", "ROUTESTPY_CONFIG_C": "[x", "OTHER": "1"}
+    assert environment_layer(environ) == {"a": {"b": True}, "c": "[x"}
+
+
+def test_missing_and_ambiguous_environment_files(config_dir):
+    write_yaml(config_dir / "prod.yaml", {"host": "http://prod"})
+    with pytest.raises(Exception, match="staging"):
+        ConfigLoader("staging").load()
+    (config_dir / "prod.json").write_text('{"host": "http://json"}')
+    with pytest.raises(Exception, match="Invalid number of config files"):
+        ConfigLoader("prod").load()
+
+
+def test_configs_are_shared_until_a_file_changes(config_dir):
+    path = write_yaml(config_dir / "prod.yaml", {"host": "http://one"})
+    first = ConfigLoader("prod").load()
+    assert ConfigLoader("prod").load() is first
+    assert (config_cache.hits, config_cache.misses) == (1, 1)
+
+    for host in ("http://two", "http://three"):
+        write_yaml(path, {"host": host})
+        touch_later(path)
+        assert ConfigLoader("prod").load().host == host
+    # Only the latest config of the file is kept
+    assert len(config_cache._configs) == 1
+    assert isinstance(next(iter(config_cache._configs.values()))[1], Config)
+
+
+def test_convert_dict_to_namespace_returns_configs():
+    data = {"db": {"port": 1}}
+    converted = ConfigLoader("prod").convert_dict_to_namespace([data, 2])
+    assert converted[0].db.port == 1
+    assert converted[1] == 2
+    assert data == {"db": {"port": 1}}
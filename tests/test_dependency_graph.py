@@ -0,0 +1,106 @@
+import pytest
+import yaml
+
+from routestpy.core.application import Application
+from routestpy.core.dependency_graph import DependencyError
+from routestpy.core.dependency_graph import ScenarioGraph
+from routestpy.core.dependency_graph import extract_value
+from routestpy.core.dependency_graph import produced_values
+from routestpy.core.dependency_graph import substitute
+
+from .conftest import scenario
+from .conftest import write_yaml
+from .test_async_runner import spec
+
+BODY = {"id": 7, "data": {"items": [{"id": 1}, {"id": 2}]}}
+
+
+def materialize(root):
+    # Scenario files are validated when they are materialized
+    app = Application(root, snapshot=False)
+    app.collect_scenarios()
+    return app.materialize(app.scenario_collection)
+
+
+def names(graph, nodes):
+    return [graph.scenarios[node].get_name() for node in nodes]
+
+
+@pytest.mark.parametrize(
+    "path, value",
+    [("id", 7), ("$.id", 7), ("data.items.1.id", 2), ("$.data.items.-1.id", 2), ("$", BODY)],
+)
+def test_extract_value(path, value):
+    assert extract_value(BODY, path) == value
+
+
+@pytest.mark.parametrize("path", ["$id", "missing", "data.items.2", "id.x", "$.$"])
+def test_extract_missing_value(path):
+    with pytest.raises(KeyError):
+        extract_value(BODY, path)
+
+
+def test_produced_values_and_substitution():
+    producer = spec("login", "/", meta={"produces": ["token = $.data.access_token", "id"]})
+    assert produced_values(producer) == [("token", "$.data.access_token"), ("id", "id")]
+    values = {"token": "secret", "id": 7}
+    assert substitute({"auth": "Bearer {{token}}", "ids": ["{{ id }}", "{{other}}"]}, values) == {
+        "auth": "Bearer secret",
+        "ids": [7, "{{other}}"],
+    }
+
+
+def test_producers_run_before_their_consumers():
+    scenarios = [
+        spec("order", "/", meta={"consumes": ["token", "user"]}),
+        spec("user", "/", meta={"consumes": ["token"], "produces": ["user=$.id"]}),
+        spec("login", "/", meta={"produces": ["token"]}),
+        spec("health", "/"),
+    ]
+    graph = ScenarioGraph(scenarios)
+    assert graph.has_dependencies
+    assert names(graph, graph.order) == ["login", "health", "user", "order"]
+    assert names(graph, graph.dependencies[0]) == ["login", "user"]
+
+    # Producers of a selection are added from the available scenarios
+    graph = ScenarioGraph(scenarios[:1], available=scenarios)
+    assert [s.get_name() for s in graph.scenarios] == ["order", "user", "login"]
+
+
+@pytest.mark.parametrize(
+    "metas, message",
+    [
+        ([{"consumes": ["token"]}], "which no scenario produces"),
+        ([{"produces": ["token"]}, {"produces": ["token=$.id"]}], "is produced by both"),
+        ([{"produces": ["a"], "consumes": ["b"]}, {"produces": ["b"], "consumes": ["a"]}], "contain a cycle"),
+        ([{"produces": ["a"], "consumes": ["a"]}], "produces itself"),
+    ],
+)
+def test_unsatisfiable_dependencies(metas, message):
+    with pytest.raises(DependencyError, match=message):
+        ScenarioGraph([spec(f"s{i}", "/", meta=meta) for i, meta in enumerate(metas)])
+
+
+@pytest.mark.parametrize("produces", ["token=$.data.access_token", "token=$", "token=data.0.id", "token"])
+def test_meta_schema_accepts_produces_paths(project, produces):
+    root = project({"users": [scenario("login", produces=[produces])]})
+    assert produced_values(materialize(root)[0])[0][0] == "token"
+
+
+@pytest.mark.parametrize("produces", ["token=$id", "token=", "token=data..id", "token=.id", "token=$."])
+def test_meta_schema_rejects_invalid_produces_paths(project, produces):
+    root = project({"users": [scenario("login", produces=[produces])]})
+    with pytest.raises(ValueError, match="does not match"):
+        materialize(root)
+
+
+@pytest.mark.parametrize("level", ["app", "route"])
+def test_dependencies_are_only_declared_by_scenarios(project, level):
+    root = project({"users": [scenario("get"), scenario("list")]})
+    path = root / "app" / "app.yaml" if level == "app" else root / "routes" / "users_route" / "route.yaml"
+    data = yaml.safe_load(path.read_text())
+    data[level]["meta"]["produces"] = ["token"]
+    write_yaml(path, data)
+
+    with pytest.raises(DependencyError, match="only be declared in scenario meta"):
+        materialize(root)
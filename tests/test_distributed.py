@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from routestpy.core.application import Application
+from routestpy.runner.async_runner import AsyncRunner
+from routestpy.runner.distributed import Coordinator
+from routestpy.runner.distributed import Worker
+from routestpy.runner.distributed import parse_address
+from routestpy.runner.distributed import project_fingerprint
+from routestpy.runner.distributed import receive
+from routestpy.runner.distributed import send
+
+from .conftest import scenario
+
+
+def make_coordinator(root, batch_size=2):
+    app = Application(root, environment="prod")
+    app.collect_scenarios()
+    ids = range(len(app.scenario_collection))
+    fingerprint = project_fingerprint(root, app.scenario_collection)
+    return Coordinator(ids, "prod", fingerprint, "127.0.0.1:0", batch_size, worker_timeout=10.0)
+
+
+async def listening(coordinator, task):
+    while not coordinator.port:
+        assert not task.done()
+        await asyncio.sleep(0.01)
+    return f"127.0.0.1:{coordinator.port}"
+
+
+def test_address_defaults_to_the_loopback_interface():
+    assert parse_address(":9000") == ("127.0.0.1", 9000)
+    assert parse_address("0.0.0.0:9000") == ("0.0.0.0", 9000)
+    assert parse_address("[::1]:9000") == ("::1", 9000)
+    with pytest.raises(ValueError):
+        parse_address("localhost")
+
+
+def test_two_workers_share_the_scenarios(project, http_server):
+    root = project({"users": [scenario(f"get_{i}", "/slow/20") for i in range(10)]}, host=http_server.url)
+    coordinator = make_coordinator(root)
+
+    async def run():
+        task = asyncio.ensure_future(coordinator.run_async())
+        address = await listening(coordinator, task)
+        workers = [Worker(address, root, 2, name=f"w{i}").run_async() for i in range(2)]
+        ran = await asyncio.gather(*workers)
+        return ran, await task
+
+    ran, summary = asyncio.run(run())
+    assert sum(ran) == 10
+    assert all(ran)
+    assert [r.name for r in summary.results] == [f"get_{i}" for i in range(10)]
+    assert summary.status_counts() == {200: 10}
+    assert summary.connections["opened"] == 4
+
+
+def test_the_batches_of_a_killed_worker_are_reassigned(project, http_server, capsys):
+    root = project({"users": [scenario(f"get_{i}") for i in range(10)]}, host=http_server.url)
+    coordinator = make_coordinator(root)
+
+    async def run():
+        task = asyncio.ensure_future(coordinator.run_async())
+        address = await listening(coordinator, task)
+
+        # A worker which takes its batches and dies before running them
+        reader, writer = await asyncio.open_connection(*parse_address(address))
+        await receive(reader)
+        await send(writer, {"type": "ready", "worker": "doomed"})
+        taken = (await receive(reader))["ids"] + (await receive(reader))["ids"]
+        writer.close()
+
+        ran = await Worker(address, root, 2, name="survivor").run_async()
+        return taken, ran, await task
+
+    taken, ran, summary = asyncio.run(run())
+    assert taken == [0, 1, 2, 3]
+    assert ran == 10
+    assert summary.count == 10
+    assert summary.status_counts() == {200: 10}
+    assert "Reassigning 4 scenarios of worker doomed" in capsys.readouterr().out
+    assert len(http_server.requests) == 10
+
+
+def test_a_failing_worker_reports_instead_of_hanging(project, http_server, monkeypatch):
+    root = project({"users": [scenario(f"get_{i}") for i in range(4)]}, host=http_server.url)
+    coordinator = make_coordinator(root)
+
+    async def fail(self, transport, scenario):
+        raise RuntimeError("broken scenario")
+
+    async def run():
+        task = asyncio.ensure_future(coordinator.run_async())
+        address = await listening(coordinator, task)
+        monkeypatch.setattr(AsyncRunner, "run_scenario", fail)
+        try:
+            with pytest.raises(RuntimeError, match="broken scenario"):
+                await asyncio.wait_for(Worker(address, root, 2).run_async(), 5.0)
+            # The coordinator got the ids back for the next worker
+            await asyncio.sleep(0.05)
+            assert sorted(coordinator.pending) == [0, 1, 2, 3]
+        finally:
+            task.cancel()
+
+    asyncio.run(run())
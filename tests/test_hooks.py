@@ -0,0 +1,102 @@
+import os
+
+import pytest
+import yaml
+from click.testing import CliRunner
+
+from routestpy.cli import cli
+from routestpy.core.application import Application
+from routestpy.runner.async_runner import AsyncRunner
+from routestpy.runner.hooks import HookEngine
+from routestpy.runner.hooks import HookRun
+
+from .conftest import hook
+from .conftest import scenario
+from .conftest import write_yaml
+
+CALLS = []
+
+
+def record_app(app) -> None:
+    CALLS.append(("app", None))
+
+
+def record_route(route) -> None:
+    CALLS.append(("route", os.path.basename(os.path.dirname(route.data_path))))
+
+
+def record_extra(route) -> None:
+    CALLS.append(("extra", os.path.basename(os.path.dirname(route.data_path))))
+
+
+def record_after_route(route) -> None:
+    CALLS.append(("after", os.path.basename(os.path.dirname(route.data_path))))
+
+
+@pytest.fixture(autouse=True)
+def calls():
+    CALLS.clear()
+    yield CALLS
+    CALLS.clear()
+
+
+def load(root):
+    app = Application(root, snapshot=False)
+    app.collect_scenarios()
+    return app.materialize(app.scenario_collection)
+
+
+def rename_route(root, directory: str, name: str) -> None:
+    route_yaml = root / "routes" / directory / "route.yaml"
+    data = yaml.safe_load(route_yaml.read_text())
+    data["route"]["info"]["name"] = name
+    write_yaml(route_yaml, data)
+
+
+def test_routes_with_the_same_name_keep_their_own_hooks(project, http_server):
+    root = project(
+        {"users": [scenario("get"), scenario("list")], "admins": [scenario("get_admin")]},
+        app_hooks=[hook("before_app", f"{__name__}:record_app")],
+        route_hooks={
+            "users": [hook("before_route", f"{__name__}:record_route")],
+            "admins": [hook("before_route", f"{__name__}:record_extra")],
+        },
+        host=http_server.url,
+    )
+    rename_route(root, "admins_route", "users")
+    scenarios = load(root)
+
+    hook_run = HookRun(HookEngine(), scenarios)
+    assert len(hook_run.route_hooks) == 2
+    summary = AsyncRunner(http_server.url, parallel_count=3, hooks=HookEngine()).run(scenarios)
+
+    assert summary.errors == 0
+    assert sorted(CALLS) == [("app", None), ("extra", "admins_route"), ("route", "users_route")]
+
+
+def test_route_hooks_are_merged_from_every_scenario(project, http_server):
+    root = project(
+        {
+            "users": [
+                scenario("get"),
+                scenario("list", hooks=[hook("before_route", f"{__name__}:record_extra")]),
+                scenario("delete", hooks=[hook("after_route", f"{__name__}:record_after_route")]),
+            ]
+        },
+        route_hooks={"users": [hook("before_route", f"{__name__}:record_route")]},
+        host=http_server.url,
+    )
+    summary = AsyncRunner(http_server.url, parallel_count=1, hooks=HookEngine()).run(load(root))
+
+    assert summary.errors == 0
+    assert CALLS == [("route", "users_route"), ("extra", "users_route"), ("after", "users_route")]
+
+
+@pytest.mark.parametrize("options", [["-w", "2"], ["-c", "127.0.0.1:0"]])
+def test_hooks_are_refused_outside_one_process(project, options):
+    project({"users": [scenario("get")]}, route_hooks={"users": [hook("before_route", f"{__name__}:record_route")]})
+    result = CliRunner().invoke(cli, ["run", "-e", "prod", "-p", "2", *options])
+
+    assert result.exit_code == 2
+    assert "--skip-hooks" in result.output
+    assert CALLS == []
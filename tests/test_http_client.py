@@ -0,0 +1,187 @@
+import asyncio
+import json
+
+import pytest
+
+from routestpy.runner.http_client import BodyConsumer
+from routestpy.runner.http_client import HttpError
+from routestpy.runner.http_client import HttpRequest
+from routestpy.runner.http_client import Transport
+
+from .conftest import CHUNKS
+
+
+def send(transport, *requests):
+    async def run():
+        try:
+            return [await transport.request(request) for request in requests]
+        finally:
+            await transport.close()
+
+    return asyncio.run(run())
+
+
+def test_content_length_body(http_server):
+    [response] = send(Transport(), HttpRequest("POST", http_server.url + "/users?x=1", [("X-A", "b")], b'{"a": 1}'))
+    assert response.status == 200
+    assert response.header("content-type") == "application/json"
+    assert json.loads(response.body)["echo"] == {"method": "POST", "path": "/users?x=1", "body": '{"a": 1}'}
+    method, path, headers, body = http_server.requests[0]
+    assert headers["X-A"] == "b"
+    assert headers["Content-Length"] == "8"
+
+
+def test_chunked_body(http_server):
+    [response] = send(Transport(), HttpRequest("GET", http_server.url + "/chunked"))
+    assert response.body == b"".join(CHUNKS)
+    assert json.loads(response.body) == {"chunked": True, "parts": [1, 2, 3]}
+
+
+def test_head_and_204_responses_have_no_body_and_keep_the_connection(http_server):
+    transport = Transport(max_connections_per_host=1)
+    head, empty, after = send(
+        transport,
+        HttpRequest("HEAD", http_server.url + "/chunked"),
+        HttpRequest("GET", http_server.url + "/empty"),
+        HttpRequest("GET", http_server.url + "/"),
+    )
+    assert (head.status, head.body) == (200, b"")
+    assert (empty.status, empty.body) == (204, b"")
+    assert json.loads(after.body)["id"] == 7
+    assert http_server.connections == 1
+
+
+def test_keep_alive_connections_are_reused(http_server):
+    transport = Transport(max_connections_per_host=2)
+    responses = send(transport, *(HttpRequest("GET", http_server.url + f"/{i}") for i in range(10)))
+    assert [json.loads(r.body)["echo"]["path"] for r in responses] == [f"/{i}" for i in range(10)]
+    stats = transport.total_stats()
+    assert (stats["opened"], stats["reused"], stats["requests"]) == (1, 9, 10)
+    assert http_server.connections == 1
+
+
+def test_closed_connections_are_not_reused(http_server):
+    transport = Transport()
+    send(transport, HttpRequest("GET", http_server.url + "/close"), HttpRequest("GET", http_server.url + "/"))
+    assert transport.total_stats()["opened"] == 2
+    assert http_server.connections == 2
+
+
+def test_pool_limits_the_connections_per_host(http_server):
+    transport = Transport(max_connections_per_host=2)
+
+    async def run():
+        requests = [transport.request(HttpRequest("GET", http_server.url + "/slow/50")) for _ in range(6)]
+        try:
+            return await asyncio.gather(*requests)
+        finally:
+            await transport.close()
+
+    assert [r.status for r in asyncio.run(run())] == [200] * 6
+    assert http_server.max_in_flight == 2
+    stats = transport.total_stats()
+    assert stats["opened"] == 2
+    assert stats["waited"] > 0
+
+
+def test_body_consumer_receives_the_body(http_server):
+    class Collect(BodyConsumer):
+        def __init__(self):
+            self.chunks = []
+
+        def feed(self, chunk):
+            self.chunks.append(chunk)
+
+        def close(self):
+            pass
+
+    consumer = Collect()
+
+    async def run():
+        transport = Transport()
+        try:
+            return await transport.request(HttpRequest("GET", http_server.url + "/chunked"), lambda *_: consumer)
+        finally:
+            await transport.close()
+
+    response = asyncio.run(run())
+    assert response.body == b""
+    assert b"".join(consumer.chunks) == b"".join(CHUNKS)
+
+
+def test_connection_errors(http_server):
+    port = http_server.server_address[1]
+    http_server.shutdown()
+    http_server.server_close()
+    with pytest.raises(HttpError):
+        send(Transport(), HttpRequest("GET", f"http://127.0.0.1:{port}/"))
+
+
+def test_invalid_urls():
+    with pytest.raises(ValueError):
+        HttpRequest("GET", "ftp://example.com/")
+
+
+def send_to_dropping_server(transport, *batches):
+    """
+    Sends batches of requests, the requests of a batch in parallel, to a server which answers the
+    first request of every connection and drops the connection on the next one without answering.
+
+    Returns the responses or errors of the last batch and the requests the server received.
+    """
+    received = []
+
+    async def handle(reader, writer):
+        answered = False
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            received.append(line.split()[0].decode())
+            while (await reader.readline()) not in (b"\r\n", b""):
+                pass
+            if answered:
+                break
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+            await writer.drain()
+            answered = True
+        writer.close()
+
+    async def run():
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/"
+        try:
+            for batch in batches:
+                results = await asyncio.gather(
+                    *(transport.request(HttpRequest(method, url)) for method in batch), return_exceptions=True
+                )
+            return results
+        finally:
+            await transport.close()
+            server.close()
+            await server.wait_closed()
+
+    return asyncio.run(run()), received
+
+
+def test_only_idempotent_requests_are_retried_on_a_dropped_connection():
+    transport = Transport(max_connections_per_host=1)
+    [response], received = send_to_dropping_server(transport, ["GET"], ["GET"])
+    assert response.body == b"ok"
+    assert received == ["GET"] * 3
+    assert transport.total_stats()["retried"] == 1
+
+    transport = Transport(max_connections_per_host=1)
+    [error], received = send_to_dropping_server(transport, ["GET"], ["POST"])
+    assert isinstance(error, HttpError)
+    # The server may have processed the POST, it is not sent again
+    assert received == ["GET", "POST"]
+    assert transport.total_stats()["retried"] == 0
+
+
+def test_retries_are_bounded():
+    transport = Transport(max_connections_per_host=3)
+    [error], received = send_to_dropping_server(transport, ["GET"] * 3, ["GET"])
+    assert isinstance(error, HttpError)
+    assert transport.total_stats()["retried"] == 2
+    assert len(received) == 6
@@ -0,0 +1,26 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import routestpy
+
+SOURCE = os.path.dirname(routestpy.__path__[0])
+
+
+def loaded_modules(module: str) -> set:
+    code = f"import sys; import {module}; print(' '.join(sys.modules))"
+    env = dict(os.environ, PYTHONPATH=SOURCE)
+    output = subprocess.run([sys.executable, "-c", code], check=True, stdout=subprocess.PIPE, env=env).stdout
+    return set(output.decode().split())
+
+
+@pytest.mark.parametrize(
+    "module",
+    ["routestpy.core.application", "routestpy.core.route", "routestpy.core.scenario", "routestpy.core.schema"],
+)
+def test_core_does_not_import_the_runner(module):
+    modules = loaded_modules(module)
+    assert not {name for name in modules if name.startswith("routestpy.runner")}
+    assert "asyncio" not in modules
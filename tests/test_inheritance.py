@@ -0,0 +1,82 @@
+import pytest
+
+from routestpy.core.application import Application
+from routestpy.core.inheritance import EntryList
+from routestpy.core.inheritance import Layer
+from routestpy.core.inheritance import freeze
+from routestpy.core.inheritance import hook_layer
+from routestpy.core.inheritance import merge_items
+from routestpy.core.inheritance import meta_layer
+from routestpy.core.inheritance import parameter_layers
+
+from .conftest import hook
+from .conftest import scenario
+
+
+def header(key: str, value: str) -> dict:
+    return {"key": key, "value": value}
+
+
+def test_layers_override_their_parent_in_order():
+    parent = Layer({"a": 1, "b": 2, "c": 3})
+    layer = Layer({"d": 4, "b": 5}, parent)
+
+    assert list(layer) == ["d", "b", "a", "c"]
+    assert dict(layer) == {"d": 4, "b": 5, "a": 1, "c": 3}
+    assert len(layer) == 4
+    assert "c" in layer and "e" not in layer
+    with pytest.raises(KeyError):
+        layer["e"]
+
+
+def test_meta_lists_get_the_missing_parent_items_appended():
+    app = meta_layer({"tags": ["api", "v1"], "owner": "core"})
+    route = meta_layer({"tags": ["users", "api"], "owner": "users"}, app)
+
+    assert route["tags"] == ("users", "api", "v1")
+    assert route["owner"] == "users"
+    assert meta_layer({}, route) is route
+    # Unhashable items are merged by equality
+    assert merge_items([{"a": 1}], [{"a": 1}, {"b": 2}]) == ({"a": 1}, {"b": 2})
+
+
+def test_parameters_are_keyed_and_shared_when_not_overridden():
+    app = parameter_layers({"headers": [header("Accept", "json"), header("X-App", "1")]})
+    route = parameter_layers({"headers": [header("Accept", "xml")]}, app)
+
+    assert route["headers"] == [header("Accept", "xml"), header("X-App", "1")]
+    assert route["query_params"] is app["query_params"]
+    assert route["headers"][-1] == header("X-App", "1")
+    assert route["headers"][:1] == [header("Accept", "xml")]
+    with pytest.raises(IndexError):
+        route["headers"][2]
+
+
+def test_hooks_are_deduplicated_by_value():
+    before = hook("before_scenario", "hooks:before")
+    after = hook("after_scenario", "hooks:after")
+    route = hook_layer([before, after])
+    scenario_hooks = hook_layer([after, hook("before_scenario", "hooks:other")], route)
+
+    assert isinstance(scenario_hooks, EntryList)
+    assert scenario_hooks == [after, hook("before_scenario", "hooks:other"), before]
+
+
+def test_freeze_keeps_booleans_lists_and_mappings_apart():
+    assert freeze(True) != freeze(1)
+    assert freeze([1]) != freeze({1: None})
+    assert freeze({"a": [1, {"b": 2}]}) == freeze({"a": [1, {"b": 2}]})
+    with pytest.raises(TypeError):
+        freeze({1, 2})
+
+
+def test_scenarios_inherit_from_their_route_and_app(project):
+    root = project({"users": [scenario("get", tags=["smoke", "api"]), scenario("list")]})
+    app = Application(root, snapshot=False)
+    app.collect_scenarios()
+    get, listing = app.materialize(app.scenario_collection)
+
+    assert get.get_tags() == ("smoke", "api", "users")
+    # A scenario without own meta shares the layer of its route
+    assert listing.get_meta() is listing.parent.route["meta"]
+    assert listing.get_tags() == ("users", "api")
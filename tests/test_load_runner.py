@@ -0,0 +1,70 @@
+import pytest
+
+from routestpy.core.application import Application
+from routestpy.runner.load_runner import LoadProfile
+from routestpy.runner.load_runner import LoadRunner
+from routestpy.runner.load_runner import LoadSummary
+from routestpy.runner.load_runner import WeightedMix
+from routestpy.runner.load_runner import describe_latency
+
+from .conftest import scenario
+
+
+def scenarios(root):
+    app = Application(root, environment="prod")
+    app.collect_scenarios()
+    return app.materialize(app.scenario_collection)
+
+
+def test_send_times_follow_the_ramp_and_rate():
+    times = list(LoadProfile(rate=10, duration=3, ramp_up=2).send_times())
+    assert len(times) == LoadProfile(rate=10, duration=3, ramp_up=2).expected_requests == 20
+    assert times == sorted(times)
+    # 10 requests during the 2s ramp, then one every 100ms
+    assert sum(1 for at in times if at < 2) == 10
+    assert times[-1] == pytest.approx(2.9)
+
+    with pytest.raises(ValueError):
+        LoadProfile(rate=10, duration=1, ramp_up=2)
+
+
+def test_mix_follows_the_load_weights(project):
+    root = project({"users": [scenario("heavy", load_weight=3), scenario("light"), scenario("never", load_weight=0)]})
+    mix = WeightedMix(scenarios(root), seed=1)
+    picks = [mix.scenarios[mix.pick()].get_name() for _ in range(4000)]
+    assert "never" not in picks
+    assert picks.count("heavy") / picks.count("light") == pytest.approx(3, rel=0.15)
+    again = WeightedMix(mix.scenarios, seed=1)
+    assert [again.scenarios[again.pick()].get_name() for _ in range(20)] == picks[:20]
+
+
+def test_summary_counts_without_keeping_requests():
+    summary = LoadSummary()
+    for i in range(1, 1001):
+        summary.record(i / 1000, 0.0, 200, None)
+    summary.record(2.0, 0.5, None, "Timed out after 1s")
+    summary.record(2.0, 0.5, None, "Timed out after 1s")
+
+    assert summary.count == 1002
+    assert summary.errors == 2
+    assert summary.failures == {"Timed out after 1s": 2}
+    assert summary.status_counts() == {200: 1000, None: 2}
+    assert summary.percentile(50) == pytest.approx(0.501, rel=0.01)
+    assert summary.percentile(100) == 2.0
+    assert summary.send_delay.max == 500_000
+    assert not hasattr(summary, "samples")
+    assert describe_latency(summary).endswith("max 2000.0ms")
+
+
+def test_load_run_against_a_loopback_server(project, http_server):
+    root = project({"users": [scenario("get", "/"), scenario("empty", "/empty")]}, host=http_server.url)
+    profile = LoadProfile(rate=200, duration=0.5)
+    summary = LoadRunner(http_server.url, profile, connections=4, seed=3).run(scenarios(root))
+
+    assert summary.count == len(http_server.requests) == profile.expected_requests
+    assert summary.errors == summary.dropped == 0
+    assert set(summary.status_counts()) == {200, 204}
+    assert sum(summary.status_counts().values()) == summary.count
+    # The last request is due at 0.495s
+    assert summary.duration >= 0.495
+    assert summary.connections["opened"] <= 4
@@ -0,0 +1,99 @@
+import threading
+
+import pytest
+
+from routestpy.runner.metrics import LatencyHistogram
+from routestpy.runner.metrics import MetricsRegistry
+from routestpy.runner.metrics import result_labels
+
+LABELS = result_labels("users", "get", "GET", "http://127.0.0.1:8080/users")
+
+
+def test_percentiles_are_within_the_relative_error():
+    histogram = LatencyHistogram()
+    values = [i / 1000 for i in range(1, 1001)]
+    for value in reversed(values):
+        histogram.record(value)
+
+    assert histogram.count == 1000
+    assert (histogram.min, histogram.max) == (1000, 1_000_000)
+    for percent in (1, 50, 95, 99):
+        assert histogram.percentile(percent) == pytest.approx(values[percent * 10 - 1], rel=0.01)
+    assert histogram.percentile(100) == 1.0
+    assert histogram.mean == pytest.approx(0.5005)
+    assert LatencyHistogram().percentile(50) == 0.0
+
+
+def test_only_the_buckets_hit_are_stored():
+    histogram = LatencyHistogram()
+    for _ in range(1000):
+        histogram.record(0.010)
+        histogram.record(0.250)
+    histogram.record(7200.0)
+    assert len(histogram.counts) == 3
+    assert histogram.percentile(100) == 7200.0
+
+
+def test_merge_and_copy():
+    first, second = LatencyHistogram(), LatencyHistogram()
+    first.record(0.1)
+    second.record(0.3)
+    second.record(0.2)
+    copy = first.copy()
+    first.merge(second)
+
+    assert (first.count, first.min, first.max) == (3, 100_000, 300_000)
+    assert first.percentile(50) == pytest.approx(0.2, rel=0.01)
+    assert (copy.count, len(copy.counts)) == (1, 1)
+    assert copy.percentile(100) == 0.1
+    with pytest.raises(ValueError):
+        first.merge(LatencyHistogram(significant_figures=3))
+
+
+def test_registry_series():
+    registry = MetricsRegistry()
+    registry.started(LABELS)
+    registry.started(LABELS)
+    registry.finished(LABELS, 0.05, 200)
+    registry.finished(LABELS, 0.15, None)
+
+    data = registry.to_dict()
+    assert data["latency"][0]["count"] == 2
+    assert data["latency"][0]["route"] == "users"
+    assert data["responses"] == [
+        dict(route="users", scenario="get", method="GET", host="127.0.0.1:8080", status=status, count=1)
+        for status in ("200", "error")
+    ]
+    assert data["in_flight"][0]["value"] == 0
+
+    text = registry.to_prometheus()
+    labels = 'route="users",scenario="get",method="GET",host="127.0.0.1:8080"'
+    assert f"routestpy_request_duration_seconds_count{{{labels}}} 2" in text
+    assert f'routestpy_responses_total{{{labels},status="error"}} 1' in text
+    assert f"routestpy_requests_in_flight{{{labels}}} 0" in text
+
+
+def test_exports_do_not_hold_the_lock_while_rendering(monkeypatch):
+    registry = MetricsRegistry()
+    for i in range(50):
+        registry.finished(result_labels("users", f"s{i}", "GET", "http://h"), 0.01 * i, 200, in_flight=False)
+    rendering = threading.Event()
+    release = threading.Event()
+    percentile = LatencyHistogram.percentile
+
+    def slow_percentile(self, percent):
+        rendering.set()
+        release.wait(5)
+        return percentile(self, percent)
+
+    monkeypatch.setattr(LatencyHistogram, "percentile", slow_percentile)
+    exporter = threading.Thread(target=registry.to_prometheus)
+    exporter.start()
+    try:
+        assert rendering.wait(5)
+        # Recording goes on while the export renders the copy it took
+        registry.finished(LABELS, 0.1, 200, in_flight=False)
+        assert registry.latency[LABELS].count == 1
+    finally:
+        release.set()
+        exporter.join()
@@ -0,0 +1,88 @@
+from routestpy.core.application import Application
+from routestpy.core.file_watcher import PollingWatcher
+from routestpy.core.project_watcher import ProjectWatcher
+
+from .conftest import scenario
+from .conftest import write_yaml
+
+
+def with_headers(data: dict, ref: str) -> dict:
+    data["scenario"]["parameters"] = dict(data["scenario"]["parameters"], headers={"$ref": ref})
+    return data
+
+
+def headers(scenario) -> list:
+    return scenario.scenario["parameters"]["headers"]
+
+
+def test_referenced_files_outside_the_project_trees_are_watched(project):
+    root = project({"users": [with_headers(scenario("get"), "../../../shared/headers.yaml"), scenario("list")]})
+    shared = write_yaml(root / "shared" / "headers.yaml", [{"key": "X-Tenant", "value": "a"}])
+    app = Application(root, snapshot=False)
+    app.collect_scenarios()
+
+    with ProjectWatcher(app, polling=True, interval=0.05) as watcher:
+        assert root / "shared" in watcher.watcher.directories
+
+        write_yaml(shared, [{"key": "X-Tenant", "value": "b"}])
+        changed = watcher.changes(timeout=5)
+        assert changed == {shared}
+        result = watcher.apply(changed)
+
+    assert not result.errors and not result.full
+    assert [s.get_name() for s in result.affected] == ["get"]
+    get = next(s for s in watcher.app.scenario_collection if s.get_name() == "get")
+    assert headers(get) == [{"key": "X-Tenant", "value": "b"}]
+
+
+def test_files_two_references_deep_are_reloaded(project):
+    root = project({"users": [with_headers(scenario("get"), "../../../shared/headers.yaml"), scenario("list")]})
+    write_yaml(root / "shared" / "headers.yaml", [{"$ref": "tenant.yaml"}])
+    tenant = write_yaml(root / "shared" / "tenant.yaml", {"key": "X-Tenant", "value": "a"})
+    app = Application(root, snapshot=False)
+    app.collect_scenarios()
+
+    with ProjectWatcher(app, polling=True, interval=0.05) as watcher:
+        write_yaml(tenant, {"key": "X-Tenant", "value": "b"})
+        changed = watcher.changes(timeout=5)
+        assert changed == {tenant}
+        result = watcher.apply(changed)
+
+    assert not result.errors and not result.full
+    assert [s.get_name() for s in result.affected] == ["get"]
+    get = next(s for s in watcher.app.scenario_collection if s.get_name() == "get")
+    assert headers(get) == [{"key": "X-Tenant", "value": "b"}]
+
+
+def test_references_added_by_a_reload_are_watched(project):
+    root = project({"users": [scenario("get")]})
+    other = write_yaml(root / "other" / "headers.yaml", [{"key": "X-Other", "value": "1"}])
+    app = Application(root, snapshot=False)
+    app.collect_scenarios()
+
+    with ProjectWatcher(app, polling=True, interval=0.05) as watcher:
+        assert root / "other" not in watcher.watcher.directories
+        scenario_path = write_yaml(
+            root / "routes" / "users_route" / "scenarios" / "get.yaml",
+            with_headers(scenario("get"), "../../../other/headers.yaml"),
+        )
+        assert watcher.changes(timeout=5) == {scenario_path}
+        assert not watcher.apply({scenario_path}).errors
+        assert root / "other" in watcher.watcher.directories
+
+        write_yaml(other, [{"key": "X-Other", "value": "2"}])
+        assert watcher.changes(timeout=5) == {other}
+
+
+def test_added_roots_skip_missing_and_nested_directories(tmp_path):
+    (tmp_path / "a" / "b").mkdir(parents=True)
+    (tmp_path / "c").mkdir()
+    (tmp_path / "c" / "old.yaml").write_text("x: 1\n")
+
+    with PollingWatcher([tmp_path / "a"], interval=0.05) as watcher:
+        added = watcher.add([tmp_path / "a" / "b", tmp_path / "missing", tmp_path / "c", tmp_path / "c"])
+        assert added == [tmp_path / "c"]
+        # Files present when a root is added are not reported as changes
+        assert watcher.changes(timeout=0.1) == set()
+        (tmp_path / "c" / "new.yaml").write_text("x: 2\n")
+        assert watcher.changes(timeout=5) == {tmp_path / "c" / "new.yaml"}
@@ -0,0 +1,45 @@
+import pytest
+
+from routestpy.core.ref_resolver import RefResolver
+
+from .test_schema_registry import touch_later
+
+
+def write_chain(tmp_path, leaf_type: str):
+    (tmp_path / "leaf.yaml").write_text(f"type: {leaf_type}\n")
+    (tmp_path / "mid.yaml").write_text("type: object\nproperties:\n  value:\n    $ref: leaf.yaml\n")
+    top = tmp_path / "top.yaml"
+    top.write_text("type: array\nitems:\n  $ref: mid.yaml\n")
+    return top
+
+
+def test_changes_two_references_deep_are_resolved(tmp_path):
+    resolver = RefResolver()
+    top = write_chain(tmp_path, "string")
+    dependencies = set()
+    schema = resolver.resolve(tmp_path, {"$ref": "top.yaml"}, dependencies)
+    assert schema["items"]["properties"]["value"] == {"type": "string"}
+    assert dependencies == {str(top), str(tmp_path / "mid.yaml"), str(tmp_path / "leaf.yaml")}
+
+    (tmp_path / "leaf.yaml").write_text("type: integer\n")
+    touch_later(tmp_path / "leaf.yaml")
+    schema = resolver.resolve(tmp_path, {"$ref": "top.yaml"})
+    assert schema["items"]["properties"]["value"] == {"type": "integer"}
+    # The parsed documents keep their references
+    assert resolver.load_document(str(tmp_path / "mid.yaml"))["properties"]["value"] == {"$ref": "leaf.yaml"}
+
+
+def test_unchanged_targets_are_shared(tmp_path):
+    resolver = RefResolver()
+    write_chain(tmp_path, "string")
+    first = resolver.resolve(tmp_path, {"a": {"$ref": "top.yaml"}, "b": [{"$ref": "mid.yaml"}]})
+    second = resolver.resolve(tmp_path, {"$ref": "top.yaml"})
+    assert second is first["a"]
+    assert first["a"]["items"] is first["b"][0]
+
+
+def test_circular_references_are_rejected(tmp_path):
+    (tmp_path / "a.yaml").write_text("$ref: b.yaml\n")
+    (tmp_path / "b.yaml").write_text("items:\n  $ref: a.yaml\n")
+    with pytest.raises(ValueError, match="Circular"):
+        RefResolver().resolve(tmp_path, {"$ref": "a.yaml"})
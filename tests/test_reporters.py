@@ -0,0 +1,84 @@
+import asyncio
+import json
+import threading
+import time
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from routestpy.runner.async_runner import ScenarioResult
+from routestpy.runner.reporters import JsonlWriter
+from routestpy.runner.reporters import JUnitWriter
+from routestpy.runner.reporters import ResultSink
+from routestpy.runner.reporters import ResultWriter
+
+
+def result(name, error=None):
+    return ScenarioResult(name, "GET", "http://h/users", None if error else 200, 0.25, error, 0.0, route="users")
+
+
+class BlockedWriter(ResultWriter):
+    def __init__(self) -> None:
+        self.release = threading.Event()
+        self.records = []
+
+    def write(self, record: dict) -> None:
+        self.release.wait(5)
+        self.records.append(record)
+
+    def close(self) -> None:
+        pass
+
+
+class FailingWriter(ResultWriter):
+    def write(self, record: dict) -> None:
+        raise OSError("disk full")
+
+    def close(self) -> None:
+        pass
+
+
+def test_reports_are_written_as_results_arrive(tmp_path):
+    with ResultSink([JsonlWriter(tmp_path / "results.jsonl"), JUnitWriter(tmp_path / "junit.xml", "tests")]) as sink:
+        sink.put(result("get"))
+        sink.put(result("broken", error="Timed out after 1s"))
+
+    lines = (tmp_path / "results.jsonl").read_text().splitlines()
+    assert [json.loads(line)["scenario"] for line in lines] == ["get", "broken"]
+    suite = ET.parse(tmp_path / "junit.xml").getroot().find("testsuite")
+    assert [suite.get(name) for name in ("name", "tests", "errors", "time")] == ["tests", "2", "1", "0.500"]
+    assert suite.findall("testcase")[1].find("error").get("message") == "GET http://h/users: Timed out after 1s"
+
+
+def test_put_async_waits_for_the_writers_without_blocking_the_loop():
+    writer = BlockedWriter()
+    sink = ResultSink([writer], maxsize=2)
+    ticks = []
+
+    async def tick() -> None:
+        while not writer.release.is_set():
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.01)
+
+    async def run() -> None:
+        ticker = asyncio.ensure_future(tick())
+        puts = asyncio.ensure_future(asyncio.gather(*(sink.put_async(result(f"s{i}")) for i in range(10))))
+        await asyncio.sleep(0.2)
+        # The queue is full and the writer is blocked, yet the loop keeps running
+        assert not puts.done() and len(ticks) > 5
+        writer.release.set()
+        await puts
+        await ticker
+
+    asyncio.run(run())
+    sink.close()
+    assert sorted(record["scenario"] for record in writer.records) == sorted(f"s{i}" for i in range(10))
+
+
+def test_writer_failures_are_raised_from_close():
+    sink = ResultSink([FailingWriter()])
+    sink.put(result("get"))
+    with pytest.raises(OSError, match="disk full"):
+        sink.close()
+    with pytest.raises(OSError, match="disk full"):
+        sink.put(result("get"))
@@ -0,0 +1,67 @@
+import os
+from pathlib import Path
+
+from routestpy.core.schema import BaseBodySchema
+from routestpy.core.schema_registry import SchemaRegistry
+
+
+def touch_later(path: Path) -> None:
+    # Some filesystems have a coarse mtime, make sure the change is seen
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def write_schemas(tmp_path: Path, name_type: str) -> Path:
+    # user.yaml -> name.yaml -> text.yaml
+    (tmp_path / "text.yaml").write_text(f"type: {name_type}\n")
+    (tmp_path / "name.yaml").write_text("$ref: text.yaml\n")
+    schema = tmp_path / "user.yaml"
+    schema.write_text(
+        "type: object\n" "properties:\n" "  name:\n" "    $ref: name.yaml\n" "  id:\n" "    type: integer\n"
+    )
+    return schema
+
+
+def test_get_caches_until_the_schema_changes(tmp_path):
+    registry = SchemaRegistry()
+    schema = tmp_path / "schema.yaml"
+    schema.write_text("type: object\n")
+    calls = []
+
+    def loader(path, dependencies):
+        calls.append(path)
+        return {"type": "object"}
+
+    assert registry.get(schema, loader) is registry.get(schema, loader)
+    assert len(calls) == 1
+    assert registry.stats() == {"hits": 1, "misses": 1, "size": 1}
+
+    touch_later(schema)
+    registry.get(schema, loader)
+    assert len(calls) == 2
+
+
+def test_get_reloads_when_a_referenced_file_changes(tmp_path):
+    schema_path = write_schemas(tmp_path, "string")
+    assert BaseBodySchema(schema_path).schema["properties"]["name"] == {"type": "string"}
+
+    (tmp_path / "text.yaml").write_text("type: integer\n")
+    touch_later(tmp_path / "text.yaml")
+    assert BaseBodySchema(schema_path).schema["properties"]["name"] == {"type": "integer"}
+
+    # The registry serves the schema until a file of the chain changes
+    registry = SchemaRegistry()
+    compile_schema = BaseBodySchema.__new__(BaseBodySchema).compile_schema
+    schema = registry.get(schema_path, compile_schema)
+    assert registry.get(schema_path, compile_schema) is schema
+    (tmp_path / "text.yaml").write_text("type: boolean\n")
+    touch_later(tmp_path / "text.yaml")
+    assert registry.get(schema_path, compile_schema)["properties"]["name"] == {"type": "boolean"}
+
+
+def test_get_records_referenced_files(tmp_path):
+    registry = SchemaRegistry()
+    schema_path = write_schemas(tmp_path, "string")
+    registry.get(schema_path, BaseBodySchema.__new__(BaseBodySchema).compile_schema)
+    versions = registry._entries[str(schema_path)][0]
+    assert set(versions) == {str(schema_path), str(tmp_path / "name.yaml"), str(tmp_path / "text.yaml")}
@@ -0,0 +1,96 @@
+import datetime
+import os
+import pickle
+
+from routestpy.core.application import Application
+from routestpy.core.snapshot import ProjectSnapshot
+
+from .conftest import scenario
+
+
+def write_data(tmp_path, name="data.yaml"):
+    path = tmp_path / name
+    path.write_text("x: 1\n")
+    return path
+
+
+def test_entries_survive_a_save_and_load(tmp_path):
+    data_path = write_data(tmp_path)
+    snapshot = ProjectSnapshot(tmp_path)
+    assert snapshot.get(data_path) is None
+    snapshot.put(data_path, {"x": [1, 2.5, None, True, "é\t\n"]}, [str(data_path)])
+    snapshot.save()
+
+    loaded = ProjectSnapshot(tmp_path)
+    assert loaded.get(data_path) == {"x": [1, 2.5, None, True, "é\t\n"]}
+    assert loaded.dependencies(data_path) == {str(data_path)}
+
+
+def test_changed_files_are_missed(tmp_path):
+    data_path = write_data(tmp_path)
+    snapshot = ProjectSnapshot(tmp_path)
+    snapshot.put(data_path, {"x": 1}, [str(data_path)])
+    snapshot.save()
+
+    data_path.write_text("x: 2\n")
+    assert ProjectSnapshot(tmp_path).get(data_path) is None
+
+
+def test_data_which_is_not_plain_json_is_not_cached(tmp_path):
+    data_path = write_data(tmp_path)
+    snapshot = ProjectSnapshot(tmp_path)
+    snapshot.put(data_path, {"date": datetime.date(2023, 1, 1)}, [str(data_path)])
+    snapshot.put(data_path, {200: "integer keys"}, [str(data_path)])
+    snapshot.save()
+    assert ProjectSnapshot(tmp_path).get(data_path) is None
+
+
+def test_pickles_are_never_loaded(tmp_path):
+    class Exploit:
+        def __reduce__(self):
+            return (os.system, ("touch " + str(tmp_path / "pwned"),))
+
+    snapshot = ProjectSnapshot(tmp_path)
+    snapshot.path.parent.mkdir()
+    snapshot.path.write_bytes(pickle.dumps(Exploit()))
+    snapshot.load()
+    assert not (tmp_path / "pwned").exists()
+    assert snapshot.get(write_data(tmp_path)) is None
+
+
+def test_save_writes_only_when_an_entry_changed(tmp_path):
+    data_path = write_data(tmp_path)
+    snapshot = ProjectSnapshot(tmp_path)
+    snapshot.put(data_path, {"x": 1}, [str(data_path)])
+    snapshot.save()
+    written = os.stat(snapshot.path).st_mtime_ns
+
+    again = ProjectSnapshot(tmp_path)
+    assert again.get(write_data(tmp_path, "other.yaml")) is None
+    again.get(data_path)
+    again.put(data_path, {"x": 1}, [str(data_path)])
+    again.save()
+    assert os.stat(snapshot.path).st_mtime_ns == written
+
+
+def test_lazy_runs_do_not_rewrite_the_snapshot(project):
+    root = project({"users": [scenario("login"), scenario("get")]})
+    app = Application.create_application(root, snapshot=True, lazy=True)
+    app.collect_scenarios()
+    app.materialize(app.scenario_collection[:1])
+    path = app.snapshot.path
+    written = os.stat(path).st_mtime_ns
+
+    for _ in range(2):
+        app = Application.create_application(root, snapshot=True, lazy=True)
+        app.collect_scenarios()
+        scenarios = app.materialize(app.scenario_collection[:1])
+        assert scenarios[0].get_name() == "login"
+        assert app.snapshot.hits
+    assert os.stat(path).st_mtime_ns == written
+
+    # Entries of scenarios not used by a run are kept
+    app = Application.create_application(root, snapshot=True, lazy=True)
+    app.collect_scenarios()
+    app.materialize(app.scenario_collection[1:])
+    assert ProjectSnapshot(root).get(root / "routes" / "users_route" / "scenarios" / "login.yaml") is not None
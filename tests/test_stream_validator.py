@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from routestpy.core.stream_validator import ArrayStreamValidator
+from routestpy.core.stream_validator import StreamValidationError
+from routestpy.core.stream_validator import batch_schema
+from routestpy.core.stream_validator import is_streamable
+from routestpy.core.validators import JsonSchemaEngine
+from routestpy.runner.dag_runner import DagRunner
+
+from .test_async_runner import spec
+
+SCHEMA = {
+    "type": "array",
+    "minItems": 1,
+    "items": {"type": "object", "required": ["id"], "properties": {"id": {"type": "integer"}}},
+}
+
+
+def feed(validator, body: bytes, size: int = 7) -> int:
+    for start in range(0, len(body), size):
+        validator.feed(body[start : start + size])
+    return validator.close()
+
+
+def test_items_are_validated_across_chunks():
+    body = json.dumps([{"id": i, "name": "é" * i} for i in range(50)]).encode()
+    assert feed(ArrayStreamValidator(SCHEMA, batch_size=8), body) == 50
+
+    with pytest.raises(StreamValidationError) as raised:
+        feed(ArrayStreamValidator(SCHEMA), b'[{"id": 1}, {"id": "2"}]')
+    assert raised.value.index == 1
+    with pytest.raises(StreamValidationError, match="at least 1"):
+        feed(ArrayStreamValidator(SCHEMA), b"[]")
+    with pytest.raises(StreamValidationError, match="Incomplete"):
+        feed(ArrayStreamValidator(SCHEMA), b'[{"id": 1}')
+
+
+def test_only_count_constraints_are_streamable():
+    assert is_streamable(SCHEMA)
+    assert not is_streamable(dict(SCHEMA, uniqueItems=True))
+    assert not is_streamable({"type": "object"})
+
+
+def test_responses_share_the_compiled_batch_validator():
+    engine = JsonSchemaEngine()
+    validators = [ArrayStreamValidator(SCHEMA, engine) for _ in range(100)]
+    assert batch_schema(SCHEMA["items"]) is validators[0].batch_schema is validators[-1].batch_schema
+    assert len(engine._compiled) == 1
+    assert batch_schema({"type": "string"}) is not validators[0].batch_schema
+
+
+def test_values_are_produced_from_array_bodies_with_a_schema(http_server):
+    producer = spec("list", "/items/3", response_body_schema=SCHEMA, meta={"produces": ["first=1.name"]})
+    consumer = spec("get", "/users/{name}", path_variables=[("name", "{{first}}")], meta={"consumes": ["first"]})
+    summary = DagRunner(http_server.url, parallel_count=2).run([consumer, producer])
+
+    assert [r.error for r in summary.results] == [None, None]
+    assert http_server.requests[-1][1] == "/users/item%201"
+
+    invalid = spec("list", "/items/3", response_body_schema=dict(SCHEMA, minItems=4), meta={"produces": ["first"]})
+    summary = DagRunner(http_server.url, parallel_count=2).run([invalid])
+    assert summary.results[0].error.startswith("Invalid response body")
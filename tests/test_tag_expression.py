@@ -0,0 +1,50 @@
+import pytest
+
+from routestpy.core.tag_expression import TagExpressionError
+from routestpy.core.tag_expression import compile_expression
+from routestpy.core.tag_index import TagIndex
+
+from .test_tag_index import FakeScenario
+
+SCENARIOS = [
+    FakeScenario("login", tags=["smoke", "auth"], component="users", priority="P0", negative=False),
+    FakeScenario("get", tags=["regression", "slow"], component="users", priority="P1", negative=True),
+    FakeScenario("pay", tags=["smoke"], component="billing", priority="P1", negative=1),
+    FakeScenario("refund", tags=[], component="billing", priority=0, negative=0),
+]
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("smoke", ["login", "pay"]),
+        ("smoke AND NOT slow", ["login", "pay"]),
+        ("NOT smoke", ["get", "refund"]),
+        ("(smoke OR slow) AND component == billing", ["pay"]),
+        ("IS NOT auth", ["get", "pay", "refund"]),
+        ("IN [auth, slow]", ["login", "get"]),
+        ("NOT IN [smoke]", ["get", "refund"]),
+        ('priority IN [P0, "P1"]', ["login", "get", "pay"]),
+        ("priority NOT IN [P0]", ["get", "pay", "refund"]),
+        ("component != users", ["pay", "refund"]),
+        ("negative == true", ["get"]),
+        ("negative == false", ["login"]),
+        ("negative IN [true, false]", ["login", "get"]),
+        ("priority == 0", ["refund"]),
+        ('priority == "0"', []),
+        ("negative == 1", ["pay"]),
+        ("negative IN [0, 1.0]", ["pay", "refund"]),
+        ("negative != +1", ["login", "get", "refund"]),
+        ("smoke OR auth AND slow", ["login", "pay"]),
+    ],
+)
+def test_index_and_predicate_agree(text, expected):
+    expression = compile_expression(text)
+    assert [scenario.name for scenario in expression.select(TagIndex(SCENARIOS))] == expected
+    assert [scenario.name for scenario in SCENARIOS if expression(scenario)] == expected
+
+
+@pytest.mark.parametrize("text", ["", "smoke AND", "(smoke", "priority ==", "IN [a,", "a ! b", "smoke)"])
+def test_invalid_expressions(text):
+    with pytest.raises(TagExpressionError):
+        compile_expression(text)
@@ -0,0 +1,46 @@
+from routestpy.core.tag_index import TagIndex
+
+
+class FakeScenario:
+    def __init__(self, name, **meta):
+        self.name = name
+        self.meta = meta
+
+    def get_meta(self):
+        return self.meta
+
+
+SCENARIOS = [
+    FakeScenario("login", tags=["smoke", "auth"], component="users", priority=1),
+    FakeScenario("get", tags=["regression"], component="users", priority=2),
+    FakeScenario("pay", tags=["smoke"], component="billing", priority=1),
+    FakeScenario("refund", tags=[], component="billing", extra={"unhashable": True}),
+]
+
+
+def names(index, bits):
+    return [scenario.name for scenario in index.select(bits)]
+
+
+def test_tags_and_fields_map_to_bitsets():
+    index = TagIndex(SCENARIOS)
+    assert names(index, index.tag("smoke")) == ["login", "pay"]
+    assert names(index, index.field("component", "billing")) == ["pay", "refund"]
+    assert names(index, index.field("priority", 1)) == ["login", "pay"]
+    assert index.tag("missing") == 0
+    assert index.field("missing", "x") == 0
+
+
+def test_bitset_operations():
+    index = TagIndex(SCENARIOS)
+    assert names(index, index.negate(index.tag("smoke"))) == ["get", "refund"]
+    assert names(index, index.tag("smoke") & index.field("component", "users")) == ["login"]
+    assert index.count(index.all) == 4
+    assert sorted(index.values("component")) == ["billing", "users"]
+
+
+def test_ids_of_large_sparse_selections():
+    scenarios = [FakeScenario(str(i), tags=["rare"] if i % 97 == 0 else []) for i in range(1000)]
+    index = TagIndex(scenarios)
+    assert index.ids(index.tag("rare")) == list(range(0, 1000, 97))
+    assert index.ids(index.all) == list(range(1000))
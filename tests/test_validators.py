@@ -0,0 +1,87 @@
+import threading
+
+import pytest
+from jsonschema.exceptions import ValidationError
+
+from routestpy.core import validators
+from routestpy.core.validators import CodegenEngine
+from routestpy.core.validators import JsonSchemaEngine
+from routestpy.core.validators import ValidatorEngine
+from routestpy.core.validators import get_validator_engine
+
+SCHEMA = {
+    "type": "object",
+    "required": ["id", "name"],
+    "properties": {
+        "id": {"type": "integer", "minimum": 1},
+        "name": {"type": "string", "minLength": 1},
+        "tags": {"type": "array", "items": {"enum": ["a", "b"]}, "uniqueItems": True},
+    },
+    "additionalProperties": False,
+}
+
+
+@pytest.mark.parametrize("engine", [JsonSchemaEngine(), CodegenEngine()], ids=lambda engine: engine.name)
+@pytest.mark.parametrize(
+    "data, valid",
+    [
+        ({"id": 1, "name": "x"}, True),
+        ({"id": 1, "name": "x", "tags": ["a", "b"]}, True),
+        ({"id": 0, "name": "x"}, False),
+        ({"id": True, "name": "x"}, False),
+        ({"id": 1}, False),
+        ({"id": 1, "name": "x", "tags": ["a", "a"]}, False),
+        ({"id": 1, "name": "x", "other": 1}, False),
+    ],
+)
+def test_engines_agree(engine, data, valid):
+    if valid:
+        engine.validate(data, SCHEMA)
+    else:
+        with pytest.raises(ValidationError):
+            engine.validate(data, SCHEMA)
+
+
+def test_validator_is_compiled_once_per_schema():
+    engine = JsonSchemaEngine()
+    assert engine.validator(SCHEMA) is engine.validator(SCHEMA)
+    assert len(engine._compiled) == 1
+
+
+def test_validator_cache_is_bounded():
+    engine = CodegenEngine(cache_size=8)
+    kept = {"type": "string"}
+    engine.validator(kept)
+    for _ in range(100):
+        engine.validator(kept)
+        engine.validator({"type": "integer"})
+    assert len(engine._compiled) == 8
+    # The schema in use is the most recently used, it is never evicted
+    assert id(kept) in engine._compiled
+
+
+def test_compile_is_abstract():
+    with pytest.raises(TypeError):
+        ValidatorEngine()
+
+
+def test_get_validator_engine_shares_one_instance(monkeypatch):
+    monkeypatch.setattr(validators, "_engines", {})
+    barrier = threading.Barrier(8)
+    engines = []
+
+    def get() -> None:
+        barrier.wait()
+        engines.append(get_validator_engine("codegen"))
+
+    threads = [threading.Thread(target=get) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(engine) for engine in engines}) == 1
+
+
+def test_get_validator_engine_rejects_unknown_names():
+    with pytest.raises(ValueError):
+        get_validator_engine("nope")
@@ -0,0 +1,28 @@
+import pytest
+import yaml
+
+from routestpy.loaders.yaml_reader import load_all_file
+from routestpy.loaders.yaml_reader import load_file
+from routestpy.loaders.yaml_reader import safe_load
+from routestpy.loaders.yaml_reader import safe_load_all
+
+DOCUMENT = "name: users\nport: 8080\nenabled: true\nday: 2024-01-02\ntags: [a, b]\nempty:\n"
+
+
+def test_documents_parse_like_the_pure_python_loader():
+    assert safe_load(DOCUMENT) == yaml.safe_load(DOCUMENT)
+    assert safe_load(DOCUMENT.encode()) == yaml.safe_load(DOCUMENT)
+
+
+def test_multiple_documents_are_parsed_in_one_pass(tmp_path):
+    path = tmp_path / "docs.yaml"
+    path.write_text("a: 1\n---\nb: é\n---\n")
+    assert safe_load_all(path.read_text()) == [{"a": 1}, {"b": "é"}, None]
+    assert load_all_file(path) == [{"a": 1}, {"b": "é"}, None]
+    path.write_text("a: 1\n")
+    assert load_file(str(path)) == {"a": 1}
+
+
+def test_only_standard_objects_are_constructed():
+    with pytest.raises(yaml.YAMLError):
+        safe_load("!!python/object/apply:os.system ['true']")